@@ -1,130 +1,593 @@
-from flask import Flask, render_template, request, jsonify
+import os
+
+# Socket.IO backend, chosen at startup: threading (default), eventlet or gevent.
+# Green-thread backends must patch the standard library before anything else
+# is imported so the per-game locks in the registry become cooperative.
+ASYNC_MODE = os.environ.get('LUDO_ASYNC_MODE', 'threading')
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, Response, render_template, request, jsonify, url_for
 from flask_socketio import SocketIO, emit, join_room, leave_room
+import atexit
+import secrets
+import threading
+import time
 import uuid
-import random
 import json
 
+import json_codec
+from assets import BUNDLES, CACHE_CONTROL, AssetManifest
+from bots import EXPECTIMAX, BotPool
+from chat_log import ChatLog
+from game_history import GameHistory
+from game_reaper import DEFAULT_INTERVAL, GameReaper
+from game_registry import GameRegistry
+from game_store import JournaledGameStore, MemoryGameStore, SQLiteGameStore
+from logging_setup import configure_logging, get_logger, traced
+from ludo_engine import COLORS, LudoGame
+from matchmaking import MATCHES, Matchmaker
+from message_queue import SQLiteMessageQueue
+from outbox import Outbox
+from rate_limit import RateLimiter
+from sessions import PUBLISHED_SECRETS, EventLog, SessionTokens
+from metrics import REGISTRY, instrumented, record_payload
+import wire_format
+from spectators import SpectatorHub
+from simulation import greedy_policy
+from timing_wheel import TimingWheel
+from turn_timers import PLAY, TIMEOUTS, TurnTimers
+
+configure_logging()
+log = get_logger('socket')
+game_log = get_logger('game')
+
+def secret_key():
+    """SECRET_KEY, or a random key for a single worker; a key published with the source is never used"""
+    secret = os.environ.get('SECRET_KEY')
+    if secret and secret not in PUBLISHED_SECRETS:
+        return secret
+    if os.environ.get('LUDO_MESSAGE_QUEUE'):
+        raise RuntimeError('Set SECRET_KEY: workers sharing a message queue must sign with the same key')
+    log.warning('SECRET_KEY is not set to a private value; using a random key, so sessions end with this process')
+    return secrets.token_hex(32)
+
 app = Flask(__name__)
-app.config['SECRET_KEY'] = 'ludo_game_secret_key'
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
-
-# Game state storage
-games = {}
-players = {}
-
-class LudoGame:
-    def __init__(self, game_id):
-        self.game_id = game_id
-        self.players = {}
-        self.current_player = 0
-        self.dice_value = 0
-        self.game_started = False
-        self.winner = None
-        self.board = self.initialize_board()
-    
-    def initialize_board(self):
-        # Initialize board state with position tracking
-        return {
-            'red': {'home': [0, 1, 2, 3], 'path': {}, 'safe': []},
-            'blue': {'home': [0, 1, 2, 3], 'path': {}, 'safe': []},
-            'green': {'home': [0, 1, 2, 3], 'path': {}, 'safe': []},
-            'yellow': {'home': [0, 1, 2, 3], 'path': {}, 'safe': []}
-        }
+app.config['SECRET_KEY'] = secret_key()
+
+# Hashed, precompressed bundles from build_assets.py; pages link the plain sources until it has run
+assets = AssetManifest(os.path.join(app.static_folder, 'dist'))
+
+def asset_urls(name):
+    """URLs a page links for bundle ``name``: the built file, or its sources when nothing is built"""
+    built = assets.file_for(name)
+    if built is not None:
+        return [url_for('asset', filename=built)]
+    return [url_for('static', filename=source) for source in BUNDLES[name]]
+
+app.jinja_env.globals['asset_urls'] = asset_urls
+
+# Multi-worker mode: LUDO_MESSAGE_QUEUE routes room broadcasts between processes.
+# Any Flask-SocketIO queue URL (redis://, kafka://, zmq+tcp://, ...) is accepted,
+# plus sqlite:///path for a single host without a broker.
+MESSAGE_QUEUE = os.environ.get('LUDO_MESSAGE_QUEUE')
+socketio_options = {}
+if MESSAGE_QUEUE and MESSAGE_QUEUE.startswith('sqlite:///'):
+    socketio_options['client_manager'] = SQLiteMessageQueue(MESSAGE_QUEUE[len('sqlite:///'):])
+elif MESSAGE_QUEUE:
+    socketio_options['message_queue'] = MESSAGE_QUEUE
+
+# Engine.IO drops the connection of any client sending a larger packet
+socketio_options['max_http_buffer_size'] = int(os.environ.get('LUDO_MAX_PACKET_BYTES', 64 * 1024))
+
+# json_codec splices pre-encoded snapshots into packets instead of encoding them again
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=ASYNC_MODE, json=json_codec, **socketio_options)
+
+# Per-connection token buckets, checked before a handler looks up any game
+limiter = RateLimiter()
+MAX_CHAT_CHARS = int(os.environ.get('LUDO_CHAT_MAX_CHARS', 500))
+
+def reject_flood(event):
+    emit('error', {'message': f'Too many {event} requests - slow down'})
+
+def rate_limited(event):
+    return limiter.guard(event, key=lambda: request.sid, on_reject=reject_flood)
+
+def snapshot(game):
+    """The game's full state for an emit, encoded once per version and shared by every emit of it"""
+    return json_codec.RawJSON(game.state_json())
+
+# Clients that opted into the binary msgpack format at connect: sid -> format
+wire_formats = {}
+
+def binary_room(game_id):
+    return f'{game_id}:{wire_format.MSGPACK}'
+
+def game_room(game_id):
+    """The room of ``game_id`` that matches the wire format of the current client"""
+    if wire_formats.get(request.sid) == wire_format.MSGPACK:
+        return binary_room(game_id)
+    return game_id
+
+def emit_to_game(game_id, event, data):
+    """Broadcast to a game's players in each wire format in use"""
+    socketio.emit(event, data, room=game_id)
+    # Without a message queue only local members matter, so skip packing for an empty room
+    if wire_formats and (MESSAGE_QUEUE or binary_room(game_id) in socket_rooms()):
+        socketio.emit(event, wire_format.pack(event, data), room=binary_room(game_id))
+
+# Broadcasts made while a request holds a game's lock leave as one frame per room
+outbox = Outbox(emit_to_game)
+
+def broadcast_delta(game, event, delta):
+    """Send a compact state diff to the room, stamped with the version it produced.
+
+    Clients apply diffs in version order and ask for a full snapshot
+    (``sync_state``) whenever they notice a gap.
+    """
+    delta['version'] = game.version
+    record_payload(event, 'out', delta)
+    outbox.add(game.game_id, event, delta)
+    spectators.publish(game.game_id, event, delta)
+    recent_events.record(game.game_id, event, delta)
+    # Any of these can hand the turn to someone new
+    if event in ('game_started', 'turn_changed', 'player_left'):
+        start_turn(game)
+
+def start_turn(game):
+    """Start the clock on the person now to move, or let the bot to move play"""
+    if not game.game_started or game.winner:
+        return
+    if game.is_bot(game.current_player_id()):
+        turn_timers.stop(game.game_id)
+        schedule_bot(game)
+    elif turn_timers.seconds:
+        turn_timers.start(game)
+        ensure_background_task(run_turn_timers)
+
+def roll_for_current_player(game):
+    """Roll for the player to move, broadcast it and settle forced turns.
+
+    Returns the legal moves; the player still has to choose only when there
+    are several.
+    """
+    player_id = game.current_player_id()
+    dice_value = game.roll_dice()
+    game_log.debug('Game %s: %s rolled %d', game.game_id, player_id, dice_value)
     
-    def add_player(self, player_id, player_name, color):
-        if len(self.players) < 4 and color not in [p['color'] for p in self.players.values()]:
-            self.players[player_id] = {'name': player_name, 'color': color}
-            return True
-        return False
+    color = game.current_color()
+    moves = game.legal_moves(color)
+    broadcast_delta(game, 'dice_rolled', {
+        'dice_value': dice_value,
+        'player_id': player_id,
+        'legal_moves': [piece for piece, _ in moves]
+    })
     
-    def remove_player(self, player_id):
-        if player_id in self.players:
-            del self.players[player_id]
+    # Settle forced turns right away instead of waiting for the client
+    if not moves:
+        game.end_turn()
+        broadcast_delta(game, 'turn_changed', {
+            'current_player': game.current_player,
+            'message': f"No moves for {color} - turn passed to {game.current_color()}"
+        })
+    elif len(moves) == 1:
+        piece, from_location = moves[0]
+        play_move(game, color, piece, from_location)
+    return moves
+
+def play_move(game, color, piece, from_location):
+    """Move a piece for the current player, broadcast it and hand the turn on.
     
-    def start_game(self):
-        if len(self.players) >= 2:
-            self.game_started = True
-            return True
+    Returns False if the move is not allowed.
+    """
+    # Store the dice value before the turn resets it
+    dice_value = game.dice_value
+    result = game.move_piece(game.current_player_id(), color, piece, from_location)
+    if result is None:
         return False
     
-    def roll_dice(self):
-        self.dice_value = random.randint(1, 6)
-        return self.dice_value
-    
-    def get_start_position(self, color):
-        """Get the starting position on the path for each color"""
-        start_positions = {
-            'red': 0,
-            'blue': 13,
-            'green': 26,
-            'yellow': 39
-        }
-        return start_positions[color]
+    # Move was successful
+    broadcast_delta(game, 'piece_moved', {
+        'color': color,
+        'piece': piece,
+        'from': from_location,
+        'to': result['to'],
+        'captured': result['captured'],
+        'dice_value': dice_value,
+        'winner': game.winner
+    })
     
-    def move_piece(self, player_id, color, piece, from_location):
-        # Basic move validation
-        if player_id not in self.players:
-            print(f"DEBUG: Player {player_id} not in game")
-            return False
-        
-        if self.players[player_id]['color'] != color:
-            print(f"DEBUG: Color mismatch - player color: {self.players[player_id]['color']}, requested: {color}")
-            return False
-        
-        if self.dice_value == 0:
-            print(f"DEBUG: No dice value set")
-            return False
-        
-        print(f"DEBUG: Attempting to move {color} piece {piece} from {from_location} with dice value {self.dice_value}")
-        print(f"DEBUG: Current board state for {color}: {self.board[color]}")
+    if game.winner:
+        turn_timers.stop(game.game_id)
+        # Finished games expire sooner than running ones
+        reaper.track(game)
+        if history is not None:
+            history.finish(game)
+        return True
+    
+    # Reset dice value after move (player needs to roll again);
+    # the turn only advances if dice value was not 6
+    rolled_six = dice_value == 6
+    game.end_turn(extra_turn=rolled_six)
+    
+    if not rolled_six:
+        game_log.debug('Game %s: turn advanced to seat %d', game.game_id, game.current_player)
         
-        # Enhanced move logic with position tracking
-        if from_location == 'home':
-            # Can only move from home with a 6
-            if self.dice_value == 6:
-                if piece in self.board[color]['home']:
-                    self.board[color]['home'].remove(piece)
-                    start_pos = self.get_start_position(color)
-                    self.board[color]['path'][piece] = start_pos
-                    print(f"DEBUG: Moved piece {piece} from home to path position {start_pos}")
-                    print(f"DEBUG: New board state for {color}: {self.board[color]}")
-                    return True
-                else:
-                    print(f"DEBUG: Piece {piece} not found in home. Home contains: {self.board[color]['home']}")
-            else:
-                print(f"DEBUG: Need dice value 6 to move from home, got {self.dice_value}")
-        elif from_location == 'path':
-            # Move piece along the path
-            if piece in self.board[color]['path']:
-                current_pos = self.board[color]['path'][piece]
-                new_pos = (current_pos + self.dice_value) % 52  # 52 squares on the path
-                self.board[color]['path'][piece] = new_pos
-                print(f"DEBUG: Moved piece {piece} from position {current_pos} to {new_pos}")
-                print(f"DEBUG: New board state for {color}: {self.board[color]}")
-                return True
-            else:
-                print(f"DEBUG: Piece {piece} not found in path. Path contains: {list(self.board[color]['path'].keys())}")
+        # Send turn change notification
+        broadcast_delta(game, 'turn_changed', {
+            'current_player': game.current_player,
+            'message': f"Turn passed to {game.current_color()}"
+        })
+    else:
+        game_log.debug('Game %s: seat %d rolls again after a six', game.game_id, game.current_player)
         
-        print(f"DEBUG: Move not allowed")
-        return False
+        # Send same turn notification
+        broadcast_delta(game, 'turn_changed', {
+            'current_player': game.current_player,
+            'message': f"Roll again! You got a 6."
+        })
     
-    def check_winner(self):
-        for color, pieces in self.board.items():
-            if len(pieces['safe']) == 4:
-                self.winner = color
-                return True
-        return False
+    return True
+
+def create_store():
+    """Games stay in this process unless LUDO_STORE=sqlite:///path shares them between workers.
+
+    LUDO_STORE=journal:///directory keeps them in this process but journals
+    every change, so they survive a restart.
+    """
+    url = os.environ.get('LUDO_STORE')
+    if url and url.startswith('sqlite:///'):
+        return SQLiteGameStore(url[len('sqlite:///'):], LudoGame.from_dict)
+    if url and url.startswith('journal:///'):
+        store = JournaledGameStore(url[len('journal:///'):], LudoGame.from_dict,
+                                   flush_interval=float(os.environ.get('LUDO_JOURNAL_FLUSH_MS', 5)) / 1000,
+                                   snapshot_interval=float(os.environ.get('LUDO_SNAPSHOT_INTERVAL', 60)))
+        atexit.register(store.close)
+        return store
+    return MemoryGameStore()
+
+# Game state storage: games and the player -> game bindings, each game behind its own lock
+registry = GameRegistry(create_store())
+
+# Public lobbies indexed by free seats and colors, for find_game
+matchmaker = Matchmaker()
+
+# Read-only viewers, fed in batches from a shared per-game buffer
+spectators = SpectatorHub(interval=float(os.environ.get('LUDO_SPECTATOR_INTERVAL', 0.5)))
+
+# Recent chat per game, replayed to anyone joining; bursts are merged into chat_batch emits
+chat = ChatLog(max_messages=int(os.environ.get('LUDO_CHAT_HISTORY', 50)),
+               max_bytes=int(os.environ.get('LUDO_CHAT_HISTORY_BYTES', 16 * 1024)),
+               interval=float(os.environ.get('LUDO_CHAT_INTERVAL', 0.25)))
+
+# Move histories for replays of finished games; off unless LUDO_REPLAY_DIR is set
+history = GameHistory(os.environ['LUDO_REPLAY_DIR']) if os.environ.get('LUDO_REPLAY_DIR') else None
+if history is not None:
+    if MESSAGE_QUEUE:
+        # Each history is buffered by one process and would miss the changes other workers make
+        raise RuntimeError('LUDO_REPLAY_DIR cannot be combined with LUDO_MESSAGE_QUEUE: '
+                           'replays are recorded in the memory of a single worker')
+    registry.observers.append(history.record)
+
+# Bot seats: searches run in worker processes, batched once per tick across every game
+bots = BotPool(workers=int(os.environ.get('LUDO_BOT_WORKERS', 2)),
+               budget=float(os.environ.get('LUDO_BOT_BUDGET_MS', 200)) / 1000)
+atexit.register(bots.shutdown)
+# Pause before a bot acts, so people can follow its moves
+BOT_DELAY = float(os.environ.get('LUDO_BOT_DELAY', 0.8))
+BOT_TICK = 0.05
+bot_turns = {}      # game_id -> when the bot to move may act
+bot_lock = threading.Lock()
+
+# Turn deadlines of every game on one timing wheel; LUDO_TURN_SECONDS=0 turns them off
+turn_timers = TurnTimers.from_env()
+
+# A disconnected player's seat is held this long for resume_session; 0 releases it at once
+RECONNECT_GRACE = float(os.environ.get('LUDO_RECONNECT_GRACE', 30))
+# How soon a client asks again for a seat whose old connection has not closed yet
+RESUME_RETRY_SECONDS = 2
+sessions = SessionTokens(app.config['SECRET_KEY'])
+# Recent deltas per game, so a resumed client gets only what it missed
+recent_events = EventLog(max_events=int(os.environ.get('LUDO_CATCHUP_EVENTS', 32)))
+# player_id -> game_id of the seats held after disconnects this worker saw, released when
+# the timer fires; whether a seat is held is recorded in the game, for every worker to see
+grace_timers = TimingWheel(tick=0.5)
+
+background_tasks = {}
+background_lock = threading.Lock()
+
+def ensure_background_task(target):
+    """Start ``target`` once, on first use, under whichever async backend is active"""
+    with background_lock:
+        if target not in background_tasks:
+            background_tasks[target] = socketio.start_background_task(target)
+
+def forget_game(game):
+    """Drop what other subsystems hold for a game that is being removed"""
+    matchmaker.remove(game.game_id)
+    if history is not None:
+        history.discard(game)
+    socketio.close_room(spectators.room(game.game_id))
+    spectators.drop_game(game.game_id)
+    chat.drop_game(game.game_id)
+    recent_events.drop_game(game.game_id)
+    with bot_lock:
+        bot_turns.pop(game.game_id, None)
+    turn_timers.stop(game.game_id)
+
+def socket_rooms():
+    """Rooms of the default namespace as seen by this process's Socket.IO manager"""
+    return socketio.server.manager.rooms.get('/', {})
+
+def count_game_rooms():
+    rooms = socket_rooms()
+    connected = rooms.get(None, {})
+    # Every client also sits in a private room named after its sid
+    return sum(1 for room in rooms
+               if room is not None and room not in connected and not room.endswith(':spectators'))
+
+def announce_expiry(game, reason):
+    log.info('Expiring game %s (%s)', game.game_id, reason)
+    expired = {'game_id': game.game_id, 'reason': reason}
+    emit_to_game(game.game_id, 'game_expired', expired)
+    socketio.emit('game_expired', expired, room=spectators.room(game.game_id))
+    socketio.close_room(game.game_id)
+    socketio.close_room(binary_room(game.game_id))
+    forget_game(game)
+
+# Idle games are expired by phase TTLs; the cap bounds how many games exist at once
+reaper = GameReaper(registry, on_evict=announce_expiry)
+if len(registry):
+    # Games shared by other workers or recovered from the journal
+    reaper.track_existing()
+
+def run_reaper():
+    while True:
+        socketio.sleep(DEFAULT_INTERVAL)
+        try:
+            reaper.sweep()
+        except Exception:
+            log.exception('Reaper sweep failed')
+
+def flush_spectators():
+    """Send each watched game's pending deltas to its spectators as one batch"""
+    for game_id, events in spectators.drain():
+        room = spectators.room(game_id)
+        if events is None:
+            # Too much happened since the last tick; a snapshot is smaller than the backlog
+            with registry.locked(game_id) as game:
+                if game is not None:
+                    socketio.emit('state_snapshot', {'game_state': snapshot(game)}, room=room)
+        else:
+            socketio.emit('spectator_batch', {
+                'events': [{'event': event, 'data': data} for event, data in events]
+            }, room=room)
+
+def run_spectator_feed():
+    while True:
+        socketio.sleep(spectators.interval)
+        try:
+            flush_spectators()
+        except Exception:
+            log.exception('Spectator feed failed')
+
+def send_chat_history(game_id):
+    messages = chat.history(game_id)
+    if messages:
+        emit('chat_history', {'messages': messages})
+
+def flush_chat():
+    """Send the chat held back during each busy room's last interval as one batch"""
+    for game_id, messages in chat.drain():
+        emit_to_game(game_id, 'chat_batch', {'messages': messages})
+
+def run_chat_feed():
+    while True:
+        socketio.sleep(chat.interval)
+        try:
+            flush_chat()
+        except Exception:
+            log.exception('Chat feed failed')
+
+def schedule_bot(game):
+    """Give a bot its turn after a short pause, if the game is now waiting on one"""
+    if game.game_started and not game.winner and game.is_bot(game.current_player_id()):
+        with bot_lock:
+            bot_turns.setdefault(game.game_id, time.monotonic() + BOT_DELAY)
+        ensure_background_task(run_bots)
+
+def bot_turn(game):
+    """Key of the decision the bot to move needs: its seat, its roll and the board.
+
+    Players leaving or reconnecting bump the version but leave the key, so
+    a decision stays good for as long as the turn it was made for.
+    """
+    return game.game_id, game.current_player, game.dice_value, game.board.positions.tobytes()
+
+def play_bot_turn(game_id):
+    """Roll for the bot to move; a real choice goes to the bot pool, forced moves are played here"""
+    with registry.locked(game_id) as game, outbox.collect():
+        if game is None or game.winner or not game.is_bot(game.current_player_id()):
+            return
+        if game.dice_value == 0:
+            moves = roll_for_current_player(game)
+        else:
+            # Already rolled: the turn restarted, e.g. after another seat was released
+            moves = game.legal_moves(game.current_color())
+        key = bot_turn(game)
+        if len(moves) > 1 and game.dice_value and key not in bots:
+            bots.submit(key, game)
+
+def apply_bot_move(key, piece):
+    with registry.locked(key[0]) as game, outbox.collect():
+        # A decision for a turn that is over is dropped
+        if game is None or bot_turn(game) != key or not game.is_bot(game.current_player_id()):
+            return
+        color = game.current_color()
+        moves = game.legal_moves(color)
+        # A failed search still has to move something
+        piece, from_location = next((move for move in moves if move[0] == piece), moves[0])
+        play_move(game, color, piece, from_location)
+
+def run_bots():
+    while True:
+        socketio.sleep(BOT_TICK)
+        try:
+            now = time.monotonic()
+            with bot_lock:
+                due = [game_id for game_id, when in bot_turns.items() if when <= now]
+                for game_id in due:
+                    del bot_turns[game_id]
+            for game_id in due:
+                play_bot_turn(game_id)
+            for key, piece in bots.poll():
+                apply_bot_move(key, piece)
+        except Exception:
+            log.exception('Bot turn failed')
+
+def remind_turn(game_id, seat):
+    emit_to_game(game_id, 'turn_reminder', {
+        'current_player': seat,
+        'seconds_left': turn_timers.reminder
+    })
+
+def expire_turn(game_id, turn):
+    """Settle a turn that ran out of time: move for a player who rolled, otherwise pass or play the turn"""
+    with registry.locked(game_id) as game, outbox.collect():
+        if game is None or game.winner or not turn_timers.is_current(game_id, turn):
+            return
+        color = game.current_color()
+        game_log.info('Game %s: %s ran out of time', game_id, color)
+        if game.dice_value == 0 and turn_timers.on_timeout != PLAY:
+            TIMEOUTS.inc('passed')
+            game.end_turn()
+            broadcast_delta(game, 'turn_changed', {
+                'current_player': game.current_player,
+                'message': f"{color} ran out of time - turn passed to {game.current_color()}"
+            })
+            return
+        TIMEOUTS.inc('played')
+        if game.dice_value == 0:
+            moves = roll_for_current_player(game)
+            if len(moves) <= 1:
+                # The roll settled a forced turn by itself
+                return
+        else:
+            moves = game.legal_moves(color)
+        if moves:
+            piece, from_location = greedy_policy(game, color, moves)
+            play_move(game, color, piece, from_location)
+
+def release_seat(game, player_id):
+    """Take a player out of their game for good and tell the room"""
+    game_id = game.game_id
+    player_info = game.players.get(player_id, {})
+    game.remove_player(player_id)
+    # A public lobby that lost a player takes new ones again
+    matchmaker.update(game)
     
-    def get_game_state(self):
-        return {
-            'game_id': self.game_id,
-            'players': self.players,
-            'current_player': self.current_player,
-            'dice_value': self.dice_value,
-            'game_started': self.game_started,
-            'winner': self.winner,
-            'board': self.board
-        }
+    log.debug('Player %s left game %s, %d players remain', player_id, game_id, len(game.players))
+    
+    broadcast_delta(game, 'player_left', {
+        'player_id': player_id,
+        'player_name': player_info.get('name', 'Unknown'),
+        'seats': game.seats,
+        'current_player': game.current_player,
+        'dice_value': game.dice_value
+    })
+    
+    # Clean up started games nobody is left to watch; bots do not play on alone
+    # Keep unstarted games for players to rejoin
+    if not game.has_humans() and game.game_started:
+        log.info('Deleting started game %s with no players left', game_id)
+        forget_game(game)
+        registry.remove_game(game_id)
+    elif len(game.players) == 0:
+        log.debug('Game %s is empty but not started - keeping for reconnection', game_id)
+
+def expire_grace(player_id, game_id):
+    with registry.locked(game_id) as game, outbox.collect():
+        if game is not None and player_id in game.players:
+            log.info('Releasing the seat of %s in game %s', player_id, game_id)
+            release_seat(game, player_id)
+    registry.unbind_player(player_id)
+
+def run_grace_timers():
+    while True:
+        socketio.sleep(grace_timers.tick)
+        try:
+            for player_id, game_id in grace_timers.advance():
+                expire_grace(player_id, game_id)
+        except Exception:
+            log.exception('Reconnect grace timers failed')
+
+def run_turn_timers():
+    while True:
+        socketio.sleep(turn_timers.tick)
+        try:
+            for game_id, kind, (seat, version) in turn_timers.due():
+                if kind == 'remind':
+                    remind_turn(game_id, seat)
+                else:
+                    expire_turn(game_id, (seat, version))
+        except Exception:
+            log.exception('Turn timers failed')
+
+REGISTRY.gauge('ludo_reaper_tracked_games', 'Entries in the game expiry index', lambda: len(reaper))
+REGISTRY.gauge('ludo_active_games', 'Games held in the store', lambda: len(registry))
+REGISTRY.gauge('ludo_connected_players', 'Socket.IO clients connected to this process',
+               lambda: len(socket_rooms().get(None, {})))
+REGISTRY.gauge('ludo_seated_players', 'Players bound to a game in this process', lambda: len(registry.players))
+REGISTRY.gauge('ludo_spectators', 'Spectators connected to this process', lambda: len(spectators))
+REGISTRY.gauge('ludo_rate_limited_connections', 'Connections holding rate-limit buckets', lambda: len(limiter))
+REGISTRY.gauge('ludo_open_lobbies', 'Public lobbies waiting for players', lambda: len(matchmaker))
+REGISTRY.gauge('ludo_held_seats', 'Seats held for disconnected players to resume', lambda: len(grace_timers))
+REGISTRY.gauge('ludo_turn_timers', 'Turn deadlines armed on the timing wheel', lambda: len(turn_timers))
+REGISTRY.gauge('ludo_bot_decisions_in_flight', 'Bot decisions queued or being searched', lambda: len(bots))
+REGISTRY.gauge('ludo_game_rooms', 'Game rooms with members on this process', count_game_rooms)
+
+def new_game_id():
+    return str(uuid.uuid4())[:8].lower()  # Ensure game ID is lowercase
+
+def open_game(game):
+    """Store a new game and start tracking it"""
+    registry.add_game(game)
+    reaper.track(game)
+    if history is not None:
+        history.attach(game)
+    ensure_background_task(run_reaper)
+
+def seat_player(game, player_id):
+    """Bind a player just added to ``game`` to it and send them the game"""
+    registry.bind_player(player_id, game.game_id)
+    join_room(game_room(game.game_id))
+    emit('game_joined', {
+        'game_id': game.game_id,
+        'player_id': player_id,
+        'session_token': sessions.issue(game.game_id, player_id),
+        'game_state': snapshot(game)
+    })
+    send_chat_history(game.game_id)
+
+def announce_player(game, player_id):
+    """Tell the room about a new player; a public lobby starts once it is full"""
+    player = game.players[player_id]
+    broadcast_delta(game, 'player_joined', {
+        'player_id': player_id,
+        'player_name': player['name'],
+        'color': player['color'],
+        'seat': game.color_seats[player['color']],
+        'bot': player.get('bot')
+    })
+    if matchmaker.update(game) and game.start_game():
+        broadcast_delta(game, 'game_started', {
+            'current_player': game.current_player
+        })
+        matchmaker.update(game)
 
 @app.route('/')
 def index():
@@ -134,124 +597,160 @@ def index():
 def game(game_id):
     return render_template('game.html', game_id=game_id)
 
+@app.route('/match')
+def match():
+    """Game page that asks for a seat in a public lobby instead of a known game"""
+    return render_template('game.html', game_id='')
+
+@app.route('/replay/<game_id>')
+def replay(game_id):
+    """Stream a finished game as NDJSON: its starting state, then one line per change"""
+    if history is None or not history.has_replay(game_id):
+        return jsonify({'error': 'Replay not found'}), 404
+    events = history.replay(game_id)
+    return Response((json.dumps(event) + '\n' for event in events), mimetype='application/x-ndjson')
+
+@app.route('/assets/<filename>')
+def asset(filename):
+    """Serve a built bundle in the best encoding the client accepts, cached for good"""
+    found = assets.representation(filename, request.headers.get('Accept-Encoding', ''))
+    if found is None:
+        return jsonify({'error': 'Asset not found'}), 404
+    body, encoding, etag, mimetype = found
+    response = Response(body, mimetype=mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+@app.route('/metrics')
+def metrics():
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 @socketio.on('create_game')
+@instrumented('create_game')
+@rate_limited('create_game')
+@traced(log)
 def handle_create_game(data):
-    game_id = str(uuid.uuid4())[:8].lower()  # Ensure game ID is lowercase
+    game_id = new_game_id()
     player_name = data['player_name']
     color = data['color']
     
-    print(f"DEBUG: Creating game with ID: '{game_id}'")
+    if registry.game_id_for(request.sid) is not None:
+        emit('error', {'message': 'You are already in a game'})
+        return
+    
+    if not reaper.make_room():
+        emit('error', {'message': 'Server is full - please try again later'})
+        return
     
     game = LudoGame(game_id)
     player_id = request.sid
     
     if game.add_player(player_id, player_name, color):
-        games[game_id] = game
-        players[player_id] = game_id
-        join_room(game_id)
+        open_game(game)
+        registry.bind_player(player_id, game_id)
+        join_room(game_room(game_id))
         
-        print(f"DEBUG: Game created successfully. Games dict: {list(games.keys())}")
+        log.info('Game %s created by %s', game_id, player_id)
         
         emit('game_created', {
             'game_id': game_id,
             'player_id': player_id,
-            'game_state': game.get_game_state()
+            'session_token': sessions.issue(game_id, player_id),
+            'game_state': snapshot(game)
         })
     else:
         emit('error', {'message': 'Failed to create game'})
 
 @socketio.on('join_game')
+@instrumented('join_game')
+@rate_limited('join_game')
+@traced(log)
 def handle_join_game(data):
-    original_game_id = data['game_id']
     game_id = data['game_id'].lower()  # Convert to lowercase for consistency
     player_name = data['player_name']
     color = data['color']
     player_id = request.sid
     
-    print(f"DEBUG: Join attempt - Original ID: '{original_game_id}', Lowercase ID: '{game_id}'")
-    print(f"DEBUG: Available games: {list(games.keys())}")
+    log.debug('Join attempt for game %s by %s', game_id, player_id)
     
-    if game_id in games:
-        game = games[game_id]
+    if registry.game_id_for(player_id) is not None:
+        emit('error', {'message': 'You are already in a game'})
+        return
+    
+    with registry.locked(game_id) as game, outbox.collect():
+        if game is None:
+            emit('error', {'message': 'Game not found - check the game ID'})
+            return
+        
         if game.add_player(player_id, player_name, color):
-            players[player_id] = game_id
-            join_room(game_id)
-            
-            emit('game_joined', {
-                'game_id': game_id,
-                'player_id': player_id,
-                'game_state': game.get_game_state()
-            })
+            seat_player(game, player_id)
             
             # Notify all players in the room
-            socketio.emit('player_joined', {
-                'player_name': player_name,
-                'color': color,
-                'game_state': game.get_game_state()
-            }, room=game_id)
+            announce_player(game, player_id)
         else:
             emit('error', {'message': 'Cannot join game - full or color taken'})
-    else:
-        emit('error', {'message': f'Game not found. Available games: {list(games.keys())}'})
 
 @socketio.on('start_game')
+@instrumented('start_game')
+@rate_limited('start_game')
+@traced(log)
 def handle_start_game():
-    player_id = request.sid
-    if player_id in players:
-        game_id = players[player_id]
-        game = games[game_id]
+    with registry.locked_for_player(request.sid) as game, outbox.collect():
+        if game is None:
+            return
         
         if game.start_game():
-            socketio.emit('game_started', {
-                'game_state': game.get_game_state()
-            }, room=game_id)
+            broadcast_delta(game, 'game_started', {
+                'current_player': game.current_player
+            })
+            matchmaker.update(game)
         else:
             emit('error', {'message': 'Need at least 2 players to start'})
 
 @socketio.on('roll_dice')
+@instrumented('roll_dice')
+@rate_limited('roll_dice')
+@traced(log)
 def handle_roll_dice():
     player_id = request.sid
-    if player_id in players:
-        game_id = players[player_id]
-        game = games[game_id]
+    with registry.locked_for_player(player_id) as game, outbox.collect():
+        if game is None:
+            return
         
         if game.game_started and not game.winner:
             # Check if it's the player's turn
-            current_player_id = list(game.players.keys())[game.current_player]
-            
-            if player_id == current_player_id:
+            if player_id == game.current_player_id():
                 # Only allow rolling if dice hasn't been rolled yet this turn
                 if game.dice_value == 0:
-                    dice_value = game.roll_dice()
-                    print(f"DEBUG: Player {player_id} rolled {dice_value}")
-                    
-                    socketio.emit('dice_rolled', {
-                        'dice_value': dice_value,
-                        'player_id': player_id,
-                        'game_state': game.get_game_state()
-                    }, room=game_id)
+                    roll_for_current_player(game)
                 else:
                     emit('error', {'message': 'You have already rolled the dice! Make a move or pass your turn.'})
             else:
                 emit('error', {'message': 'Not your turn!'})
 
 @socketio.on('move_piece')
+@instrumented('move_piece')
+@rate_limited('move_piece')
+@traced(log)
 def handle_move_piece(data):
     player_id = request.sid
-    if player_id in players:
-        game_id = players[player_id]
-        game = games[game_id]
+    with registry.locked_for_player(player_id) as game, outbox.collect():
+        if game is None:
+            return
         
         if game.game_started and not game.winner:
             color = data['color']
             piece = data['piece']
             from_location = data['from']
             
-            print(f"DEBUG: Move piece request from {player_id} for {color} piece {piece}")
+            game_log.debug('Game %s: %s asks to move %s piece %s', game.game_id, player_id, color, piece)
             
             # Check if it's the player's turn
-            current_player_id = list(game.players.keys())[game.current_player]
-            if player_id != current_player_id:
+            if player_id != game.current_player_id():
                 emit('error', {'message': 'Not your turn to move!'})
                 return
             
@@ -261,57 +760,23 @@ def handle_move_piece(data):
                 return
             
             # Validate move and update game state
-            if game.move_piece(player_id, color, piece, from_location):
-                # Store the dice value before resetting it
-                rolled_six = game.dice_value == 6
-                
-                # Move was successful
-                socketio.emit('piece_moved', {
-                    'color': color,
-                    'piece': piece,
-                    'from': from_location,
-                    'dice_value': game.dice_value,
-                    'game_state': game.get_game_state()
-                }, room=game_id)
-                
-                # Reset dice value after move (player needs to roll again)
-                game.dice_value = 0
-                print(f"DEBUG: Reset dice value after move")
-                
-                # Advance turn only if dice value was not 6
-                if not rolled_six:
-                    game.current_player = (game.current_player + 1) % len(game.players)
-                    print(f"DEBUG: Turn advanced to player {game.current_player} (next player)")
-                    
-                    # Send turn change notification
-                    socketio.emit('turn_changed', {
-                        'game_state': game.get_game_state(),
-                        'message': f"Turn passed to {list(game.players.values())[game.current_player]['color']}"
-                    }, room=game_id)
-                else:
-                    print(f"DEBUG: Player gets another turn because they rolled a 6")
-                    
-                    # Send same turn notification
-                    socketio.emit('turn_changed', {
-                        'game_state': game.get_game_state(),
-                        'message': f"Roll again! You got a 6."
-                    }, room=game_id)
-                
-            else:
+            if not play_move(game, color, piece, from_location):
                 emit('error', {'message': 'Invalid move!'})
 
 # Add a new endpoint to handle passing turn when no valid moves
 @socketio.on('pass_turn')
+@instrumented('pass_turn')
+@rate_limited('pass_turn')
+@traced(log)
 def handle_pass_turn():
     player_id = request.sid
-    if player_id in players:
-        game_id = players[player_id]
-        game = games[game_id]
+    with registry.locked_for_player(player_id) as game, outbox.collect():
+        if game is None:
+            return
         
         if game.game_started and not game.winner:
             # Check if it's the player's turn
-            current_player_id = list(game.players.keys())[game.current_player]
-            if player_id != current_player_id:
+            if player_id != game.current_player_id():
                 emit('error', {'message': 'Not your turn!'})
                 return
             
@@ -325,90 +790,270 @@ def handle_pass_turn():
                 return
             
             # Reset dice and advance turn
-            game.dice_value = 0
-            game.current_player = (game.current_player + 1) % len(game.players)
-            print(f"DEBUG: Turn passed to player {game.current_player}")
+            game.end_turn()
+            game_log.debug('Game %s: turn passed to seat %d', game.game_id, game.current_player)
             
-            socketio.emit('turn_changed', {
-                'game_state': game.get_game_state(),
-                'message': f"Turn passed to {list(game.players.values())[game.current_player]['color']}"
-            }, room=game_id)
+            broadcast_delta(game, 'turn_changed', {
+                'current_player': game.current_player,
+                'message': f"Turn passed to {game.current_color()}"
+            })
+
+@socketio.on('add_bot')
+@instrumented('add_bot')
+@rate_limited('add_bot')
+@traced(log)
+def handle_add_bot(data=None):
+    """Fill a free seat of the player's lobby with a bot, in the asked-for color or the first free one"""
+    with registry.locked_for_player(request.sid) as game, outbox.collect():
+        if game is None:
+            return
+        
+        if game.game_started:
+            emit('error', {'message': 'Bots can only join before the game starts'})
+            return
+        
+        color = (data or {}).get('color') or next((color for color in COLORS if color not in game.color_seats), None)
+        bot_id = f'bot-{uuid.uuid4().hex[:8]}'
+        if color and game.add_player(bot_id, f'Bot {color.title()}', color, bot=EXPECTIMAX):
+            log.info('Bot %s joined game %s as %s', bot_id, game.game_id, color)
+            announce_player(game, bot_id)
+        else:
+            emit('error', {'message': 'No free seat for a bot'})
+
+@socketio.on('find_game')
+@instrumented('find_game')
+@rate_limited('find_game')
+@traced(log)
+def handle_find_game(data):
+    """Seat the player in the fullest open public lobby, or open a new one"""
+    player_name = data['player_name']
+    color = data.get('color')
+    player_id = request.sid
+    
+    if registry.game_id_for(player_id) is not None:
+        emit('error', {'message': 'You are already in a game'})
+        return
+    matchmaker.enqueue(player_id)
+    
+    # A claimed lobby can fill up or start before we hold its lock; then try the next one
+    for _ in range(len(COLORS) * 2):
+        game_id, seat_color = matchmaker.claim(color)
+        if game_id is None:
+            break
+        with registry.locked(game_id) as game, outbox.collect():
+            if game is None:
+                matchmaker.remove(game_id)
+                continue
+            if not game.game_started and game.add_player(player_id, player_name, seat_color):
+                MATCHES.inc('joined')
+                seat_player(game, player_id)
+                announce_player(game, player_id)
+                return
+            matchmaker.update(game)
+    
+    if not reaper.make_room():
+        matchmaker.cancel(player_id)
+        emit('error', {'message': 'Server is full - please try again later'})
+        return
+    
+    game = LudoGame(new_game_id())
+    game.add_player(player_id, player_name, color if color in COLORS else COLORS[0])
+    open_game(game)
+    matchmaker.open(game)
+    MATCHES.inc('created')
+    log.info('Game %s opened by matchmaking for %s', game.game_id, player_id)
+    seat_player(game, player_id)
 
 @socketio.on('chat_message')
+@instrumented('chat_message')
+@rate_limited('chat_message')
+@traced(log)
 def handle_chat_message(data):
+    message = data.get('message') if isinstance(data, dict) else None
+    if not isinstance(message, str) or not message.strip() or len(message) > MAX_CHAT_CHARS:
+        emit('error', {'message': f'Chat messages must be 1 to {MAX_CHAT_CHARS} characters'})
+        return
+    
     player_id = request.sid
-    if player_id in players:
-        game_id = players[player_id]
-        if game_id in games:
-            game = games[game_id]
-            
-            if player_id in game.players:
-                player_name = game.players[player_id]['name']
-                message = data['message']
-                
-                socketio.emit('chat_message', {
-                    'player_name': player_name,
-                    'message': message,
-                    'timestamp': str(uuid.uuid4())[:8]
-                }, room=game_id)
-            else:
-                emit('error', {'message': 'Player not found in game'})
+    game_id = registry.game_id_for(player_id)
+    if game_id is None:
+        emit('error', {'message': 'Player not in any game'})
+        return
+    
+    game = registry.get(game_id)
+    if game is None:
+        emit('error', {'message': 'Game not found'})
+        return
+    
+    # Chat does not touch game state, so a racy read of the name is fine
+    player = game.players.get(player_id)
+    if player is not None:
+        sent_now = chat.append(game_id, player['name'], message)
+        if sent_now is not None:
+            emit_to_game(game_id, 'chat_message', sent_now)
         else:
-            emit('error', {'message': 'Game not found'})
+            ensure_background_task(run_chat_feed)
     else:
-        emit('error', {'message': 'Player not in any game'})
+        emit('error', {'message': 'Player not found in game'})
+
+@socketio.on('connect')
+@instrumented('connect')
+def handle_connect(auth=None):
+    # Binary broadcasts are opt-in: io({auth: {wire: 'msgpack'}})
+    if auth and auth.get('wire') == wire_format.MSGPACK and wire_format.available():
+        wire_formats[request.sid] = wire_format.MSGPACK
 
 @socketio.on('disconnect')
+@instrumented('disconnect')
+@traced(log)
 def handle_disconnect():
     player_id = request.sid
-    print(f"DEBUG: Player {player_id} disconnected")
+    log.debug('Player %s disconnected', player_id)
     
-    if player_id in players:
-        game_id = players[player_id]
-        print(f"DEBUG: Player was in game {game_id}")
-        
-        if game_id in games:
-            game = games[game_id]
-            player_info = game.players.get(player_id, {})
-            game.remove_player(player_id)
-            
-            print(f"DEBUG: Removed player from game. Remaining players: {len(game.players)}")
-            
-            socketio.emit('player_left', {
-                'player_name': player_info.get('name', 'Unknown'),
-                'game_state': game.get_game_state()
-            }, room=game_id)
-            
-            # Clean up empty games only if they've been started
-            # Keep unstarted games for players to rejoin
-            if len(game.players) == 0 and game.game_started:
-                print(f"DEBUG: Deleting empty started game {game_id}")
-                del games[game_id]
-            elif len(game.players) == 0:
-                print(f"DEBUG: Game {game_id} is empty but not started - keeping for reconnection")
-        
-        del players[player_id]
+    held = False
+    with registry.locked_for_player(player_id) as game, outbox.collect():
+        if game is not None and RECONNECT_GRACE > 0 and player_id in game.players:
+            # Mobile clients drop and reconnect all the time: keep the seat for a resume_session
+            held = True
+            game.hold_seat(player_id)
+            grace_timers.arm(player_id, RECONNECT_GRACE, game.game_id)
+            ensure_background_task(run_grace_timers)
+            broadcast_delta(game, 'player_away', {
+                'player_id': player_id,
+                'player_name': game.players[player_id]['name'],
+                'grace_seconds': RECONNECT_GRACE
+            })
+        elif game is not None:
+            release_seat(game, player_id)
     
-    print(f"DEBUG: Current games after disconnect: {list(games.keys())}")
+    if not held:
+        registry.unbind_player(player_id)
+    spectators.leave(player_id)
+    wire_formats.pop(player_id, None)
+    limiter.forget(player_id)
+    matchmaker.cancel(player_id)
 
 @socketio.on('rejoin_game')
+@instrumented('rejoin_game')
+@rate_limited('rejoin_game')
+@traced(log)
 def handle_rejoin_game(data):
+    """Re-enter a game's room; anyone not seated in it, or asking to spectate, watches read-only"""
     game_id = data['game_id'].lower()
     player_id = request.sid
     
-    print(f"DEBUG: Rejoin attempt for game {game_id} by player {player_id}")
-    print(f"DEBUG: Available games: {list(games.keys())}")
+    log.debug('Rejoin attempt for game %s by %s', game_id, player_id)
     
-    if game_id in games:
-        join_room(game_id)
-        game = games[game_id]
+    with registry.locked(game_id) as game:
+        if game is None:
+            emit('error', {'message': f'Cannot rejoin - game {game_id} not found'})
+            return
+        
+        if data.get('spectate') or registry.game_id_for(player_id) != game_id:
+            # Spectators get batched deltas in their own room and cannot act on the game
+            previous = spectators.join(player_id, game_id)
+            join_room(spectators.room(game_id))
+            ensure_background_task(run_spectator_feed)
+            role = 'spectator'
+        else:
+            previous = spectators.leave(player_id)
+            join_room(game_room(game_id))
+            role = 'player'
+        # A connection watches one game at a time
+        if previous is not None:
+            leave_room(spectators.room(previous))
         
         emit('game_rejoined', {
             'game_id': game_id,
-            'game_state': game.get_game_state()
+            'game_state': snapshot(game),
+            'role': role
         })
-    else:
-        emit('error', {'message': f'Cannot rejoin - game {game_id} not found'})
+        send_chat_history(game_id)
+
+@socketio.on('resume_session')
+@instrumented('resume_session')
+@rate_limited('resume_session')
+@traced(log)
+def handle_resume_session(data):
+    """Take back a seat with the token from create, join or an earlier resume, and catch up.
+
+    A client that sends the last version it applied gets only the events
+    after it; otherwise, or if they are no longer kept, a full snapshot.
+    """
+    game_id, old_id = sessions.verify(data.get('token'))
+    player_id = request.sid
+    version = data.get('version')
+    
+    if registry.game_id_for(player_id) not in (None, game_id):
+        emit('error', {'message': 'You are already in a game'})
+        return
+    
+    with registry.locked(game_id) as game, outbox.collect():
+        if game is None or old_id not in game.players:
+            emit('session_invalid', {'message': 'Your seat is no longer held - join the game again'})
+            return
+        
+        # Only a seat held for a disconnected player can be taken over; a live player keeps theirs.
+        # The old connection may just not have closed yet (the menu page's, say), so the client retries.
+        if old_id != player_id and not game.is_away(old_id):
+            emit('session_busy', {
+                'message': 'Your seat is still in use by another connection',
+                'retry_seconds': RESUME_RETRY_SECONDS
+            })
+            return
+        
+        grace_timers.cancel(old_id)
+        # Taken before the rebind below, whose own delta reaches the client through the room
+        missed = None
+        if isinstance(version, int) and version <= game.version:
+            missed = recent_events.since(game_id, version)
+        
+        if old_id != player_id:
+            game.rebind_player(old_id, player_id)
+            registry.unbind_player(old_id)
+            registry.bind_player(player_id, game_id)
+            log.info('Player %s resumed the seat of %s in game %s', player_id, old_id, game_id)
+            broadcast_delta(game, 'player_rebound', {
+                'old_player_id': old_id,
+                'player_id': player_id,
+                'player_name': game.players[player_id]['name']
+            })
+        join_room(game_room(game_id))
+        
+        resumed = {
+            'game_id': game_id,
+            'player_id': player_id,
+            'session_token': sessions.issue(game_id, player_id)
+        }
+        if missed is None:
+            resumed['game_state'] = snapshot(game)
+        else:
+            resumed['events'] = missed
+        emit('session_resumed', resumed)
+        send_chat_history(game_id)
+
+@socketio.on('sync_state')
+@instrumented('sync_state')
+@rate_limited('sync_state')
+@traced(log)
+def handle_sync_state(data=None):
+    """Resend the full snapshot to a client that detected a version gap"""
+    game_id = registry.game_id_for(request.sid) or spectators.game_id_for(request.sid)
+    if game_id is None and data:
+        game_id = str(data.get('game_id', '')).lower()
+    
+    with registry.locked(game_id) as game:
+        if game is not None:
+            emit('state_snapshot', {'game_state': snapshot(game)})
+        else:
+            emit('error', {'message': 'Cannot sync - game not found'})
 
 if __name__ == '__main__':
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    host = os.environ.get('HOST', '0.0.0.0')
+    port = int(os.environ.get('PORT', 5000))
+    get_logger('server').info('Serving on %s:%d with the %s backend', host, port, ASYNC_MODE)
+    socketio.run(app,
+                 debug=os.environ.get('FLASK_ENV', 'development') != 'production',
+                 host=host,
+                 port=port,
+                 allow_unsafe_werkzeug=True)
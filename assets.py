@@ -0,0 +1,98 @@
+"""
+Hashed, precompressed static bundles, as built by build_assets.py
+
+Each page loads one stylesheet bundle and one script bundle. The build
+writes every bundle to ``static/dist`` under a name carrying a hash of its
+content, next to gzip and brotli copies, and lists them in
+``manifest.json``. A built name never changes content, so bundles are
+served with a year-long immutable Cache-Control and a strong ETag, in the
+best encoding the client accepts. Files are read once and kept in memory.
+
+Without a build, pages link the source files of each bundle instead.
+"""
+import json
+import os
+import threading
+
+# bundle name -> source files under static/, in load order
+BUNDLES = {
+    'main.css': ('css/style.css',),
+    'main.js': ('js/main.js',),
+    'game.css': ('css/style.css', 'css/game.css'),
+    'game.js': ('js/game.js',)
+}
+
+# page -> the bundles it loads
+PAGES = {
+    'index': ('main.css', 'main.js'),
+    'game': ('game.css', 'game.js')
+}
+
+# Content-Encoding -> file suffix, most compact first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+MIMETYPES = {'.css': 'text/css', '.js': 'text/javascript'}
+
+
+def accepted_encodings(header):
+    """Codings an Accept-Encoding header allows, e.g. 'gzip, br;q=0.8, deflate;q=0' -> {'gzip', 'br'}"""
+    accepted = set()
+    for item in (header or '').split(','):
+        coding, *params = item.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip() and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class AssetManifest:
+    """The bundles listed in ``directory``/manifest.json; empty if nothing has been built"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.bundles = {}
+        path = os.path.join(directory, 'manifest.json')
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as manifest:
+                self.bundles = json.load(manifest)['bundles']
+        # built file name -> its bundle's manifest entry
+        self._files = {entry['file']: entry for entry in self.bundles.values()}
+        self._lock = threading.Lock()
+        self._contents = {}
+
+    def __bool__(self):
+        return bool(self.bundles)
+
+    def file_for(self, name):
+        """Built file name of bundle ``name``, or None if it has not been built"""
+        entry = self.bundles.get(name)
+        return entry['file'] if entry else None
+
+    def _read(self, filename):
+        with self._lock:
+            data = self._contents.get(filename)
+            if data is None:
+                with open(os.path.join(self.directory, filename), 'rb') as file:
+                    data = self._contents[filename] = file.read()
+            return data
+
+    def representation(self, filename, accept_encoding=''):
+        """``(body, content encoding or None, etag, mimetype)`` of a built file, or None if unknown"""
+        entry = self._files.get(filename)
+        if entry is None:
+            return None
+        mimetype = MIMETYPES.get(os.path.splitext(filename)[1], 'application/octet-stream')
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, suffix in ENCODINGS:
+            if encoding in entry['encodings'] and encoding in accepted:
+                # Each encoding is its own representation, so it gets its own strong ETag
+                return self._read(filename + suffix), encoding, f"{entry['hash']}-{encoding}", mimetype
+        return self._read(filename), None, entry['hash'], mimetype
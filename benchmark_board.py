@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: the compact LudoBoard against the nested-dict board it replaced
+
+Each workload runs the same random sequence of moves on both boards: pure
+moves, moves that ask who occupies the landing square and capture any
+opponents there, and serialization to the wire format.
+
+    python benchmark_board.py --moves 200000
+"""
+import argparse
+import copy
+import random
+import timeit
+
+from ludo_engine import COLORS, HOME, LudoBoard
+
+START = {'red': 0, 'blue': 13, 'green': 26, 'yellow': 39}
+
+
+class DictBoard:
+    """The previous representation: per-color home lists and path dicts"""
+
+    def __init__(self):
+        self.board = {color: {'home': [0, 1, 2, 3], 'path': {}, 'safe': []} for color in COLORS}
+
+    def move(self, color, piece, steps):
+        pieces = self.board[color]
+        if piece in pieces['home']:
+            pieces['home'].remove(piece)
+            pieces['path'][piece] = START[color]
+        else:
+            pieces['path'][piece] = (pieces['path'][piece] + steps) % 52
+        return pieces['path'][piece]
+
+    def occupants(self, square):
+        return [(color, piece) for color, pieces in self.board.items()
+                for piece, position in pieces['path'].items() if position == square]
+
+    def capture(self, square, color):
+        captured = [(other, piece) for other, piece in self.occupants(square) if other != color]
+        for other, piece in captured:
+            del self.board[other]['path'][piece]
+            self.board[other]['home'].append(piece)
+        return captured
+
+    def to_wire(self):
+        return copy.deepcopy(self.board)
+
+
+class CompactBoard:
+    """Same operations on LudoBoard"""
+
+    def __init__(self):
+        self.board = LudoBoard()
+
+    def move(self, color, piece, steps):
+        square = self.board.position(color, piece)
+        square = START[color] if square == HOME else (square + steps) % 52
+        self.board.move(color, piece, square)
+        return square
+
+    def occupants(self, square):
+        return self.board.occupants(square)
+
+    def capture(self, square, color):
+        return self.board.capture(square, color)
+
+    def to_wire(self):
+        return self.board.to_wire()
+
+
+def workload(moves, seed):
+    rng = random.Random(seed)
+    return [(rng.choice(COLORS), rng.randrange(4), rng.randint(1, 6)) for _ in range(moves)]
+
+
+def run_moves(board_class, plan):
+    board = board_class()
+    for color, piece, steps in plan:
+        board.move(color, piece, steps)
+
+
+def run_captures(board_class, plan):
+    board = board_class()
+    for color, piece, steps in plan:
+        square = board.move(color, piece, steps)
+        if board.occupants(square):
+            board.capture(square, color)
+
+
+def run_serialize(board_class, plan):
+    board = board_class()
+    for color, piece, steps in plan[:64]:
+        board.move(color, piece, steps)
+    for _ in range(len(plan) // 64):
+        board.to_wire()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--moves', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    plan = workload(args.moves, seed=7)
+    print(f"📏 {args.moves} operations per workload, best of {args.repeat}\n")
+    print(f"{'workload':<12} {'dict board':>12} {'LudoBoard':>12} {'speedup':>8}")
+
+    for name, runner in (('move', run_moves), ('capture', run_captures), ('serialize', run_serialize)):
+        timings = []
+        for board_class in (DictBoard, CompactBoard):
+            timings.append(min(timeit.repeat(lambda: runner(board_class, plan), number=1, repeat=args.repeat)))
+        dict_time, compact_time = timings
+        print(f"{name:<12} {dict_time * 1000:>10.1f}ms {compact_time * 1000:>10.1f}ms {dict_time / compact_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Connection-scaling benchmark for the Socket.IO async backends
+
+Starts app.py once per async mode (pinned to a single core), ramps up
+socketio.Client connections until the server stops accepting them or the
+target is reached, then measures how many request/ack round trips per second
+the connected clients sustain.
+
+    python benchmark_connections.py --modes threading eventlet gevent --connections 500
+"""
+import argparse
+import importlib.util
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import socketio
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+COLORS = ['red', 'blue', 'green', 'yellow']
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, core, extra_env=None):
+    """Launch app.py with the given async mode, pinned to ``core`` where supported"""
+    env = dict(os.environ, LUDO_ASYNC_MODE=mode, PORT=str(port), HOST='127.0.0.1', FLASK_ENV='production')
+    env.update(extra_env or {})
+
+    def pin():
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, {core})
+
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(APP_DIR, 'app.py')],
+        env=env, cwd=APP_DIR, preexec_fn=pin,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server for mode '{mode}' exited with code {server.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return server
+        except OSError:
+            time.sleep(0.1)
+
+    server.kill()
+    raise RuntimeError(f"server for mode '{mode}' did not start listening")
+
+
+def connect_clients(url, target, timeout):
+    """Open up to ``target`` clients, each owning a game, and stop at the first failure"""
+    clients = []
+    for index in range(target):
+        client = socketio.Client(reconnection=False)
+        created = threading.Event()
+        client.on('game_created', lambda data, created=created: created.set())
+        try:
+            client.connect(url, transports=['websocket'], wait_timeout=timeout)
+            client.emit('create_game', {'player_name': f'bench{index}', 'color': COLORS[index % 4]})
+            if not created.wait(timeout):
+                raise TimeoutError('no game_created')
+        except Exception as e:
+            print(f"   ⚠️  connection {index + 1} failed: {e}")
+            client.disconnect()
+            break
+        clients.append(client)
+    return clients
+
+
+def measure_throughput(clients, duration, timeout):
+    """Every client loops request/ack round trips for ``duration`` seconds"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker(client):
+        local = []
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                client.call('sync_state', timeout=timeout)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    return len(latencies) / elapsed, latencies, errors[0]
+
+
+def run_mode(mode, args):
+    port = free_port()
+    # Clients loop sync_state as fast as they can, which the default rate limits would throttle
+    server = start_server(mode, port, args.core, {'LUDO_RATE_LIMITS': 'off'})
+    clients = []
+    try:
+        url = f'http://127.0.0.1:{port}'
+        started = time.perf_counter()
+        clients = connect_clients(url, args.connections, args.timeout)
+        ramp = time.perf_counter() - started
+
+        if not clients:
+            return {'mode': mode, 'connections': 0, 'ramp': ramp, 'eps': 0.0, 'p50': 0.0, 'p99': 0.0, 'errors': 0}
+
+        eps, latencies, errors = measure_throughput(clients, args.duration, args.timeout)
+        latencies.sort()
+        return {
+            'mode': mode,
+            'connections': len(clients),
+            'ramp': ramp,
+            'eps': eps,
+            'p50': statistics.median(latencies) * 1000 if latencies else 0.0,
+            'p99': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+            'errors': errors
+        }
+    finally:
+        for client in clients:
+            client.disconnect()
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', nargs='+', default=['threading', 'eventlet', 'gevent'])
+    parser.add_argument('--connections', type=int, default=200, help='target number of concurrent clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of round trips per mode')
+    parser.add_argument('--timeout', type=float, default=5.0)
+    parser.add_argument('--core', type=int, default=0, help='CPU core the server is pinned to')
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.modes:
+        if mode != 'threading' and importlib.util.find_spec(mode) is None:
+            print(f"⏭️  Skipping {mode}: package not installed")
+            continue
+        print(f"🚀 Benchmarking async_mode={mode}")
+        results.append(run_mode(mode, args))
+
+    print("\n📊 Results (server pinned to one core)")
+    print(f"{'mode':<10} {'conns':>6} {'ramp s':>7} {'events/s':>9} {'p50 ms':>7} {'p99 ms':>7} {'errors':>6}")
+    for r in results:
+        print(f"{r['mode']:<10} {r['connections']:>6} {r['ramp']:>7.1f} {r['eps']:>9.0f} "
+              f"{r['p50']:>7.2f} {r['p99']:>7.2f} {r['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: journal write overhead and crash recovery time for many live games
+
+Seats --games four-player games, then plays --turns turns in every game
+round-robin (as concurrent rooms would interleave), once on the plain
+in-memory store and once on the journaled store. A snapshot is taken
+halfway, so recovery has to load the snapshot and replay the tail. The
+journaled store is abandoned without a clean shutdown, as after a crash,
+and recovered from disk. The recovered games are checked against the live
+ones.
+
+    python benchmark_journal.py --games 10000 --turns 40
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from game_journal import GameJournal
+from game_store import JournaledGameStore, MemoryGameStore
+from ludo_engine import COLORS, LudoGame
+
+
+def take_turn(game, rng):
+    color = game.current_color()
+    dice_value = game.roll_dice()
+    moves = game.legal_moves(color)
+    if not moves:
+        game.end_turn()
+        return
+    piece, from_location = rng.choice(moves)
+    game.move_piece(game.current_player_id(), color, piece, from_location)
+    if not game.winner:
+        game.end_turn(extra_turn=dice_value == 6)
+
+
+def run(store, games, turns, snapshot_at=None):
+    rng = random.Random(1)
+    started = time.perf_counter()
+    for index in range(games):
+        game = LudoGame(f'game{index:05d}', rng=random.Random(index))
+        game.add_player(f'{index}-0', 'P0', COLORS[0])
+        store.add(game)
+        for seat, color in enumerate(COLORS[1:], start=1):
+            game.add_player(f'{index}-{seat}', f'P{seat}', color)
+        game.start_game()
+
+    snapshot_seconds = 0.0
+    game_ids = store.game_ids()
+    for turn in range(turns):
+        if turn == snapshot_at:
+            snapshot_started = time.perf_counter()
+            store.journal.snapshot(store.snapshot_games())
+            snapshot_seconds = time.perf_counter() - snapshot_started
+        for game_id in game_ids:
+            with store.lock(game_id):
+                game = store.load(game_id)
+                if not game.winner:
+                    take_turn(game, rng)
+    return time.perf_counter() - started, snapshot_seconds
+
+
+def directory_size(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--turns', type=int, default=40)
+    parser.add_argument('--flush-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    memory_seconds, _ = run(MemoryGameStore(), args.games, args.turns)
+
+    directory = tempfile.mkdtemp(prefix='ludo-journal-')
+    try:
+        store = JournaledGameStore(directory, LudoGame.from_dict, flush_interval=args.flush_ms / 1000,
+                                   snapshot_interval=float('inf'))
+        journal_seconds, snapshot_seconds = run(store, args.games, args.turns, snapshot_at=args.turns // 2)
+        # Wait for the writer to drain, then walk away without closing, like a crash
+        store.journal.flush()
+        expected = {game_id: store.load(game_id).to_dict() for game_id in store.game_ids()}
+        records, syncs = store.journal.records_written, store.journal.syncs
+        size = directory_size(directory)
+
+        started = time.perf_counter()
+        recovered = GameJournal(directory).recover(LudoGame.from_dict)
+        recovery_seconds = time.perf_counter() - started
+    finally:
+        shutil.rmtree(directory)
+
+    mismatches = sum(1 for game_id, state in expected.items()
+                     if {**recovered[game_id].to_dict(), 'last_activity': 0} != {**state, 'last_activity': 0})
+
+    mutations = records
+    print(f"🎲 {args.games} games x {args.turns} turns, {mutations:,} journaled mutations")
+    print(f"   in-memory store : {memory_seconds:7.2f}s")
+    print(f"   journaled store : {journal_seconds:7.2f}s  "
+          f"(+{(journal_seconds / memory_seconds - 1) * 100:.0f}%, "
+          f"{(journal_seconds - memory_seconds) / mutations * 1e6:.1f}us per mutation)")
+    print(f"   fsyncs          : {syncs:,} ({mutations / max(syncs, 1):.0f} records per sync)")
+    print(f"   snapshot        : {snapshot_seconds * 1000:7.1f}ms   on disk: {size / 1e6:.1f}MB")
+    print(f"⏱️  Recovery of {len(recovered)} games: {recovery_seconds:.2f}s")
+    print("✅ Recovered state matches" if not mismatches else f"❌ {mismatches} games differ after recovery")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serialization CPU of full-state emits, fresh versus cached snapshots
+
+Plays a game move by move and, after every move, encodes --emits snapshot
+packets the way python-socketio does for joins, rejoins and resyncs. The
+baseline rebuilds get_game_state() and runs the stdlib encoder for every
+emit; the cached path encodes the state once per version and splices that
+text into each packet.
+
+    python benchmark_snapshots.py --moves 2000 --emits 1 4 16
+"""
+import argparse
+import json
+import random
+import time
+
+from socketio import packet
+
+import json_codec
+from ludo_engine import COLORS, LudoGame
+
+
+class StdlibPacket(packet.Packet):
+    json = json
+
+
+class CachedPacket(packet.Packet):
+    json = json_codec
+
+
+def game_positions(moves, seed):
+    """Yield a game after each of ``moves`` moves, starting new games as they finish"""
+    rng = random.Random(seed)
+    played = 0
+    while True:
+        game = LudoGame('benchmark', rng=random.Random(rng.random()))
+        for seat, color in enumerate(COLORS):
+            game.add_player(f'player{seat}', f'Player {seat}', color)
+        game.start_game()
+        while not game.winner:
+            color = game.current_color()
+            dice_value = game.roll_dice()
+            moves_available = game.legal_moves(color)
+            if moves_available:
+                piece, from_location = rng.choice(moves_available)
+                game.move_piece(game.current_player_id(), color, piece, from_location)
+            if not game.winner:
+                game.end_turn(extra_turn=bool(moves_available) and dice_value == 6)
+            yield game
+            played += 1
+            if played == moves:
+                return
+
+
+def run(moves, emits, cached, seed=1):
+    started = time.perf_counter()
+    size = 0
+    for game in game_positions(moves, seed):
+        for _ in range(emits):
+            if cached:
+                data = ['state_snapshot', {'game_state': json_codec.RawJSON(game.state_json())}]
+                encoded = CachedPacket(packet.EVENT, data=data).encode()
+            else:
+                data = ['state_snapshot', {'game_state': game.get_game_state()}]
+                encoded = StdlibPacket(packet.EVENT, data=data).encode()
+            size += len(encoded)
+    return time.perf_counter() - started, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--moves', type=int, default=2000)
+    parser.add_argument('--emits', type=int, nargs='+', default=[1, 4, 16],
+                        help='snapshot emits per version (joins, rejoins, resyncs, spectators)')
+    args = parser.parse_args()
+
+    # Time the game play alone so it can be subtracted
+    play_seconds, _ = run(args.moves, 0, cached=False)
+    print(f"📏 {args.moves} moves, snapshot emits per version: {args.emits}\n")
+    print(f"{'emits':>5} {'fresh us/move':>14} {'cached us/move':>15} {'saved us/move':>14} {'speedup':>8}")
+    for emits in args.emits:
+        fresh_seconds, fresh_bytes = run(args.moves, emits, cached=False)
+        cached_seconds, cached_bytes = run(args.moves, emits, cached=True)
+        assert fresh_bytes == cached_bytes, "cached packets differ from fresh ones"
+        fresh = (fresh_seconds - play_seconds) / args.moves * 1e6
+        cached = (cached_seconds - play_seconds) / args.moves * 1e6
+        print(f"{emits:>5} {fresh:>14.1f} {cached:>15.1f} {fresh - cached:>14.1f} {fresh / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: turn deadlines for many games on the timing wheel versus a heap
+
+Arms --timers deadlines (one per game, 1 to --max-seconds away), re-arms
+every one of them --rearms times as turns change, cancels a tenth as games
+end, then advances a fake clock tick by tick until every deadline has
+fired. The same schedule runs on a min-heap with lazy cancellation (the
+structure the game reaper uses), where a re-arm pushes a new entry and
+leaves the old one to be skipped when it surfaces.
+
+    python benchmark_timers.py --timers 100000 --rearms 3
+"""
+import argparse
+import heapq
+import random
+import time
+
+from timing_wheel import TimingWheel
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class HeapTimers:
+    """Keyed deadlines in a heap; cancelled and replaced entries are skipped lazily"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self._heap = []
+        self._live = {}     # key -> deadline of its current entry
+
+    def __len__(self):
+        return len(self._live)
+
+    def arm(self, key, delay, payload=None):
+        deadline = self.clock() + delay
+        self._live[key] = deadline
+        heapq.heappush(self._heap, (deadline, key, payload))
+
+    def cancel(self, key):
+        return self._live.pop(key, None) is not None
+
+    def advance(self, now=None):
+        now = self.clock() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, key, payload = heapq.heappop(self._heap)
+            if self._live.get(key) == deadline:
+                del self._live[key]
+                due.append((key, payload))
+        return due
+
+
+def run(timers, schedule, cancelled, tick, clock):
+    started = time.perf_counter()
+    for key, delay in schedule[0]:
+        timers.arm(key, delay)
+    arm_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for batch in schedule[1:]:
+        for key, delay in batch:
+            timers.arm(key, delay)
+    rearm_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for key in cancelled:
+        timers.cancel(key)
+    cancel_seconds = time.perf_counter() - started
+
+    fired = ticks = 0
+    started = time.perf_counter()
+    while len(timers):
+        clock.now += tick
+        fired += len(timers.advance())
+        ticks += 1
+    advance_seconds = time.perf_counter() - started
+    return {'arm': arm_seconds, 'rearm': rearm_seconds, 'cancel': cancel_seconds,
+            'advance': advance_seconds, 'ticks': ticks, 'fired': fired}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--timers', type=int, default=100000)
+    parser.add_argument('--rearms', type=int, default=3, help='times every timer is re-armed')
+    parser.add_argument('--max-seconds', type=float, default=120)
+    parser.add_argument('--tick', type=float, default=0.25)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    schedule = [[(key, rng.uniform(1, args.max_seconds)) for key in range(args.timers)]
+                for _ in range(args.rearms + 1)]
+    cancelled = rng.sample(range(args.timers), args.timers // 10)
+    rearms = args.timers * args.rearms
+
+    print(f'⏱️  {args.timers} timers, {rearms} re-arms, {len(cancelled)} cancels, '
+          f'{args.tick}s ticks over {args.max_seconds:.0f}s')
+    print(f"{'':<8}{'arm':>12}{'re-arm':>12}{'cancel':>12}{'per tick':>12}{'fired':>9}")
+    for name, factory in (('wheel', lambda clock: TimingWheel(args.tick, clock)), ('heap', HeapTimers)):
+        clock = FakeClock()
+        result = run(factory(clock), schedule, cancelled, args.tick, clock)
+        print(f"{name:<8}"
+              f"{result['arm'] / args.timers * 1e9:>9.0f} ns"
+              f"{result['rearm'] / max(rearms, 1) * 1e9:>9.0f} ns"
+              f"{result['cancel'] / max(len(cancelled), 1) * 1e9:>9.0f} ns"
+              f"{result['advance'] / result['ticks'] * 1e6:>9.0f} µs"
+              f"{result['fired']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bytes and encode time per piece_moved packet for each wire format
+
+Plays games move by move and encodes every piece_moved broadcast the way
+python-socketio does: stdlib JSON text, json_codec (orjson when installed),
+msgpack with the JSON-shaped map, and msgpack with the compact positional
+schema from wire_format.py.
+
+    python benchmark_wire.py --moves 5000
+"""
+import argparse
+import json
+import random
+import time
+
+from socketio import packet
+
+import json_codec
+import wire_format
+from ludo_engine import COLORS, LudoGame
+
+
+class StdlibPacket(packet.Packet):
+    json = json
+
+
+class CodecPacket(packet.Packet):
+    json = json_codec
+
+
+def piece_moved_deltas(moves, seed):
+    """Collect the piece_moved payloads of ``moves`` moves, as handle_move_piece builds them"""
+    rng = random.Random(seed)
+    deltas = []
+    while len(deltas) < moves:
+        game = LudoGame('benchmark', rng=random.Random(rng.random()))
+        for seat, color in enumerate(COLORS):
+            game.add_player(f'player{seat}', f'Player {seat}', color)
+        game.start_game()
+        while not game.winner and len(deltas) < moves:
+            color = game.current_color()
+            dice_value = game.roll_dice()
+            moves_available = game.legal_moves(color)
+            if moves_available:
+                piece, from_location = rng.choice(moves_available)
+                result = game.move_piece(game.current_player_id(), color, piece, from_location)
+                deltas.append({'color': color, 'piece': piece, 'from': from_location, 'to': result['to'],
+                               'captured': result['captured'], 'dice_value': dice_value,
+                               'winner': game.winner, 'version': game.version})
+            if not game.winner:
+                game.end_turn(extra_turn=bool(moves_available) and dice_value == 6)
+    return deltas
+
+
+def encoders():
+    yield 'json (stdlib)', lambda data: StdlibPacket(packet.EVENT, data=['piece_moved', data]).encode()
+    yield f'json ({json_codec.BACKEND})', lambda data: CodecPacket(packet.EVENT, data=['piece_moved', data]).encode()
+    if wire_format.available():
+        msgpack = wire_format.msgpack
+        yield 'msgpack map', lambda data: binary_packet(msgpack.packb(data, use_bin_type=True))
+        yield 'msgpack compact', lambda data: binary_packet(wire_format.pack('piece_moved', data))
+
+
+def binary_packet(blob):
+    # A binary event is a placeholder text packet plus the raw attachment
+    return CodecPacket(packet.EVENT, data=['piece_moved', blob]).encode()
+
+
+def size(encoded):
+    parts = encoded if isinstance(encoded, list) else [encoded]
+    return sum(len(part.encode() if isinstance(part, str) else part) for part in parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--moves', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    deltas = piece_moved_deltas(args.moves, args.seed)
+    if not wire_format.available():
+        print("⚠️  msgpack is not installed; only the JSON formats are measured")
+    print(f"📏 {len(deltas)} piece_moved packets\n")
+    print(f"{'format':<18} {'bytes/packet':>13} {'us/packet':>10}")
+    for name, encode in encoders():
+        started = time.perf_counter()
+        total = sum(size(encode(data)) for data in deltas)
+        elapsed = time.perf_counter() - started
+        print(f"{name:<18} {total / len(deltas):>13.1f} {elapsed / len(deltas) * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Server-side bot players: expectimax search run in a process pool
+
+A bot is an ordinary seat whose player entry carries ``'bot': 'expectimax'``.
+When it has to choose between several legal moves, the choice comes from
+an expectimax search over the dice: the bot's own moves, then each roll
+the next player could get (averaged) and that player's best reply, and so
+on. Every seated color maximizes its own score, and a score is its
+strength minus the strongest opponent's. Search deepens one ply at a time
+until the per-move time budget runs out, and the deepest finished ply
+decides.
+
+Searches are pure CPU work, so they run in a ``ProcessPoolExecutor`` and
+never inside a Socket.IO handler. ``BotPool.poll`` sends every decision
+queued since the last poll as at most one batch per worker, so a hundred
+bot games cost a handful of pickles per tick instead of one per move. Each
+worker keeps a transposition cache keyed by the board position, which
+outlives single decisions: the positions after one move are the ones the
+next search starts from.
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ludo_engine import (COLOR_INDEX, COLORS, FINISHED, HOME, PIECES_PER_COLOR, PROGRESS, SAFE_SQUARES,
+                         TRACK_SQUARES, LudoBoard)
+from logging_setup import get_logger
+from metrics import REGISTRY
+
+log = get_logger('bots')
+
+EXPECTIMAX = 'expectimax'
+DICE = range(1, 7)
+MAX_DEPTH = 4
+
+# Evaluation weights, in route steps
+OUT_BONUS = 10
+FINISH_BONUS = 70
+WIN_SCORE = 10000
+
+# Per-process transposition cache: (positions, colors, mover, dice, depth) -> value per color
+CACHE_LIMIT = 100_000
+_cache = {}
+
+DECISIONS = REGISTRY.counter('ludo_bot_decisions_total', 'Bot move decisions by outcome', ('outcome',))
+DECISION_SECONDS = REGISTRY.histogram('ludo_bot_decision_seconds', 'Time from queuing a bot decision to its result')
+
+
+class OutOfTime(Exception):
+    pass
+
+
+def strength(board, color_index):
+    """How far along a color is: route progress, pieces out and finished, less what is exposed to capture"""
+    score = 0.0
+    progress = PROGRESS[color_index]
+    own = COLORS[color_index]
+    start = color_index * PIECES_PER_COLOR
+    for square in board.positions[start:start + PIECES_PER_COLOR]:
+        if square == HOME:
+            continue
+        if square == FINISHED:
+            score += FINISH_BONUS
+            continue
+        value = OUT_BONUS + progress[square]
+        score += value
+        if square < TRACK_SQUARES and square not in SAFE_SQUARES:
+            # Each distance 1-6 with an opponent behind is one roll in six that captures
+            threats = sum(1 for back in DICE if board.opponents_at((square - back) % TRACK_SQUARES, own))
+            score -= value * threats / 6
+    return score
+
+
+def evaluate(board, colors):
+    """Score of every seated color (indexed by color index): its strength minus the best opponent's"""
+    strengths = {color_index: strength(board, color_index) for color_index in colors}
+    values = [0.0] * len(COLORS)
+    for color_index, own in strengths.items():
+        values[color_index] = own - max(value for other, value in strengths.items() if other != color_index)
+    return values
+
+
+def _won(colors, winner):
+    return [WIN_SCORE if color_index == winner else -WIN_SCORE if color_index in colors else 0.0
+            for color_index in range(len(COLORS))]
+
+
+def distinct_moves(board, color, dice):
+    """Legal (piece, destination) pairs, keeping one piece per starting square"""
+    seen = set()
+    moves = []
+    for piece, square in board.legal_moves(color, dice):
+        source = board.position(color, piece)
+        if source not in seen:
+            seen.add(source)
+            moves.append((piece, square))
+    return moves
+
+
+class _Search:
+    def __init__(self, colors, deadline):
+        self.colors = colors
+        self.deadline = deadline
+        self.nodes = 0
+
+    def next_color(self, color_index):
+        return self.colors[(self.colors.index(color_index) + 1) % len(self.colors)]
+
+    def after_move(self, board, mover, piece, square, dice, depth):
+        color = COLORS[mover]
+        child = board.copy()
+        child.apply_move(color, piece, square)
+        if square == FINISHED and child.count(color, FINISHED) == PIECES_PER_COLOR:
+            return _won(self.colors, mover)
+        # A played six earns another roll
+        return self.chance(child, mover if dice == 6 else self.next_color(mover), depth - 1)
+
+    def chance(self, board, mover, depth):
+        if depth <= 0:
+            return evaluate(board, self.colors)
+        total = [0.0] * len(COLORS)
+        for dice in DICE:
+            for color_index, value in enumerate(self.decide(board, mover, dice, depth)):
+                total[color_index] += value
+        return [value / len(DICE) for value in total]
+
+    def decide(self, board, mover, dice, depth):
+        key = (board.positions.tobytes(), self.colors, mover, dice, depth)
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+
+        self.nodes += 1
+        if self.nodes % 256 == 0 and time.perf_counter() > self.deadline:
+            raise OutOfTime
+
+        best = None
+        for piece, square in distinct_moves(board, COLORS[mover], dice):
+            value = self.after_move(board, mover, piece, square, dice, depth)
+            if best is None or value[mover] > best[mover]:
+                best = value
+        if best is None:
+            # No legal move: the turn passes
+            best = self.chance(board, self.next_color(mover), depth - 1)
+
+        if len(_cache) >= CACHE_LIMIT:
+            _cache.clear()
+        _cache[key] = best
+        return best
+
+
+def choose_move(positions, colors, mover, dice, budget=None, max_depth=MAX_DEPTH):
+    """Pick the piece ``mover`` (a color index) should play with ``dice``.
+
+    ``positions`` is the bytes of a board's position array and ``colors``
+    the seated color indexes in turn order. Without a ``budget`` (seconds)
+    the search always goes ``max_depth`` plies deep, so the result is
+    reproducible. Returns ``(piece, depth searched)``; the piece is None if
+    nothing can move.
+    """
+    board = LudoBoard.from_positions(positions)
+    moves = distinct_moves(board, COLORS[mover], dice)
+    if len(moves) <= 1:
+        return (moves[0][0] if moves else None), 0
+
+    deadline = time.perf_counter() + budget if budget is not None else float('inf')
+    choice, reached = moves[0][0], 0
+    for depth in range(1, max_depth + 1):
+        # One ply is a greedy look at the moves themselves and always completes
+        search = _Search(tuple(colors), deadline if depth > 1 else float('inf'))
+        try:
+            values = [(search.after_move(board, mover, piece, square, dice, depth)[mover], piece)
+                      for piece, square in moves]
+        except OutOfTime:
+            break
+        choice = max(values, key=lambda value: value[0])[1]
+        reached = depth
+    return choice, reached
+
+
+def decide(request):
+    piece, _ = choose_move(request['positions'], request['colors'], request['mover'], request['dice'],
+                           budget=request.get('budget'), max_depth=request.get('max_depth', MAX_DEPTH))
+    return piece
+
+
+def decide_batch(requests):
+    """Worker entry point: one decision per request, sharing this process's cache"""
+    return [decide(request) for request in requests]
+
+
+def decision_request(game, budget=None, max_depth=MAX_DEPTH):
+    """What a worker needs to choose the current player's move: picklable and independent of the game"""
+    colors = tuple(COLOR_INDEX[game.players[player_id]['color']] for player_id in game.seats if player_id is not None)
+    return {
+        'positions': game.board.positions.tobytes(),
+        'colors': colors,
+        'mover': COLOR_INDEX[game.current_color()],
+        'dice': game.dice_value,
+        'budget': budget,
+        'max_depth': max_depth
+    }
+
+
+class BotPool:
+    """Bot decisions in worker processes, batched between polls.
+
+    ``submit`` queues a decision under a caller-chosen key; ``poll`` sends
+    the queue to the workers and returns ``[(key, piece)]`` for decisions
+    that have finished. The piece is None if the search failed, so callers
+    fall back to a legal move of their own.
+    """
+
+    def __init__(self, workers=2, budget=0.2, max_depth=MAX_DEPTH):
+        self.workers = workers
+        self.budget = budget
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = []      # (key, request, queued at)
+        self._running = []      # (future, [(key, queued at)])
+
+    def __len__(self):
+        return len(self._pending) + sum(len(keys) for _, keys in self._running)
+
+    def __contains__(self, key):
+        """Whether a decision under ``key`` is queued or being searched"""
+        with self._lock:
+            return (any(queued == key for queued, _, _ in self._pending)
+                    or any(running == key for _, keys in self._running for running, _ in keys))
+
+    def _pool(self):
+        if self._executor is None:
+            # Fork where available: spawned workers would re-run the server's
+            # __main__ module, stores and all, just to call decide_batch
+            context = (multiprocessing.get_context('fork')
+                       if 'fork' in multiprocessing.get_all_start_methods() else None)
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=context)
+        return self._executor
+
+    def submit(self, key, game):
+        request = decision_request(game, budget=self.budget, max_depth=self.max_depth)
+        with self._lock:
+            self._pending.append((key, request, time.monotonic()))
+
+    def poll(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if pending:
+                # One batch per worker; each worker works through its batch in order
+                batches = min(self.workers, len(pending))
+                for index in range(batches):
+                    chunk = pending[index::batches]
+                    future = self._pool().submit(decide_batch, [request for _, request, _ in chunk])
+                    self._running.append((future, [(key, queued) for key, _, queued in chunk]))
+
+            finished, running = [], []
+            for future, keys in self._running:
+                if not future.done():
+                    running.append((future, keys))
+                    continue
+                try:
+                    pieces = future.result()
+                    outcome = 'decided'
+                except Exception:
+                    log.exception('Bot decisions failed')
+                    pieces = [None] * len(keys)
+                    outcome = 'failed'
+                    # A dead worker breaks the whole executor; start a fresh one next time
+                    self._discard_pool()
+                now = time.monotonic()
+                for (key, queued), piece in zip(keys, pieces):
+                    DECISIONS.inc(outcome)
+                    DECISION_SECONDS.observe(now - queued)
+                    finished.append((key, piece))
+            self._running = running
+        return finished
+
+    def _discard_pool(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def shutdown(self):
+        with self._lock:
+            self._discard_pool()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Build the static bundles: minify, hash, precompress, and report page weight
+
+Concatenates the sources of each bundle in assets.BUNDLES, minifies them,
+and writes ``static/dist/<name>.<hash>.<ext>`` with ``.gz`` and (when the
+``brotli`` package is installed) ``.br`` copies compressed at the highest
+level, plus ``manifest.json``. The server picks the manifest up at start.
+Builds are reproducible: the same sources give the same names and bytes.
+
+The minifiers are deliberately conservative. They drop comments and
+indentation and squeeze the whitespace between tokens, but copy strings,
+template literals and regular expressions verbatim. Script line breaks are
+kept, so automatic semicolon insertion still sees them.
+
+    python build_assets.py            # build and print the page-weight report
+    python build_assets.py --json     # the report as JSON
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+from assets import BUNDLES, PAGES
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(ROOT, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+HASH_LENGTH = 12
+
+# Characters after which a slash starts a regular expression rather than a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+
+
+def _word(char):
+    return char.isalnum() or char in '_$' or ord(char) > 127
+
+
+def _skip_quoted(source, start):
+    """Index just past the string that opens at ``start``"""
+    quote = source[start]
+    index = start + 1
+    while index < len(source):
+        char = source[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == quote:
+            return index + 1
+        if quote == '`' and source.startswith('${', index):
+            index = _skip_code(source, index + 2)
+            continue
+        index += 1
+    return index
+
+
+def _skip_code(source, start):
+    """Index just past the ``}`` closing a template substitution that starts at ``start``"""
+    depth = 0
+    index = start
+    while index < len(source):
+        char = source[index]
+        if char in '\'"`':
+            index = _skip_quoted(source, index)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            if depth == 0:
+                return index + 1
+            depth -= 1
+        index += 1
+    return index
+
+
+def _skip_regex(source, start):
+    index = start + 1
+    in_class = False
+    while index < len(source) and source[index] != '\n':
+        char = source[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            index += 1
+            while index < len(source) and source[index].isalpha():
+                index += 1
+            return index
+        index += 1
+    return index
+
+
+def minify_js(source):
+    out = []
+    last = ''           # last character written, '' at the start of a line
+    space = False       # whitespace seen since the last character written
+    index = 0
+    while index < len(source):
+        char = source[index]
+        if char == '\n':
+            if last:
+                out.append('\n')
+            last, space = '', False
+            index += 1
+        elif char in ' \t\r':
+            space = True
+            index += 1
+        elif source.startswith('//', index):
+            newline = source.find('\n', index)
+            index = len(source) if newline < 0 else newline
+        elif source.startswith('/*', index):
+            end = source.find('*/', index + 2)
+            index = len(source) if end < 0 else end + 2
+            space = True
+        else:
+            if char in '\'"`':
+                end = _skip_quoted(source, index)
+            elif char == '/' and (not last or last in REGEX_PRECEDERS):
+                end = _skip_regex(source, index)
+            else:
+                end = index + 1
+            # Keep one space only where dropping it would join two tokens
+            if space and last and (_word(last) and _word(char) or last + char in ('++', '--', '+-', '-+')):
+                out.append(' ')
+            out.append(source[index:end])
+            last = source[end - 1]
+            space = False
+            index = end
+    return ''.join(out).strip() + '\n'
+
+
+def minify_css(source):
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = re.sub(r':\s+', ':', source)
+    return source.replace(';}', '}').strip() + '\n'
+
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+
+def read_sources(name, static_dir=STATIC_DIR):
+    parts = []
+    for source in BUNDLES[name]:
+        with open(os.path.join(static_dir, source), encoding='utf-8') as file:
+            parts.append(file.read())
+    return parts
+
+
+def compress(data):
+    """{encoding: bytes} at the highest levels; gzip without a timestamp, so builds are reproducible"""
+    compressed = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed['br'] = brotli.compress(data, quality=11)
+    return compressed
+
+
+def build(static_dir=STATIC_DIR, dist_dir=DIST_DIR):
+    """Write every bundle and the manifest to ``dist_dir``; returns the manifest"""
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+    os.makedirs(dist_dir)
+
+    bundles = {}
+    for name in BUNDLES:
+        stem, extension = os.path.splitext(name)
+        parts = read_sources(name, static_dir)
+        minified = '\n'.join(MINIFIERS[extension](part) for part in parts).encode('utf-8')
+        digest = hashlib.sha256(minified).hexdigest()[:HASH_LENGTH]
+        filename = f'{stem}.{digest}{extension}'
+
+        with open(os.path.join(dist_dir, filename), 'wb') as file:
+            file.write(minified)
+        sizes = {'source': sum(len(part.encode('utf-8')) for part in parts), 'minified': len(minified)}
+        compressed = compress(minified)
+        for encoding, data in compressed.items():
+            with open(os.path.join(dist_dir, filename + ('.gz' if encoding == 'gzip' else '.br')), 'wb') as file:
+                file.write(data)
+            sizes[encoding] = len(data)
+
+        bundles[name] = {
+            'file': filename,
+            'hash': digest,
+            'sources': list(BUNDLES[name]),
+            'encodings': sorted(compressed),
+            'sizes': sizes
+        }
+
+    manifest = {'bundles': bundles}
+    with open(os.path.join(dist_dir, 'manifest.json'), 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    return manifest
+
+
+def page_weight(manifest):
+    """First-party bytes and requests per page: before (source files) and after (bundles, per encoding)"""
+    report = {}
+    for page, names in PAGES.items():
+        entries = [manifest['bundles'][name] for name in names]
+        weight = {
+            'source_files': len({source for entry in entries for source in entry['sources']}),
+            'bundles': len(entries)
+        }
+        for key in ('source', 'minified', 'gzip', 'br'):
+            if all(key in entry['sizes'] for entry in entries):
+                weight[key] = sum(entry['sizes'][key] for entry in entries)
+        report[page] = weight
+    return report
+
+
+def print_report(report):
+    def kb(value):
+        return f'{value / 1024:.1f} KB' if value is not None else '-'
+
+    print('📦 Page weight of first-party CSS and JS (CDN scripts and fonts not included)')
+    print(f"{'page':<8}{'requests':>10}{'source':>11}{'minified':>11}{'gzip':>11}{'brotli':>11}")
+    for page, weight in report.items():
+        requests = f"{weight['source_files']} → {weight['bundles']}"
+        print(f"{page:<8}{requests:>10}{kb(weight['source']):>11}{kb(weight['minified']):>11}"
+              f"{kb(weight['gzip']):>11}{kb(weight.get('br')):>11}")
+    if brotli is None:
+        print('   (install brotli to also precompress .br files)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--out', default=DIST_DIR, help='output directory (default static/dist)')
+    parser.add_argument('--json', action='store_true', help='print the page-weight report as JSON')
+    args = parser.parse_args()
+
+    manifest = build(dist_dir=args.out)
+    report = page_weight(manifest)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, entry in manifest['bundles'].items():
+            print(f"   {name:<9} → {entry['file']}")
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Per-game chat history in bounded ring buffers, with throttled delivery
+
+Each game keeps its last ``max_messages`` chat messages in a deque, and
+never more than ``max_bytes`` of message text and names: the oldest
+messages are dropped first, so memory per game stays fixed however chatty
+the room is. Every message gets a per-game sequence number and a
+millisecond timestamp that never goes backwards within a game, even if the
+wall clock does.
+
+Delivery is throttled per game. The first message after a quiet
+``interval`` is sent at once. Messages that follow within the interval are
+held and sent together as one ``chat_batch`` by a background tick, so a
+busy room costs one emit per interval instead of one per message.
+
+History lives in the process that served the chat. With several workers,
+each one remembers the messages its own players sent.
+"""
+import threading
+import time
+from collections import deque
+
+# Rough per-message overhead of the dict and its fields, on top of the text
+MESSAGE_OVERHEAD = 64
+
+
+class _Room:
+    __slots__ = ('messages', 'size', 'seq', 'last_timestamp', 'last_sent', 'pending')
+
+    def __init__(self, max_messages):
+        self.messages = deque(maxlen=max_messages)
+        self.size = 0
+        self.seq = 0
+        self.last_timestamp = 0
+        self.last_sent = float('-inf')
+        self.pending = []
+
+
+def _cost(message):
+    return len(message['player_name']) + len(message['message']) + MESSAGE_OVERHEAD
+
+
+class ChatLog:
+    def __init__(self, max_messages=50, max_bytes=16 * 1024, interval=0.25, clock=time.monotonic, wall_clock=time.time):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._rooms = {}
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def size(self, game_id):
+        room = self._rooms.get(game_id)
+        return room.size if room is not None else 0
+
+    def append(self, game_id, player_name, text):
+        """Record a message; returns it if it should be sent now, None if it waits for the next batch"""
+        now = self.clock()
+        with self._lock:
+            room = self._rooms.get(game_id)
+            if room is None:
+                room = self._rooms[game_id] = _Room(self.max_messages)
+
+            room.seq += 1
+            room.last_timestamp = max(room.last_timestamp, int(self.wall_clock() * 1000))
+            message = {'seq': room.seq, 'player_name': player_name, 'message': text,
+                       'timestamp': room.last_timestamp}
+
+            if len(room.messages) == room.messages.maxlen:
+                room.size -= _cost(room.messages[0])
+            room.messages.append(message)
+            room.size += _cost(message)
+            while room.size > self.max_bytes and len(room.messages) > 1:
+                room.size -= _cost(room.messages.popleft())
+
+            if not room.pending and now - room.last_sent >= self.interval:
+                room.last_sent = now
+                return message
+            room.pending.append(message)
+            return None
+
+    def history(self, game_id):
+        with self._lock:
+            room = self._rooms.get(game_id)
+            return list(room.messages) if room is not None else []
+
+    def drain(self):
+        """Take the held messages of every game whose interval has passed: [(game_id, messages)]"""
+        now = self.clock()
+        batches = []
+        with self._lock:
+            for game_id, room in self._rooms.items():
+                if room.pending and now - room.last_sent >= self.interval:
+                    batches.append((game_id, room.pending))
+                    room.pending = []
+                    room.last_sent = now
+        return batches
+
+    def drop_game(self, game_id):
+        with self._lock:
+            self._rooms.pop(game_id, None)
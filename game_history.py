@@ -0,0 +1,86 @@
+"""
+Move histories, and lazy replays of finished games
+
+While a game runs, each mutation is appended as a compact JSON line to an
+in-memory buffer for that game. When the game ends, the buffer is written to
+``<directory>/<game_id>.ndjson`` in one write and dropped from memory.
+``replay(game_id)`` reads that file line by line and re-applies each change
+to a fresh game, yielding one event per change, so even a long game is
+never loaded whole.
+"""
+import json
+import os
+import re
+import threading
+
+from json_codec import encode
+from ludo_engine import LudoGame
+
+_GAME_ID = re.compile(r'^[0-9a-z-]{1,64}$')
+
+
+class GameHistory:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._live = {}
+
+    def path(self, game_id):
+        # Game ids arrive in URLs, so never let one name a path outside the directory
+        if not _GAME_ID.match(game_id):
+            return None
+        return os.path.join(self.directory, f'{game_id}.ndjson')
+
+    def has_replay(self, game_id):
+        path = self.path(game_id)
+        return path is not None and os.path.exists(path)
+
+    def attach(self, game):
+        """Start recording ``game`` from its current state"""
+        with self._lock:
+            self._live[game.game_id] = bytearray((encode(game.to_dict()) + '\n').encode())
+        if self.record not in game.observers:
+            game.observers.append(self.record)
+
+    def record(self, game_id, version, change):
+        # Called under the game's lock, so appends for one game never interleave
+        buffer = self._live.get(game_id)
+        if buffer is not None:
+            buffer += (encode([version, *change]) + '\n').encode()
+
+    def _detach(self, game):
+        if self.record in game.observers:
+            game.observers.remove(self.record)
+        with self._lock:
+            return self._live.pop(game.game_id, None)
+
+    def finish(self, game):
+        """Persist the history of a game that has ended"""
+        buffer = self._detach(game)
+        path = self.path(game.game_id)
+        if buffer is None or path is None:
+            return False
+        with open(path + '.tmp', 'wb') as history:
+            history.write(buffer)
+        os.replace(path + '.tmp', path)
+        return True
+
+    def discard(self, game):
+        """Forget a game that was removed before it ended"""
+        self._detach(game)
+
+    def replay(self, game_id):
+        """Yield the starting state, then one event per recorded change of a finished game"""
+        with open(self.path(game_id), encoding='utf-8') as history:
+            state = json.loads(next(history))
+            yield {'op': 'state', 'game_state': state}
+
+            game = LudoGame.from_dict(state)
+            for line in history:
+                version, op, *args = json.loads(line)
+                result = game.apply_change([op, *args])
+                event = {'version': version, 'op': op, 'args': args}
+                if op == 'move':
+                    event.update(to=result['to'], captured=result['captured'], winner=game.winner)
+                yield event
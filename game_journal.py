@@ -0,0 +1,206 @@
+"""
+Append-only journal of game mutations with periodic snapshots
+
+Every ``LudoGame`` mutation is written as one compact JSON line,
+``[game_id, version, op, *args]``, for example ``["3f2a9c1e",12,"roll",6]``.
+Handlers only append to an in-memory buffer. A writer thread drains the
+buffer every ``flush_interval`` seconds with a single write and fsync, so a
+burst of moves across many games shares one disk sync (group commit). A
+crash loses at most the last flush interval.
+
+Log segments are numbered files ``journal-000001.log`` and so on. A snapshot
+first rotates to a new segment, then writes every game to
+``snapshot.json`` (atomically, via rename) and deletes the older segments.
+Recovery loads the snapshot and replays the segments after it. Each record
+carries the version it produced, so records already contained in a game's
+snapshot are skipped, and replay never depends on exactly when the snapshot
+read that game.
+"""
+import glob
+import json
+import os
+import threading
+import time
+
+from json_codec import encode
+from logging_setup import get_logger
+
+log = get_logger('journal')
+
+SNAPSHOT_FILE = 'snapshot.json'
+SEGMENT_PATTERN = 'journal-%06d.log'
+
+
+def _fsync_directory(directory):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class GameJournal:
+    def __init__(self, directory, flush_interval=0.005, snapshot_interval=60.0, max_batch=4096):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        self.max_batch = max_batch
+        self.snapshot_source = None
+        os.makedirs(directory, exist_ok=True)
+
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        # Serializes file writes, rotation and snapshots
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = None
+        self._file = None
+        self.segment = max(self.segments(), default=0)
+        self.records_written = 0
+        self.syncs = 0
+
+    def segments(self):
+        numbers = []
+        for path in glob.glob(os.path.join(self.directory, 'journal-*.log')):
+            name = os.path.basename(path)
+            numbers.append(int(name[len('journal-'):-len('.log')]))
+        return sorted(numbers)
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, SEGMENT_PATTERN % number)
+
+    def _open_next_segment(self):
+        if self._file is not None:
+            self._file.close()
+        self.segment += 1
+        self._file = open(self._segment_path(self.segment), 'a', encoding='utf-8')
+
+    # Writing
+
+    def record(self, game_id, version, change):
+        """Queue one mutation; stores install this in ``LudoGame.observers``"""
+        line = encode([game_id, version, *change]) + '\n'
+        with self._buffer_lock:
+            self._buffer.append(line)
+            full = len(self._buffer) >= self.max_batch
+        if full:
+            self._wakeup.set()
+
+    def record_game(self, game):
+        """Journal a game's full state, used when it enters the store"""
+        self.record(game.game_id, game.version, ('game', game.to_dict()))
+
+    def record_delete(self, game_id):
+        self.record(game_id, 0, ('delete',))
+
+    def flush(self):
+        """Write and fsync everything queued so far"""
+        with self._write_lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        with self._buffer_lock:
+            lines, self._buffer = self._buffer, []
+        if not lines:
+            return
+        if self._file is None:
+            self._open_next_segment()
+        self._file.write(''.join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.records_written += len(lines)
+        self.syncs += 1
+
+    def start(self, snapshot_source=None):
+        """Start the writer thread; ``snapshot_source()`` returns the dicts of every game"""
+        self.snapshot_source = snapshot_source
+        self._thread = threading.Thread(target=self._run, name='game-journal', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        last_snapshot = time.monotonic()
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if self.snapshot_source is not None and time.monotonic() - last_snapshot >= self.snapshot_interval:
+                    last_snapshot = time.monotonic()
+                    self.snapshot()
+            except Exception:
+                log.exception('Journal write failed')
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # Snapshots
+
+    def snapshot(self, games=None):
+        """Write every game to the snapshot file and drop the segments it covers"""
+        with self._write_lock:
+            self._flush_locked()
+            self._open_next_segment()
+            covered_from = self.segment
+
+        started = time.perf_counter()
+        if games is None:
+            games = self.snapshot_source()
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as snapshot:
+            json.dump({'segment': covered_from, 'games': games}, snapshot, separators=(',', ':'))
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(path + '.tmp', path)
+        _fsync_directory(self.directory)
+
+        for number in self.segments():
+            if number < covered_from:
+                os.remove(self._segment_path(number))
+        log.info('Snapshot of %d games written in %.1fms', len(games), (time.perf_counter() - started) * 1000)
+
+    # Recovery
+
+    def recover(self, decode):
+        """Rebuild {game_id: game} from the latest snapshot plus the log tail"""
+        games = {}
+        first_segment = 0
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as snapshot:
+                data = json.load(snapshot)
+            first_segment = data['segment']
+            for state in data['games']:
+                games[state['game_id']] = decode(state)
+
+        replayed = 0
+        for number in self.segments():
+            if number < first_segment:
+                continue
+            with open(self._segment_path(number), encoding='utf-8') as segment:
+                for line in segment:
+                    try:
+                        game_id, version, op, *args = json.loads(line)
+                    except ValueError:
+                        # A torn write from a crash can only be the last line of a segment
+                        log.warning('Ignoring a truncated record at the end of %s', segment.name)
+                        break
+                    replayed += 1
+                    game = games.get(game_id)
+                    if op == 'game':
+                        if game is None or game.version < version:
+                            games[game_id] = decode(args[0])
+                    elif op == 'delete':
+                        games.pop(game_id, None)
+                    elif game is not None and version > game.version:
+                        game.apply_change([op, *args])
+
+        log.info('Recovered %d games, replayed %d journal records', len(games), replayed)
+        return games
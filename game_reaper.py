@@ -0,0 +1,130 @@
+"""
+Expiry of idle and abandoned games
+
+Each game expires once it has been idle for the TTL of its phase: lobbies
+nobody starts, games everybody walked away from, and finished games left
+open after the winner was announced. Expiry deadlines sit in a min-heap
+keyed by time. Entries are added when a game is created or its phase gets a
+shorter TTL, never on ordinary moves: when an entry comes due the game's
+real deadline is recomputed from its ``last_activity`` and the entry is
+pushed back if the game has been active since, so both tracking and
+eviction are O(log n).
+
+The reaper also enforces a cap on the number of games: making room evicts
+the games closest to expiry first.
+"""
+import heapq
+import os
+import threading
+import time
+
+from metrics import REGISTRY
+
+DEFAULT_TTLS = {
+    'lobby': float(os.environ.get('LUDO_TTL_LOBBY', 30 * 60)),
+    'in_progress': float(os.environ.get('LUDO_TTL_IN_PROGRESS', 60 * 60)),
+    'finished': float(os.environ.get('LUDO_TTL_FINISHED', 5 * 60))
+}
+DEFAULT_MAX_GAMES = int(os.environ.get('LUDO_MAX_GAMES', 10000))
+DEFAULT_INTERVAL = float(os.environ.get('LUDO_REAP_INTERVAL', 30))
+
+EVICTIONS = REGISTRY.counter('ludo_games_evicted_total', 'Games removed by the reaper', ('reason',))
+
+
+class GameReaper:
+    """Expires games held by ``registry``.
+
+    ``on_evict(game, reason)`` runs under the game's lock just before the
+    game is removed; ``reason`` is the game's phase, or 'cap' when it made
+    room for a new game.
+    """
+
+    def __init__(self, registry, ttls=None, max_games=DEFAULT_MAX_GAMES, on_evict=None, clock=time.time):
+        self.registry = registry
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_games = max_games
+        self.on_evict = on_evict
+        self.clock = clock
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def expires_at(self, game):
+        return game.last_activity + self.ttls[game.phase()]
+
+    def track(self, game):
+        """Index ``game``; call again when its phase changes to one with a shorter TTL"""
+        with self._lock:
+            heapq.heappush(self._heap, (self.expires_at(game), game.game_id))
+
+    def track_existing(self):
+        """Index games already in a shared store; they are checked on the next sweep"""
+        now = self.clock()
+        with self._lock:
+            for game_id in self.registry.game_ids():
+                heapq.heappush(self._heap, (now, game_id))
+
+    def _pop(self, due=None):
+        with self._lock:
+            if not self._heap or (due is not None and self._heap[0][0] > due):
+                return None
+            return heapq.heappop(self._heap)[1]
+
+    def _evict(self, game, reason):
+        if self.on_evict is not None:
+            self.on_evict(game, reason)
+        self.registry.unbind_game(game)
+        self.registry.remove_game(game.game_id)
+        EVICTIONS.inc(reason)
+
+    def _check(self, game_id, now, for_cap=False):
+        """Evict ``game_id`` if it is due and re-index it otherwise.
+
+        With ``for_cap`` a game that is not due is still evicted when no other
+        indexed game expires before it.
+        """
+        with self.registry.locked(game_id) as game:
+            if game is None:
+                return False
+            expires = self.expires_at(game)
+            if expires <= now:
+                self._evict(game, game.phase())
+                return True
+            if for_cap and expires <= self._next_deadline(expires):
+                self._evict(game, 'cap')
+                return True
+        with self._lock:
+            heapq.heappush(self._heap, (expires, game_id))
+        return False
+
+    def _next_deadline(self, default):
+        with self._lock:
+            return self._heap[0][0] if self._heap else default
+
+    def sweep(self, now=None):
+        """Evict every game whose TTL has run out; returns how many were removed"""
+        now = self.clock() if now is None else now
+        evicted = 0
+        while True:
+            game_id = self._pop(due=now)
+            if game_id is None:
+                return evicted
+            evicted += self._check(game_id, now)
+
+    def make_room(self, now=None):
+        """Evict games closest to expiry until a new game fits under the cap.
+
+        Returns False if the cap cannot be met (nothing left to evict).
+        """
+        now = self.clock() if now is None else now
+        while len(self.registry) >= self.max_games:
+            game_id = self._pop()
+            if game_id is None:
+                return False
+            # An entry whose game has been active since is pushed back with its
+            # real deadline; the earliest real deadline is evicted
+            self._check(game_id, now, for_cap=True)
+        return True
+
@@ -0,0 +1,100 @@
+"""
+Thread-safe registry of active games and the players bound to them.
+
+Games live in a pluggable store (in-process by default, see game_store.py).
+The registry lock only guards the player bindings and is never held while
+game logic runs. Each game has its own lock, so rooms proceed fully in
+parallel and only requests for the same game are serialized.
+
+Player bindings map Socket.IO session ids to game ids. A socket is always
+served by the process it connected to, so bindings stay process-local even
+when the games themselves are shared between workers.
+"""
+import threading
+from contextlib import contextmanager
+
+from game_store import MemoryGameStore
+
+
+class GameRegistry:
+    def __init__(self, store=None):
+        self.store = store if store is not None else MemoryGameStore()
+        self._lock = threading.Lock()
+        self.players = {}
+        # Callables(game_id, version, change) told about the changes to every
+        # game. A shared store loads a fresh object on each access, so they are
+        # attached to each game the registry hands out rather than once.
+        self.observers = []
+
+    def __len__(self):
+        return len(self.store)
+
+    def __contains__(self, game_id):
+        return game_id in self.store
+
+    def game_ids(self):
+        return self.store.game_ids()
+
+    def get(self, game_id):
+        """Unlocked read; with a shared store this is a detached copy"""
+        return self.store.load(game_id)
+
+    def add_game(self, game):
+        self._observe(game)
+        self.store.add(game)
+
+    def _observe(self, game):
+        for observer in self.observers:
+            if observer not in game.observers:
+                game.observers.append(observer)
+
+    def remove_game(self, game_id):
+        return self.store.delete(game_id)
+
+    def bind_player(self, player_id, game_id):
+        with self._lock:
+            self.players[player_id] = game_id
+
+    def unbind_player(self, player_id):
+        with self._lock:
+            return self.players.pop(player_id, None)
+
+    def game_id_for(self, player_id):
+        return self.players.get(player_id)
+
+    def unbind_game(self, game):
+        """Drop the bindings of every player still seated in ``game``"""
+        with self._lock:
+            for player_id in game.players:
+                if self.players.get(player_id) == game.game_id:
+                    del self.players[player_id]
+
+    @contextmanager
+    def locked(self, game_id):
+        """Hold the lock of ``game_id`` and yield the game, or None if it does not exist.
+
+        Changes made to the game inside the block are written back to the
+        store when it exits.
+        """
+        if game_id is None:
+            yield None
+            return
+
+        with self.store.lock(game_id):
+            # The game may have been removed while we waited for its lock
+            game = self.store.load(game_id)
+            if game is None:
+                yield None
+                return
+
+            self._observe(game)
+            version = game.version
+            yield game
+            if game.version != version:
+                self.store.save(game)
+
+    @contextmanager
+    def locked_for_player(self, player_id):
+        """Like ``locked`` but looks the game up through the player's binding"""
+        with self.locked(self.players.get(player_id)) as game:
+            yield game
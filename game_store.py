@@ -0,0 +1,177 @@
+"""
+Storage backends for game state
+
+``MemoryGameStore`` keeps live ``LudoGame`` objects in this process and is the
+default. ``JournaledGameStore`` does the same but logs every mutation to disk
+so a restarted process gets its games back. ``SQLiteGameStore`` keeps
+serialized games in a SQLite file shared by every worker process, so any
+process can serve any game.
+
+Both expose the same small interface used by ``GameRegistry``: ``add``,
+``load``, ``save``, ``delete``, ``game_ids`` and ``lock(game_id)``, a context
+manager giving exclusive access to one game.
+"""
+import contextlib
+import json
+import sqlite3
+import threading
+import zlib
+
+from game_journal import GameJournal
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-memory store is available
+    fcntl = None
+
+
+class MemoryGameStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._games = {}
+        self._game_locks = {}
+
+    def __len__(self):
+        return len(self._games)
+
+    def __contains__(self, game_id):
+        return game_id in self._games
+
+    def game_ids(self):
+        return list(self._games.keys())
+
+    def add(self, game):
+        with self._lock:
+            self._game_locks[game.game_id] = threading.RLock()
+            self._games[game.game_id] = game
+
+    def load(self, game_id):
+        return self._games.get(game_id)
+
+    def save(self, game):
+        # Callers mutate the live object, there is nothing to write back
+        pass
+
+    def delete(self, game_id):
+        with self._lock:
+            self._game_locks.pop(game_id, None)
+            return self._games.pop(game_id, None) is not None
+
+    def lock(self, game_id):
+        with self._lock:
+            lock = self._game_locks.get(game_id)
+        return lock if lock is not None else contextlib.nullcontext()
+
+
+class JournaledGameStore(MemoryGameStore):
+    """In-process games made durable by an append-only journal in ``directory``.
+
+    Games found in the journal are recovered on construction. Each stored
+    game reports its mutations to the journal, which group-commits them in
+    the background and snapshots all games every ``snapshot_interval``
+    seconds.
+    """
+
+    def __init__(self, directory, decode, flush_interval=0.005, snapshot_interval=60.0):
+        super().__init__()
+        self.journal = GameJournal(directory, flush_interval, snapshot_interval)
+        for game in self.journal.recover(decode).values():
+            super().add(game)
+            game.observers.append(self.journal.record)
+        self.journal.start(self.snapshot_games)
+
+    def add(self, game):
+        super().add(game)
+        game.observers.append(self.journal.record)
+        self.journal.record_game(game)
+
+    def delete(self, game_id):
+        game = self._games.get(game_id)
+        deleted = super().delete(game_id)
+        if deleted:
+            game.observers.remove(self.journal.record)
+            self.journal.record_delete(game_id)
+        return deleted
+
+    def snapshot_games(self):
+        states = []
+        for game_id in self.game_ids():
+            with self.lock(game_id):
+                game = self.load(game_id)
+                if game is not None:
+                    states.append(game.to_dict())
+        return states
+
+    def close(self):
+        self.journal.close()
+
+
+class SQLiteGameStore:
+    """Games stored as JSON rows in a SQLite database shared between processes.
+
+    ``decode`` turns the stored dict back into a game (``LudoGame.from_dict``).
+    Per-game exclusion across processes uses POSIX byte-range locks on a
+    sidecar file, one byte per lock slot, so unrelated games rarely contend.
+    Within a process the same slot is additionally guarded by a thread lock,
+    because byte-range locks are owned by the process, not the thread.
+    """
+
+    LOCK_SLOTS = 4096
+
+    def __init__(self, path, decode):
+        if fcntl is None:
+            raise RuntimeError('SQLiteGameStore needs POSIX file locks (fcntl)')
+        self.path = path
+        self.decode = decode
+        self._local = threading.local()
+        self._slot_locks = [threading.Lock() for _ in range(self.LOCK_SLOTS)]
+        self._lock_file = open(path + '.locks', 'a+b')
+
+        db = self._db()
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('CREATE TABLE IF NOT EXISTS games (game_id TEXT PRIMARY KEY, data TEXT NOT NULL)')
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def __len__(self):
+        return self._db().execute('SELECT COUNT(*) FROM games').fetchone()[0]
+
+    def __contains__(self, game_id):
+        row = self._db().execute('SELECT 1 FROM games WHERE game_id = ?', (game_id,)).fetchone()
+        return row is not None
+
+    def game_ids(self):
+        return [row[0] for row in self._db().execute('SELECT game_id FROM games')]
+
+    def add(self, game):
+        self._db().execute('INSERT INTO games (game_id, data) VALUES (?, ?)',
+                           (game.game_id, json.dumps(game.to_dict())))
+
+    def load(self, game_id):
+        row = self._db().execute('SELECT data FROM games WHERE game_id = ?', (game_id,)).fetchone()
+        return self.decode(json.loads(row[0])) if row else None
+
+    def save(self, game):
+        # UPDATE rather than upsert so a game deleted while locked stays deleted
+        self._db().execute('UPDATE games SET data = ? WHERE game_id = ?',
+                           (json.dumps(game.to_dict()), game.game_id))
+
+    def delete(self, game_id):
+        cursor = self._db().execute('DELETE FROM games WHERE game_id = ?', (game_id,))
+        return cursor.rowcount > 0
+
+    @contextlib.contextmanager
+    def lock(self, game_id):
+        slot = zlib.crc32(game_id.encode()) % self.LOCK_SLOTS
+        with self._slot_locks[slot]:
+            fcntl.lockf(self._lock_file, fcntl.LOCK_EX, 1, slot)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._lock_file, fcntl.LOCK_UN, 1, slot)
@@ -0,0 +1,86 @@
+"""
+JSON codec for Socket.IO packets
+
+A drop-in ``json`` module for python-socketio (``SocketIO(json=json_codec)``).
+It encodes with orjson when that is installed and falls back to the stdlib
+otherwise; set LUDO_JSON=stdlib to force the fallback. Text wrapped in
+``RawJSON`` is copied into the packet verbatim instead of being encoded
+again, so a snapshot encoded once can be shared by every emit.
+"""
+import functools
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+if os.environ.get('LUDO_JSON') == 'stdlib':
+    orjson = None
+
+COMPACT = {'separators': (',', ':')}
+
+# RawJSON is only looked for this deep: packet data is [event, {key: value}]
+RAW_DEPTH = 3
+
+
+class RawJSON:
+    """Already-encoded JSON text to be embedded as-is"""
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+    def __eq__(self, other):
+        return isinstance(other, RawJSON) and other.text == self.text
+
+    def __repr__(self):
+        return f'RawJSON({self.text[:40]!r})'
+
+
+if orjson is not None:
+    BACKEND = 'orjson'
+
+    def encode(obj):
+        # Board paths are keyed by piece number, which the stdlib turns into strings too
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    loads = orjson.loads
+else:
+    BACKEND = 'json'
+    # One shared encoder: json.dumps with non-default arguments builds a new one per call
+    encode = json.JSONEncoder(separators=(',', ':')).encode
+    loads = json.loads
+
+
+def _contains_raw(obj, depth=RAW_DEPTH):
+    if isinstance(obj, RawJSON):
+        return True
+    if depth == 0:
+        return False
+    if isinstance(obj, dict):
+        return any(_contains_raw(value, depth - 1) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_contains_raw(item, depth - 1) for item in obj)
+    return False
+
+
+def _splice(obj, encode_value, depth=RAW_DEPTH):
+    if isinstance(obj, RawJSON):
+        return obj.text
+    if depth == 0:
+        return encode_value(obj)
+    if isinstance(obj, dict):
+        return '{' + ','.join(f'{encode(str(key))}:{_splice(value, encode_value, depth - 1)}'
+                              for key, value in obj.items()) + '}'
+    if isinstance(obj, (list, tuple)):
+        return '[' + ','.join(_splice(item, encode_value, depth - 1) for item in obj) + ']'
+    return encode_value(obj)
+
+
+def dumps(obj, **kwargs):
+    encode_value = encode if not kwargs or kwargs == COMPACT else functools.partial(json.dumps, **kwargs)
+    if _contains_raw(obj):
+        return _splice(obj, encode_value)
+    return encode_value(obj)
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Load test: many simulated games of bot players against a live server
+
+Each game is driven by its own thread. A host bot creates it, the others
+join, the host starts it, and the bots then take turns with think times
+drawn from the scenario: roll, pick one of the legal moves (or sometimes
+pass) and wait for the turn to resolve. Every request is timed from the
+emit to the event that answers it. Server ``error`` events and timeouts
+count as errors for that request.
+
+Scenarios are JSON files (see load_scenarios/). Unless --url points at a
+running server, app.py is started with the scenario's ``server_env``, and
+its CPU and resident memory are sampled from /proc while the bots play.
+Large runs can spread the games over several generator processes with
+--processes. The run exits non-zero when a scenario ``thresholds`` entry is
+exceeded, so it can gate a deploy:
+
+    python load_test.py load_scenarios/smoke.json
+    python load_test.py load_scenarios/thousand_players.json --processes 4 --json report.json
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+
+import socketio
+
+from benchmark_connections import free_port, start_server
+
+COLORS = ['red', 'blue', 'green', 'yellow']
+
+DEFAULT_SCENARIO = {
+    'name': 'default',
+    'games': 10,
+    'players_per_game': 4,
+    'async_mode': 'threading',
+    'ramp_up': 2.0,             # seconds over which game starts are spread
+    'duration': 60.0,           # games still running after this many seconds stop
+    'max_turns': 200,           # per game
+    'think_time': [0.2, 1.0],   # seconds, uniform
+    'pass_probability': 0.1,    # chance to pass instead of moving when allowed
+    'chat_probability': 0.05,   # chance to chat before a turn
+    'timeout': 10.0,
+    'seed': 1,
+    'server_env': {},
+    'thresholds': {}
+}
+
+# Request -> the events that answer it
+RESPONSES = {
+    'create_game': ('game_created',),
+    'join_game': ('game_joined',),
+    'start_game': ('game_started',),
+    'roll_dice': ('dice_rolled',),
+    'move_piece': ('piece_moved',),
+    'pass_turn': ('turn_changed',),
+    # A busy room's chat is held back and merged into a batch
+    'chat_message': ('chat_message', 'chat_batch')
+}
+
+
+class RequestFailed(Exception):
+    pass
+
+
+def load_scenario(path):
+    with open(path, encoding='utf-8') as config:
+        scenario = {**DEFAULT_SCENARIO, **json.load(config)}
+    unknown = set(scenario) - set(DEFAULT_SCENARIO)
+    if unknown:
+        raise ValueError(f"unknown scenario keys: {', '.join(sorted(unknown))}")
+    return scenario
+
+
+class Stats:
+    """Latencies and failures per request type, for one generator process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.games_finished = 0
+        self.turns = 0
+
+    def record(self, event, seconds):
+        with self.lock:
+            self.latencies.setdefault(event, []).append(seconds)
+
+    def fail(self, event):
+        with self.lock:
+            self.errors[event] = self.errors.get(event, 0) + 1
+
+    def to_dict(self):
+        return {'latencies': self.latencies, 'errors': self.errors,
+                'games_finished': self.games_finished, 'turns': self.turns}
+
+
+class Bot:
+    def __init__(self, url, name, stats, timeout):
+        self.name = name
+        self.stats = stats
+        self.timeout = timeout
+        self.events = []
+        self.condition = threading.Condition()
+        self.client = socketio.Client(reconnection=False)
+        self.client.on('*', self.receive)
+        self.client.connect(url, transports=['websocket'], wait_timeout=timeout)
+
+    def receive(self, event, data=None):
+        if event == 'batch':
+            received = [(item['event'], item['data']) for item in data['events']]
+        else:
+            received = [(event, data)]
+        with self.condition:
+            self.events.extend(received)
+            self.condition.notify_all()
+
+    def mark(self):
+        with self.condition:
+            return len(self.events)
+
+    def wait(self, predicate, since):
+        """The first event after index ``since`` matching ``predicate(name, data)``"""
+        deadline = time.monotonic() + self.timeout
+        with self.condition:
+            while True:
+                for name, data in self.events[since:]:
+                    if predicate(name, data):
+                        return name, data
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None, None
+                self.condition.wait(remaining)
+
+    def request(self, event, data=None, match=None):
+        """Emit ``event`` and wait for its answer; records the round trip or the failure.
+
+        Room broadcasts from before the emit can still be in flight, so
+        ``match(reply)`` can tell this request's answer from theirs.
+        """
+        expected = RESPONSES[event]
+        since = self.mark()
+        started = time.perf_counter()
+        self.client.emit(event, data)
+        name, reply = self.wait(lambda name, reply: name == 'error' or (
+            name in expected and (match is None or match(reply))), since)
+        if name in expected:
+            self.stats.record(event, time.perf_counter() - started)
+            return reply
+        self.stats.fail(event)
+        raise RequestFailed(f"{self.name}: {event} got {reply['message'] if reply else 'no answer'}")
+
+    def received(self, since):
+        with self.condition:
+            return self.events[since:]
+
+    def close(self):
+        self.client.disconnect()
+
+
+def play_game(url, scenario, index, stats, stop_at):
+    rng = random.Random(f"{scenario['seed']}:{index}")
+    low, high = scenario['think_time']
+
+    def think():
+        time.sleep(rng.uniform(low, high))
+
+    bots = []
+    try:
+        for seat in range(scenario['players_per_game']):
+            bots.append(Bot(url, f'game{index}-p{seat}', stats, scenario['timeout']))
+
+        game_id = bots[0].request('create_game', {'player_name': bots[0].name, 'color': COLORS[0]})['game_id']
+        for seat, bot in enumerate(bots[1:], start=1):
+            bot.request('join_game', {'game_id': game_id, 'player_name': bot.name, 'color': COLORS[seat]})
+        bots[0].request('start_game')
+
+        home = {color: set(range(4)) for color in COLORS}
+        seen_version = 0
+        current = 0
+        for _ in range(scenario['max_turns']):
+            if time.monotonic() >= stop_at:
+                return
+            bot, color = bots[current], COLORS[current]
+            think()
+            if rng.random() < scenario['chat_probability']:
+                bot.request('chat_message', {'message': f'{bot.name} says hi'},
+                            match=lambda reply: bot.name in (reply.get('player_name'), *(
+                                message['player_name'] for message in reply.get('messages', ()))))
+
+            since = bot.mark()
+            rolled = bot.request('roll_dice', match=lambda reply: reply['player_id'] == bot.client.get_sid())
+            # One legal move is played and none passes the turn by the server itself
+            legal = rolled['legal_moves']
+            if len(legal) > 1:
+                think()
+                if rolled['dice_value'] != 6 and rng.random() < scenario['pass_probability']:
+                    bot.request('pass_turn')
+                else:
+                    piece = rng.choice(legal)
+                    bot.request('move_piece', {'color': color, 'piece': piece,
+                                               'from': 'home' if piece in home[color] else 'path'})
+
+            # Broadcasts of the previous turn may still be arriving, so go by version
+            name, data = bot.wait(lambda name, data: name in ('turn_changed', 'piece_moved') and (
+                data['version'] > rolled['version'] and (name == 'turn_changed' or data['winner'])), since)
+            if name is None:
+                stats.fail('turn_resolution')
+                return
+            for event, moved in bot.received(since):
+                if event == 'piece_moved' and seen_version < moved['version'] <= data['version']:
+                    if moved['from'] == 'home':
+                        home[moved['color']].discard(moved['piece'])
+                    for captured_color, captured_piece in moved['captured']:
+                        home[captured_color].add(captured_piece)
+            seen_version = data['version']
+            with stats.lock:
+                stats.turns += 1
+            if name == 'piece_moved':
+                with stats.lock:
+                    stats.games_finished += 1
+                return
+            current = data['current_player']
+    except RequestFailed:
+        pass
+    except socketio.exceptions.ConnectionError:
+        stats.fail('connect')
+    finally:
+        for bot in bots:
+            bot.close()
+
+
+def run_games(url, scenario, indexes, started_at):
+    """Play the games numbered ``indexes``, each on its own thread; returns Stats as a dict"""
+    stats = Stats()
+    stop_at = started_at + scenario['duration']
+    spacing = scenario['ramp_up'] / max(1, scenario['games'])
+    threads = []
+    for index in indexes:
+        delay = started_at + index * spacing - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        thread = threading.Thread(target=play_game, args=(url, scenario, index, stats, stop_at), daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return stats.to_dict()
+
+
+def _run_games(args):
+    return run_games(*args)
+
+
+class ResourceSampler:
+    """Samples a process's CPU use and resident memory from /proc (Linux only)"""
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.cpu_percent = []
+        self.rss_bytes = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.available = os.path.exists(f'/proc/{pid}/stat')
+
+    def _cpu_seconds(self):
+        with open(f'/proc/{self.pid}/stat') as stat:
+            # Fields after the command name, which may itself contain spaces
+            fields = stat.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+    def _rss(self):
+        with open(f'/proc/{self.pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    def _run(self):
+        last_cpu, last_time = self._cpu_seconds(), time.monotonic()
+        while not self._stop.wait(self.interval):
+            try:
+                cpu, now = self._cpu_seconds(), time.monotonic()
+                self.cpu_percent.append((cpu - last_cpu) / (now - last_time) * 100)
+                self.rss_bytes.append(self._rss())
+            except OSError:
+                return
+            last_cpu, last_time = cpu, now
+
+    def start(self):
+        if self.available:
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def summary(self):
+        if not self.cpu_percent:
+            return None
+        return {'cpu_avg_percent': sum(self.cpu_percent) / len(self.cpu_percent),
+                'cpu_max_percent': max(self.cpu_percent),
+                'rss_max_mb': max(self.rss_bytes) / 2 ** 20}
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(results, elapsed):
+    latencies, errors = {}, {}
+    games_finished = turns = 0
+    for result in results:
+        for event, values in result['latencies'].items():
+            latencies.setdefault(event, []).extend(values)
+        for event, count in result['errors'].items():
+            errors[event] = errors.get(event, 0) + count
+        games_finished += result['games_finished']
+        turns += result['turns']
+
+    events = {}
+    for event in sorted(set(latencies) | set(errors)):
+        ordered = sorted(latencies.get(event, []))
+        failed = errors.get(event, 0)
+        events[event] = {
+            'requests': len(ordered) + failed,
+            'errors': failed,
+            'error_rate': failed / (len(ordered) + failed),
+            **({f'p{p}_ms': percentile(ordered, p) * 1000 for p in (50, 95, 99)} if ordered else {})
+        }
+    requests = sum(event['requests'] for event in events.values())
+    return {
+        'elapsed_s': elapsed,
+        'games_finished': games_finished,
+        'turns': turns,
+        'requests': requests,
+        'requests_per_s': requests / elapsed if elapsed else 0.0,
+        'error_rate': sum(event['errors'] for event in events.values()) / requests if requests else 0.0,
+        'events': events
+    }
+
+
+def check_thresholds(report, thresholds):
+    """Threshold violations, e.g. {"error_rate": 0.01, "p95_ms": {"roll_dice": 150}, "cpu_avg_percent": 80}"""
+    failures = []
+    for key, limit in thresholds.items():
+        if isinstance(limit, dict):
+            for event, event_limit in limit.items():
+                value = report['events'].get(event, {}).get(key)
+                if value is not None and value > event_limit:
+                    failures.append(f'{event} {key} {value:.2f} > {event_limit}')
+        else:
+            value = report.get(key, (report.get('server') or {}).get(key))
+            if value is not None and value > limit:
+                failures.append(f'{key} {value:.3f} > {limit}')
+    return failures
+
+
+def run(scenario, url=None, processes=1, server_pid=None):
+    server = None
+    if url is None:
+        port = free_port()
+        server = start_server(scenario['async_mode'], port, 0, scenario['server_env'])
+        url, server_pid = f'http://127.0.0.1:{port}', server.pid
+    sampler = ResourceSampler(server_pid) if server_pid else None
+
+    try:
+        if sampler:
+            sampler.start()
+        started_at = time.monotonic()
+        indexes = list(range(scenario['games']))
+        if processes > 1:
+            chunks = [(url, scenario, indexes[worker::processes], started_at) for worker in range(processes)]
+            with multiprocessing.Pool(processes) as pool:
+                results = pool.map(_run_games, chunks)
+        else:
+            results = [run_games(url, scenario, indexes, started_at)]
+        report = summarize(results, time.monotonic() - started_at)
+    finally:
+        if sampler:
+            sampler.stop()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    report['scenario'] = scenario['name']
+    report['server'] = sampler.summary() if sampler else None
+    report['threshold_failures'] = check_thresholds(report, scenario['thresholds'])
+    return report
+
+
+def print_report(report):
+    print(f"\n📊 {report['scenario']}: {report['games_finished']} games finished, {report['turns']} turns, "
+          f"{report['requests']} requests in {report['elapsed_s']:.1f}s ({report['requests_per_s']:.0f}/s)")
+    print(f"{'request':<14} {'count':>7} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for event, row in report['events'].items():
+        print(f"{event:<14} {row['requests']:>7} {row['errors']:>7} {row.get('p50_ms', 0):>8.2f} "
+              f"{row.get('p95_ms', 0):>8.2f} {row.get('p99_ms', 0):>8.2f}")
+    print(f"error rate: {report['error_rate']:.2%}")
+    if report['server']:
+        server = report['server']
+        print(f"server: cpu avg {server['cpu_avg_percent']:.0f}% max {server['cpu_max_percent']:.0f}%, "
+              f"rss max {server['rss_max_mb']:.1f} MB")
+    for failure in report['threshold_failures']:
+        print(f"❌ threshold exceeded: {failure}")
+    if not report['threshold_failures']:
+        print("✅ all thresholds met")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('scenario', help='scenario JSON file')
+    parser.add_argument('--url', help='test a running server instead of starting app.py')
+    parser.add_argument('--server-pid', type=int, help='pid of the --url server, to sample its CPU and memory')
+    parser.add_argument('--processes', type=int, default=1, help='load generator processes')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario)
+    players = scenario['games'] * scenario['players_per_game']
+    print(f"🚀 {scenario['name']}: {scenario['games']} games, {players} players, "
+          f"{args.processes} generator process(es)")
+    report = run(scenario, args.url, args.processes, args.server_pid)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+    raise SystemExit(1 if report['threshold_failures'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,481 @@
+"""
+Compact board representation and rules engine for Ludo
+
+All 16 pieces live in one fixed array of square codes, indexed by
+``color_index * 4 + piece``, and a 52-entry occupancy index holds a bitmask
+of the pieces standing on each track square. Moves, captures and "who is on
+square N" are O(1) array operations, and the board serializes to the
+``{'home': [...], 'path': {...}, 'safe': [...]}`` wire format on demand.
+
+Every color follows its own precomputed route: 51 track squares from its
+start square, then 5 squares up its home column, then the center. A piece
+is described by its route progress (0-56), so a move is one table lookup.
+
+``LudoGame`` builds the turn rules on top of the board. It does no I/O, so
+the server, the simulator and the tests all drive the same engine.
+"""
+import random
+import time
+from array import array
+
+from json_codec import encode
+
+COLORS = ('red', 'blue', 'green', 'yellow')
+COLOR_INDEX = {color: index for index, color in enumerate(COLORS)}
+PIECES_PER_COLOR = 4
+PIECE_COUNT = len(COLORS) * PIECES_PER_COLOR
+TRACK_SQUARES = 52
+HOME_COLUMN_SQUARES = 5
+
+# Square codes stored in the position array: -1 home, 0-51 the shared track,
+# 52-71 the home columns (five per color) and 127 the center
+HOME = -1
+HOME_COLUMN = TRACK_SQUARES
+FINISHED = 127
+
+START_SQUARES = (0, 13, 26, 39)
+# Start squares and the star eight squares past each of them protect against capture
+SAFE_SQUARES = frozenset(START_SQUARES) | frozenset(start + 8 for start in START_SQUARES)
+
+# Route progress: 0 is the start square, 51-55 the home column, 56 the center
+TRACK_STEPS = TRACK_SQUARES - 1
+FINISH_PROGRESS = TRACK_STEPS + HOME_COLUMN_SQUARES
+
+
+def build_route(color_index):
+    start = START_SQUARES[color_index]
+    track = [(start + step) % TRACK_SQUARES for step in range(TRACK_STEPS)]
+    column = [HOME_COLUMN + color_index * HOME_COLUMN_SQUARES + step for step in range(HOME_COLUMN_SQUARES)]
+    return tuple(track + column + [FINISHED])
+
+
+# ROUTES[color][progress] -> square code, PROGRESS[color][square code] -> progress (-1 off route)
+ROUTES = tuple(build_route(index) for index in range(len(COLORS)))
+PROGRESS = tuple(
+    array('b', [route.index(code) if code in route else -1 for code in range(FINISHED + 1)])
+    for route in ROUTES
+)
+
+# Bitmask of all four pieces of each color, for masking the occupancy index
+COLOR_MASKS = tuple(((1 << PIECES_PER_COLOR) - 1) << (index * PIECES_PER_COLOR)
+                    for index in range(len(COLORS)))
+
+
+def piece_index(color, piece):
+    return COLOR_INDEX[color] * PIECES_PER_COLOR + piece
+
+
+def square_to_wire(square):
+    """Track squares go on the wire as numbers, home column squares as 'red-0'..'red-4'"""
+    if square < TRACK_SQUARES:
+        return square
+    column = square - HOME_COLUMN
+    return f'{COLORS[column // HOME_COLUMN_SQUARES]}-{column % HOME_COLUMN_SQUARES}'
+
+
+def square_from_wire(position):
+    if isinstance(position, int):
+        return position
+    color, step = position.rsplit('-', 1)
+    return HOME_COLUMN + COLOR_INDEX[color] * HOME_COLUMN_SQUARES + int(step)
+
+
+class LudoBoard:
+    __slots__ = ('positions', 'occupancy')
+
+    def __init__(self):
+        self.positions = array('b', [HOME] * PIECE_COUNT)
+        self.occupancy = array('H', [0] * TRACK_SQUARES)
+
+    def copy(self):
+        board = LudoBoard.__new__(LudoBoard)
+        board.positions = array('b', self.positions)
+        board.occupancy = array('H', self.occupancy)
+        return board
+
+    @classmethod
+    def from_positions(cls, positions):
+        """Rebuild a board from the bytes of a ``positions`` array"""
+        board = cls()
+        for index, square in enumerate(array('b', positions)):
+            if square != HOME:
+                board._place(index, square)
+        return board
+
+    def position(self, color, piece):
+        return self.positions[COLOR_INDEX[color] * PIECES_PER_COLOR + piece]
+
+    def move(self, color, piece, square):
+        """Put a piece on ``square`` (a track square, HOME or FINISHED)"""
+        self._place(COLOR_INDEX[color] * PIECES_PER_COLOR + piece, square)
+
+    def _place(self, index, square):
+        positions = self.positions
+        occupancy = self.occupancy
+        current = positions[index]
+        if 0 <= current < TRACK_SQUARES:
+            occupancy[current] ^= 1 << index
+        if 0 <= square < TRACK_SQUARES:
+            occupancy[square] |= 1 << index
+        positions[index] = square
+
+    def occupants(self, square):
+        """Bitmask of the pieces on a track square"""
+        return self.occupancy[square]
+
+    def pieces_at(self, square):
+        """(color, piece) pairs standing on a track square"""
+        mask = self.occupancy[square]
+        pieces = []
+        while mask:
+            index = (mask & -mask).bit_length() - 1
+            pieces.append((COLORS[index // PIECES_PER_COLOR], index % PIECES_PER_COLOR))
+            mask &= mask - 1
+        return pieces
+
+    def opponents_at(self, square, color):
+        """Bitmask of the pieces of other colors on a track square"""
+        return self.occupancy[square] & ~COLOR_MASKS[COLOR_INDEX[color]]
+
+    def capture(self, square, color):
+        """Send every opponent piece on ``square`` home and return them as (color, piece) pairs"""
+        mask = self.opponents_at(square, color)
+        captured = []
+        while mask:
+            index = (mask & -mask).bit_length() - 1
+            self._place(index, HOME)
+            captured.append((COLORS[index // PIECES_PER_COLOR], index % PIECES_PER_COLOR))
+            mask &= mask - 1
+        return captured
+
+    def destination(self, color, piece, dice):
+        """Square code a piece would reach with ``dice``, or None if it cannot move"""
+        color_index = COLOR_INDEX[color]
+        square = self.positions[color_index * PIECES_PER_COLOR + piece]
+        if square == HOME:
+            return ROUTES[color_index][0] if dice == 6 else None
+
+        progress = PROGRESS[color_index][square] + dice
+        if progress > FINISH_PROGRESS:
+            # Reaching the center takes an exact roll
+            return None
+        return ROUTES[color_index][progress]
+
+    def legal_moves(self, color, dice):
+        """(piece, destination) pairs for every piece of ``color`` that can move"""
+        moves = []
+        for piece in range(PIECES_PER_COLOR):
+            square = self.destination(color, piece, dice)
+            if square is not None:
+                moves.append((piece, square))
+        return moves
+
+    def apply_move(self, color, piece, square):
+        """Move a piece and capture unprotected opponents where it lands"""
+        self.move(color, piece, square)
+        if square < TRACK_SQUARES and square not in SAFE_SQUARES:
+            return self.capture(square, color)
+        return []
+
+    def count(self, color, square):
+        """How many pieces of ``color`` sit on a square code, e.g. HOME or FINISHED"""
+        start = COLOR_INDEX[color] * PIECES_PER_COLOR
+        return sum(1 for code in self.positions[start:start + PIECES_PER_COLOR] if code == square)
+
+    def color_to_wire(self, color):
+        start = COLOR_INDEX[color] * PIECES_PER_COLOR
+        home, path, safe = [], {}, []
+        for piece in range(PIECES_PER_COLOR):
+            square = self.positions[start + piece]
+            if square == HOME:
+                home.append(piece)
+            elif square == FINISHED:
+                safe.append(piece)
+            else:
+                path[piece] = square_to_wire(square)
+        return {'home': home, 'path': path, 'safe': safe}
+
+    def to_wire(self):
+        return {color: self.color_to_wire(color) for color in COLORS}
+
+    @classmethod
+    def from_wire(cls, data):
+        board = cls()
+        for color, pieces in data.items():
+            for piece in pieces['safe']:
+                board.move(color, int(piece), FINISHED)
+            # JSON turns the integer piece keys of each path into strings
+            for piece, square in pieces['path'].items():
+                board.move(color, int(piece), square_from_wire(square))
+        return board
+
+
+# Journal op -> LudoGame method that replays it (rolls are replayed in apply_change)
+CHANGE_METHODS = {
+    'add': 'add_player',
+    'remove': 'remove_player',
+    'rebind': 'rebind_player',
+    'hold': 'hold_seat',
+    'start': 'start_game',
+    'move': 'move_piece',
+    'turn': 'end_turn'
+}
+
+
+class LudoGame:
+    """One game: players and their seats, the dice and the board.
+
+    ``rng`` is any ``random.Random``-compatible source for the dice, so
+    simulations can be seeded and replayed exactly.
+    """
+
+    def __init__(self, game_id, rng=None):
+        self.game_id = game_id
+        self.rng = rng if rng is not None else random.Random()
+        self.players = {}
+        # Seat table in turn order; current_player indexes into it. A seat
+        # vacated mid-game stays as None so nobody else's turn shifts.
+        self.seats = []
+        self.color_seats = {}
+        self.current_player = 0
+        self.dice_value = 0
+        self.game_started = False
+        self.winner = None
+        self.board = self.initialize_board()
+        # Monotonic state version; every broadcast diff carries the value it produced
+        self.version = 0
+        # Wall-clock time of the last change, so idle games can be expired from any worker
+        self.last_activity = time.time()
+        # Callables(game_id, version, change) told about every mutation: the
+        # journal (game_journal.py) and the replay recorder (game_history.py)
+        self.observers = []
+        # (version, JSON text) of the last encoded snapshot, see state_json()
+        self._state_json = None
+
+    def bump_version(self, *change):
+        """Advance the version after a mutation described by ``change``, e.g. ('roll', 6)"""
+        self.version += 1
+        self.last_activity = time.time()
+        if change:
+            for observer in self.observers:
+                observer(self.game_id, self.version, change)
+        return self.version
+
+    def apply_change(self, change):
+        """Replay one recorded mutation, the counterpart of ``bump_version(*change)``.
+
+        Returns what the replayed method returned, e.g. the result of a move.
+        """
+        op, *args = change
+        if op == 'roll':
+            # The dice are the only input that cannot be recomputed
+            self.dice_value = args[0]
+            self.bump_version()
+            return args[0]
+        return getattr(self, CHANGE_METHODS[op])(*args)
+
+    def phase(self):
+        """'lobby', 'in_progress' or 'finished'"""
+        if self.winner:
+            return 'finished'
+        return 'in_progress' if self.game_started else 'lobby'
+
+    def initialize_board(self):
+        # All pieces start at home
+        return LudoBoard()
+
+    def add_player(self, player_id, player_name, color, bot=None):
+        """Seat a player; ``bot`` names the strategy of a server-side bot, e.g. 'expectimax'"""
+        if (len(self.players) < 4 and player_id not in self.players
+                and color in COLOR_INDEX and color not in self.color_seats):
+            self.players[player_id] = {'name': player_name, 'color': color}
+            if bot:
+                self.players[player_id]['bot'] = bot
+            # Fill a seat vacated mid-game before adding one at the end
+            if None in self.seats:
+                seat = self.seats.index(None)
+                self.seats[seat] = player_id
+            else:
+                seat = len(self.seats)
+                self.seats.append(player_id)
+            self.color_seats[color] = seat
+            self.bump_version('add', player_id, player_name, color, *((bot,) if bot else ()))
+            return True
+        return False
+
+    def remove_player(self, player_id):
+        if player_id in self.players:
+            color = self.players.pop(player_id)['color']
+            seat = self.color_seats.pop(color)
+
+            if self.game_started:
+                self.seats[seat] = None
+                if seat == self.current_player and self.players:
+                    self.dice_value = 0
+                    self.current_player = self.next_seat(seat)
+            else:
+                # Nobody has taken a turn yet, so the lobby can simply close ranks
+                del self.seats[seat]
+                for later_color, later_seat in self.color_seats.items():
+                    if later_seat > seat:
+                        self.color_seats[later_color] = later_seat - 1
+
+            self.bump_version('remove', player_id)
+
+    def rebind_player(self, player_id, new_player_id):
+        """Hand ``player_id``'s seat to ``new_player_id``, e.g. the new connection of a player who reconnected"""
+        if player_id not in self.players or new_player_id in self.players:
+            return False
+        # Rebuild rather than pop, so the players keep their order
+        self.players = {new_player_id if key == player_id else key: player for key, player in self.players.items()}
+        self.players[new_player_id].pop('away', None)
+        self.seats[self.seats.index(player_id)] = new_player_id
+        self.bump_version('rebind', player_id, new_player_id)
+        return True
+
+    def hold_seat(self, player_id):
+        """Mark the seat of a player whose connection dropped as held for them to take back"""
+        player = self.players.get(player_id)
+        if player is None or player.get('away'):
+            return False
+        # Kept in the game itself, so every worker sharing the store sees it
+        player['away'] = True
+        self.bump_version('hold', player_id)
+        return True
+
+    def is_away(self, player_id):
+        return bool(self.players.get(player_id, {}).get('away'))
+
+    def is_bot(self, player_id):
+        return bool(self.players.get(player_id, {}).get('bot'))
+
+    def has_humans(self):
+        return any(not player.get('bot') for player in self.players.values())
+
+    def current_player_id(self):
+        if self.current_player < len(self.seats):
+            return self.seats[self.current_player]
+        return None
+
+    def current_color(self):
+        return self.players[self.seats[self.current_player]]['color']
+
+    def next_seat(self, seat):
+        """The next occupied seat after ``seat`` in turn order"""
+        for offset in range(1, len(self.seats) + 1):
+            candidate = (seat + offset) % len(self.seats)
+            if self.seats[candidate] is not None:
+                return candidate
+        return seat
+
+    def start_game(self):
+        if len(self.players) >= 2:
+            self.game_started = True
+            self.bump_version('start',)
+            return True
+        return False
+
+    def roll_dice(self):
+        self.dice_value = self.rng.randint(1, 6)
+        self.bump_version('roll', self.dice_value)
+        return self.dice_value
+
+    def end_turn(self, extra_turn=False):
+        """Clear the dice and hand the turn on, unless the player earned another roll"""
+        self.dice_value = 0
+        if not extra_turn:
+            self.current_player = self.next_seat(self.current_player)
+        self.bump_version('turn', extra_turn)
+
+    def get_start_position(self, color):
+        """Get the starting position on the path for each color"""
+        return START_SQUARES[COLOR_INDEX[color]]
+
+    def legal_moves(self, color, dice_value=None):
+        """(piece, from_location) pairs ``color`` may play with the given or current roll"""
+        dice_value = dice_value or self.dice_value
+        return [(piece, 'home' if self.board.position(color, piece) == HOME else 'path')
+                for piece, _ in self.board.legal_moves(color, dice_value)]
+
+    def move_piece(self, player_id, color, piece, from_location):
+        """Play a move for the current roll.
+
+        Returns ``{'to': wire position, 'captured': [[color, piece], ...]}``,
+        or None if the move is not allowed.
+        """
+        # Basic move validation
+        player = self.players.get(player_id)
+        if player is None or player['color'] != color:
+            return None
+
+        # bool is an int subclass, and True would otherwise pass as piece 1
+        if self.dice_value == 0 or type(piece) is not int or piece not in range(PIECES_PER_COLOR):
+            return None
+
+        current_pos = self.board.position(color, piece)
+        if (current_pos == HOME) != (from_location == 'home'):
+            # The client's view of the piece is stale
+            return None
+
+        new_pos = self.board.destination(color, piece, self.dice_value)
+        if new_pos is None:
+            return None
+
+        captured = self.board.apply_move(color, piece, new_pos)
+        # Only the mover can have just won, and only by reaching the center
+        if new_pos == FINISHED and self.board.count(color, FINISHED) == PIECES_PER_COLOR:
+            self.winner = color
+        self.bump_version('move', player_id, color, piece, from_location)
+
+        return {
+            'to': 'safe' if new_pos == FINISHED else square_to_wire(new_pos),
+            'captured': [[captured_color, captured_piece] for captured_color, captured_piece in captured]
+        }
+
+    def check_winner(self):
+        for color in COLORS:
+            if self.board.count(color, FINISHED) == PIECES_PER_COLOR:
+                self.winner = color
+                return True
+        return False
+
+    def to_dict(self):
+        state = self.get_game_state()
+        state['last_activity'] = self.last_activity
+        return state
+
+    @classmethod
+    def from_dict(cls, data):
+        game = cls(data['game_id'])
+        game.players = data['players']
+        game.seats = data['seats']
+        game.color_seats = {game.players[player_id]['color']: seat
+                            for seat, player_id in enumerate(game.seats) if player_id is not None}
+        game.current_player = data['current_player']
+        game.dice_value = data['dice_value']
+        game.game_started = data['game_started']
+        game.winner = data['winner']
+        game.board = LudoBoard.from_wire(data['board'])
+        game.version = data['version']
+        game.last_activity = data.get('last_activity', game.last_activity)
+        return game
+
+    def state_json(self):
+        """``get_game_state()`` encoded as JSON, computed at most once per version"""
+        cached = self._state_json
+        if cached is None or cached[0] != self.version:
+            cached = self._state_json = (self.version, encode(self.get_game_state()))
+        return cached[1]
+
+    def get_game_state(self):
+        return {
+            'game_id': self.game_id,
+            'players': self.players,
+            'seats': self.seats,
+            'current_player': self.current_player,
+            'dice_value': self.dice_value,
+            'game_started': self.game_started,
+            'winner': self.winner,
+            'board': self.board.to_wire(),
+            'version': self.version
+        }
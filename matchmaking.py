@@ -0,0 +1,124 @@
+"""
+Matchmaking into public lobbies
+
+``find_game`` seats a player in an open public lobby, or opens a new one
+when none is left. Open lobbies are indexed by how many seats they have
+free and by which colors are free: ``buckets[free][color]`` is an
+insertion-ordered dict of game ids. Finding a lobby probes a fixed number
+of buckets (seat counts times colors), however many games exist. Fuller
+lobbies are tried first, so games fill and start instead of players
+spreading thinly over many lobbies.
+
+A lobby is taken out of the index while a player is being seated in it
+(``claim``), and put back by ``update`` with its new free seats. Once a
+lobby is full, ``update`` tells the caller to start it. The time from
+``find_game`` to the start of the player's game is recorded as the queue
+wait.
+
+Only games opened by matchmaking are indexed; games created with an
+explicit id stay private. The index lives in this process, so with several
+workers each one matches the players connected to it.
+"""
+import threading
+import time
+
+from ludo_engine import COLORS
+from metrics import REGISTRY
+
+WAIT_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+MATCHES = REGISTRY.counter('ludo_matchmaking_total', 'find_game requests by outcome', ('outcome',))
+QUEUE_WAIT = REGISTRY.histogram('ludo_matchmaking_wait_seconds', 'Time from find_game to the start of the game',
+                                buckets=WAIT_BUCKETS)
+
+
+def free_colors(game):
+    return [color for color in COLORS if color not in game.color_seats]
+
+
+class Matchmaker:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        # buckets[free seats][color] -> {game_id: None} of open lobbies with that color free
+        self._buckets = {free: {color: {} for color in COLORS} for free in range(1, len(COLORS) + 1)}
+        self._lobbies = {}      # indexed game_id -> (free seats, free colors)
+        self._public = set()    # every game opened by matchmaking that has not started
+        self._waiting = {}      # sid -> when it asked for a game
+
+    def __len__(self):
+        return len(self._lobbies)
+
+    def __contains__(self, game_id):
+        return game_id in self._public
+
+    def enqueue(self, sid):
+        self._waiting.setdefault(sid, self.clock())
+
+    def cancel(self, sid):
+        self._waiting.pop(sid, None)
+
+    def _index(self, game_id, colors):
+        free = len(colors)
+        self._lobbies[game_id] = (free, colors)
+        for color in colors:
+            self._buckets[free][color][game_id] = None
+
+    def _unindex(self, game_id):
+        free, colors = self._lobbies.pop(game_id, (0, ()))
+        for color in colors:
+            self._buckets[free][color].pop(game_id, None)
+
+    def open(self, game):
+        """Make a new public lobby discoverable"""
+        with self._lock:
+            self._public.add(game.game_id)
+            self._index(game.game_id, free_colors(game))
+
+    def claim(self, color=None):
+        """Take the fullest open lobby, preferring one where ``color`` is free.
+
+        Returns ``(game_id, color to seat the player with)`` and leaves the
+        lobby out of the index until ``update``; ``(None, None)`` if no lobby
+        is open.
+        """
+        with self._lock:
+            for wanted in ((color,) if color in COLORS else ()) + (None,):
+                for free in range(1, len(COLORS) + 1):
+                    for candidate in ((wanted,) if wanted else COLORS):
+                        bucket = self._buckets[free][candidate]
+                        if bucket:
+                            game_id = next(iter(bucket))
+                            self._unindex(game_id)
+                            return game_id, candidate
+        return None, None
+
+    def update(self, game):
+        """Re-index a public lobby after its players changed.
+
+        Returns True when the lobby has just filled up and should be started.
+        Started games leave the index, and the waits of their players are
+        recorded.
+        """
+        with self._lock:
+            game_id = game.game_id
+            if game_id not in self._public:
+                return False
+            self._unindex(game_id)
+            if game.game_started:
+                self._public.discard(game_id)
+                now = self.clock()
+                for player_id in game.players:
+                    asked = self._waiting.pop(player_id, None)
+                    if asked is not None:
+                        QUEUE_WAIT.observe(now - asked)
+                return False
+            colors = free_colors(game)
+            if colors:
+                self._index(game_id, colors)
+            return not colors
+
+    def remove(self, game_id):
+        with self._lock:
+            self._unindex(game_id)
+            self._public.discard(game_id)
@@ -0,0 +1,63 @@
+"""
+SQLite-backed Socket.IO message queue
+
+A drop-in stand-in for Redis when several app.py processes run on one host:
+every process appends the emits it makes to a shared table and tails the
+table for emits made by the others, so room broadcasts reach clients
+connected to any worker.
+"""
+import sqlite3
+import time
+
+import socketio
+
+import json_codec
+
+
+class SQLiteMessageQueue(socketio.PubSubManager):
+    name = 'sqlite'
+
+    def __init__(self, path, channel='socketio', write_only=False, logger=None,
+                 poll_interval=0.005, retention=60):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._publisher = None
+        self._last_purge = 0.0
+
+        db = self._connect()
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('CREATE TABLE IF NOT EXISTS messages ('
+                   'id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, '
+                   'created REAL NOT NULL, payload TEXT NOT NULL)')
+        db.close()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def _publish(self, data):
+        if self._publisher is None:
+            self._publisher = self._connect()
+
+        now = time.time()
+        self._publisher.execute('INSERT INTO messages (channel, created, payload) VALUES (?, ?, ?)',
+                                (self.channel, now, json_codec.dumps(data)))
+
+        # Old rows are only needed by listeners that fell behind; trim them now and then
+        if now - self._last_purge > self.retention:
+            self._last_purge = now
+            self._publisher.execute('DELETE FROM messages WHERE created < ?', (now - self.retention,))
+
+    def _listen(self):
+        db = self._connect()
+        last_id = db.execute('SELECT COALESCE(MAX(id), 0) FROM messages').fetchone()[0]
+        while True:
+            rows = db.execute('SELECT id, payload FROM messages WHERE id > ? AND channel = ? ORDER BY id',
+                              (last_id, self.channel)).fetchall()
+            for last_id, payload in rows:
+                yield json_codec.loads(payload)
+            if not rows:
+                time.sleep(self.poll_interval)
@@ -0,0 +1,196 @@
+"""
+In-process metrics in the Prometheus text exposition format
+
+Counters and histograms are updated on the hot path under a short per-metric
+lock; gauges are callbacks evaluated only when /metrics is scraped. Each
+worker process exposes its own numbers, which Prometheus sums across
+targets as usual.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536)
+
+# Payload sizes need a JSON encode, so only every Nth message per event is measured
+PAYLOAD_SAMPLE = max(1, int(os.environ.get('LUDO_METRICS_PAYLOAD_SAMPLE', 16)))
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (the last slot is +Inf), then sum and count
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def samples(self):
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count)
+                        for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield (f'{self.name}_bucket', _labels(self.labelnames, labels, [('le', _number(bound))]),
+                       cumulative)
+            yield f'{self.name}_sum', _labels(self.labelnames, labels), total
+            yield f'{self.name}_count', _labels(self.labelnames, labels), count
+
+
+class Gauge:
+    """Evaluated at scrape time: ``callback`` returns a number, or a {label values: number} dict"""
+    kind = 'gauge'
+
+    def __init__(self, name, help, callback, labelnames=()):
+        self.name = name
+        self.help = help
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+
+    def samples(self):
+        value = self.callback()
+        if isinstance(value, dict):
+            for labels, number in value.items():
+                yield self.name, _labels(self.labelnames, labels), number
+        else:
+            yield self.name, '', value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name, help, callback, labelnames=()):
+        return self.register(Gauge(name, help, callback, labelnames))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+EVENTS = REGISTRY.counter('ludo_socket_events_total', 'Socket.IO events handled', ('event',))
+EVENT_ERRORS = REGISTRY.counter('ludo_socket_event_errors_total', 'Socket.IO handlers that raised', ('event',))
+EVENT_LATENCY = REGISTRY.histogram('ludo_socket_event_seconds', 'Socket.IO handler latency', ('event',))
+PAYLOAD_BYTES = REGISTRY.histogram('ludo_socket_payload_bytes', 'Sampled JSON size of Socket.IO payloads',
+                                   ('event', 'direction'), SIZE_BUCKETS)
+
+_sample_counts = {}
+
+
+def _sampled(key):
+    # A racy increment only shifts which message gets sampled, so no lock here
+    count = _sample_counts.get(key, 0)
+    _sample_counts[key] = count + 1
+    return count % PAYLOAD_SAMPLE == 0
+
+
+def payload_size(payload):
+    return len(json.dumps(payload, separators=(',', ':'), default=str))
+
+
+def record_payload(event, direction, payload):
+    """Measure an inbound or outbound payload, one in PAYLOAD_SAMPLE per event and direction"""
+    if _sampled((event, direction)):
+        PAYLOAD_BYTES.observe(payload_size(payload), event, direction)
+
+
+def instrumented(event):
+    """Count calls, time them and sample inbound payload sizes for one Socket.IO event"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            if args:
+                record_payload(event, 'in', args[0] if len(args) == 1 else list(args))
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            except Exception:
+                EVENT_ERRORS.inc(event)
+                raise
+            finally:
+                EVENT_LATENCY.observe(time.perf_counter() - started, event)
+                EVENTS.inc(event)
+        return wrapper
+    return decorate
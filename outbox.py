@@ -0,0 +1,68 @@
+"""
+Per-room outbound buffers that coalesce one request's broadcasts
+
+A single move can broadcast ``dice_rolled``, ``piece_moved`` and
+``turn_changed`` to the same room. Inside ``collect()`` those broadcasts are
+held per room, and when the block exits each room gets one frame: the event
+itself if only one was produced, otherwise a ``batch`` event holding every
+event in order:
+
+    {"events": [{"event": "piece_moved", "data": {...}}, {"event": "turn_changed", "data": {...}}]}
+
+Buffers are per thread (per green thread under eventlet and gevent), so
+concurrent requests never mix their events. Apps should collect inside the
+game lock, so a game's frames leave in version order. Outside ``collect()``
+every broadcast is sent straight away.
+"""
+import threading
+from contextlib import contextmanager
+
+from metrics import REGISTRY
+
+BATCH_EVENT = 'batch'
+
+FRAMES = REGISTRY.counter('ludo_outbox_frames_total', 'Room frames sent by the outbox', ('kind',))
+COALESCED = REGISTRY.counter('ludo_outbox_coalesced_events_total', 'Broadcasts folded into batch frames')
+
+
+class Outbox:
+    def __init__(self, send):
+        # send(room, event, data) writes one frame to a room
+        self.send = send
+        self._local = threading.local()
+
+    def _pending(self):
+        return getattr(self._local, 'pending', None)
+
+    @contextmanager
+    def collect(self):
+        """Hold broadcasts made in the block and send one frame per room when it exits"""
+        if self._pending() is not None:
+            # Nested: the outermost block flushes
+            yield
+            return
+
+        self._local.pending = {}
+        try:
+            yield
+        finally:
+            # State has changed even if the block failed, so the clients still hear about it
+            pending, self._local.pending = self._local.pending, None
+            self.flush(pending)
+
+    def add(self, room, event, data):
+        pending = self._pending()
+        if pending is None:
+            self.send(room, event, data)
+        else:
+            pending.setdefault(room, []).append((event, data))
+
+    def flush(self, pending):
+        for room, events in pending.items():
+            if len(events) == 1:
+                FRAMES.inc('single')
+                self.send(room, *events[0])
+            else:
+                FRAMES.inc('batch')
+                COALESCED.inc(amount=len(events))
+                self.send(room, BATCH_EVENT, {'events': [{'event': event, 'data': data} for event, data in events]})
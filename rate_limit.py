@@ -0,0 +1,114 @@
+"""
+Token-bucket rate limits per connection and event
+
+Each (sid, event) pair gets a bucket holding up to ``burst`` tokens that
+refills at ``rate`` tokens per second. A request spends one token; with
+none left it is rejected before the handler runs, so a flooding client
+costs a dict lookup and a little arithmetic per message instead of a game
+lock and a broadcast. Buckets are refilled lazily when used, so there is no
+timer, and a connection holds one small bucket per event type it has sent.
+
+Limits come from DEFAULT_LIMITS, overridden by LUDO_RATE_LIMITS, for
+example ``chat_message=1/5,roll_dice=5/10`` (rate/burst). Events without a
+limit are never throttled; LUDO_RATE_LIMITS=off turns limiting off.
+"""
+import functools
+import os
+import threading
+import time
+
+from metrics import REGISTRY
+
+# event -> (tokens per second, burst)
+DEFAULT_LIMITS = {
+    'create_game': (0.5, 5),
+    'join_game': (0.5, 5),
+    'rejoin_game': (0.5, 5),
+    'resume_session': (0.5, 5),
+    'find_game': (0.5, 5),
+    'start_game': (1, 3),
+    'add_bot': (1, 3),
+    'roll_dice': (5, 10),
+    'move_piece': (5, 10),
+    'pass_turn': (5, 10),
+    'sync_state': (2, 10),
+    'chat_message': (1, 5)
+}
+
+REJECTED = REGISTRY.counter('ludo_rate_limited_total', 'Requests rejected by the rate limiter', ('event',))
+
+
+def parse_limits(spec):
+    """'chat_message=1/5,roll_dice=5/10' -> {'chat_message': (1.0, 5.0), 'roll_dice': (5.0, 10.0)}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        event, _, limit = item.partition('=')
+        rate, _, burst = limit.partition('/')
+        limits[event.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
+def limits_from_env():
+    spec = os.environ.get('LUDO_RATE_LIMITS', '')
+    if spec.strip().lower() == 'off':
+        return {}
+    return {**DEFAULT_LIMITS, **parse_limits(spec)}
+
+
+class RateLimiter:
+    def __init__(self, limits=None, clock=time.monotonic):
+        self.limits = dict(limits_from_env() if limits is None else limits)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._buckets = {}      # sid -> {event: [tokens, last refill, rejections in a row]}
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def acquire(self, sid, event):
+        """Spend a token of ``sid``'s bucket for ``event``.
+
+        Returns 0 if the request may proceed, otherwise how many requests in
+        a row have now been rejected.
+        """
+        limit = self.limits.get(event)
+        if limit is None:
+            return 0
+        rate, burst = limit
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.setdefault(sid, {}).get(event)
+            if bucket is None:
+                self._buckets[sid][event] = [burst - 1, now, 0]
+                return 0
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return bucket[2]
+            bucket[0] -= 1
+            bucket[2] = 0
+            return 0
+
+    def allow(self, sid, event):
+        return self.acquire(sid, event) == 0
+
+    def forget(self, sid):
+        with self._lock:
+            self._buckets.pop(sid, None)
+
+    def guard(self, event, key, on_reject):
+        """Decorate a handler so it only runs while ``key()`` is within the limit for ``event``"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args):
+                rejected = self.acquire(key(), event)
+                if rejected:
+                    REJECTED.inc(event)
+                    # Tell the client once per throttled spell, not once per dropped message
+                    if rejected == 1:
+                        on_reject(event)
+                    return None
+                return func(*args)
+            return wrapper
+        return decorate
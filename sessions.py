@@ -0,0 +1,71 @@
+"""
+Resumable player sessions: signed seat tokens and a per-game catch-up log
+
+Players are identified by their Socket.IO sid, which changes on every
+reconnect. On create and join a player gets a token signed with the app's
+secret, naming the game and the player id that holds the seat. A new
+connection that presents the token takes the seat over (``rebind_player``)
+and is sent a fresh token for its own id, but only while the seat is held
+for a disconnected player. Old tokens then no longer match any seat.
+
+Each game also keeps its last few broadcast deltas, in version order. A
+client that resumes with the version it last applied gets just the events
+after it, or a full snapshot when the log no longer reaches back that far.
+"""
+import threading
+from collections import deque
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+# Keys published with the source; anyone could sign a token for any seat with them
+PUBLISHED_SECRETS = frozenset({'ludo_game_secret_key'})
+
+
+class SessionTokens:
+    def __init__(self, secret, max_age=24 * 60 * 60):
+        if not secret or secret in PUBLISHED_SECRETS:
+            raise ValueError('Session tokens need a private secret - set SECRET_KEY')
+        self.max_age = max_age
+        self._serializer = URLSafeTimedSerializer(secret, salt='ludo-session')
+
+    def issue(self, game_id, player_id):
+        return self._serializer.dumps({'game_id': game_id, 'player_id': player_id})
+
+    def verify(self, token):
+        """(game_id, player_id) from a token; (None, None) if it is forged, malformed or too old"""
+        try:
+            claims = self._serializer.loads(token, max_age=self.max_age)
+        except (BadSignature, TypeError, ValueError):
+            return None, None
+        return claims.get('game_id'), claims.get('player_id')
+
+
+class EventLog:
+    """The last ``max_events`` versioned deltas of each game"""
+
+    def __init__(self, max_events=32):
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._games = {}
+
+    def __len__(self):
+        return len(self._games)
+
+    def record(self, game_id, event, delta):
+        with self._lock:
+            events = self._games.get(game_id)
+            if events is None:
+                events = self._games[game_id] = deque(maxlen=self.max_events)
+            events.append((delta['version'], event, delta))
+
+    def since(self, game_id, version):
+        """The events after ``version`` as batch entries, or None if some of them are gone"""
+        with self._lock:
+            events = self._games.get(game_id)
+            if not events or events[0][0] > version + 1:
+                return None
+            return [{'event': event, 'data': delta} for logged, event, delta in events if logged > version]
+
+    def drop_game(self, game_id):
+        with self._lock:
+            self._games.pop(game_id, None)
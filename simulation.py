@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Headless self-play for LudoGame
+
+Plays complete games with pluggable move policies and no Socket.IO in the
+loop, following the same turn flow as the server: a roll with no legal move
+passes the turn, a single legal move is played automatically, and a six that
+was played earns another roll. Batches run across a multiprocessing pool and
+report throughput plus aggregate statistics.
+
+    python simulation.py --games 100000 --players 4 --policy greedy --seed 1
+"""
+import argparse
+import multiprocessing
+import random
+import time
+
+from bots import choose_move, decision_request
+from ludo_engine import COLORS, FINISHED, HOME, SAFE_SQUARES, TRACK_SQUARES, LudoGame
+
+# Colors seated for each player count; two players sit opposite each other
+SEAT_COLORS = {
+    2: ('red', 'green'),
+    3: ('red', 'blue', 'green'),
+    4: COLORS
+}
+
+MAX_ROLLS = 20000
+
+
+def first_policy(game, color, moves):
+    """Always play the lowest-numbered piece that can move"""
+    return moves[0]
+
+
+def random_policy(game, color, moves):
+    return game.rng.choice(moves)
+
+
+def greedy_policy(game, color, moves):
+    """Finish, capture, leave home, reach safety, otherwise run the leading piece"""
+    board = game.board
+
+    def score(move):
+        piece, _ = move
+        square = board.destination(color, piece, game.dice_value)
+        if square == FINISHED:
+            return 400
+        if board.position(color, piece) == HOME:
+            return 200
+        if square < TRACK_SQUARES:
+            if square not in SAFE_SQUARES and board.opponents_at(square, color):
+                return 300
+            if square in SAFE_SQUARES:
+                return 100
+        return square if square >= TRACK_SQUARES else 0
+
+    return max(moves, key=score)
+
+
+def expectimax_policy(game, color, moves):
+    """The server's bot, searched to a fixed depth so seeded games stay reproducible"""
+    request = decision_request(game)
+    piece, _ = choose_move(request['positions'], request['colors'], request['mover'], request['dice'],
+                           max_depth=2)
+    return next(move for move in moves if move[0] == piece)
+
+
+POLICIES = {
+    'first': first_policy,
+    'random': random_policy,
+    'greedy': greedy_policy,
+    'expectimax': expectimax_policy
+}
+
+
+def play_game(policies, seed=None, max_rolls=MAX_ROLLS, rng=None):
+    """Play one game to the end; ``policies`` holds one policy per seat.
+
+    The dice come from ``rng`` if given, otherwise from a Random seeded with
+    ``seed``. Returns a dict with the winning seat (None if ``max_rolls`` ran
+    out), the number of rolls and the number of captures.
+    """
+    game = LudoGame('simulation', rng=rng if rng is not None else random.Random(seed))
+    for seat, color in enumerate(SEAT_COLORS[len(policies)]):
+        game.add_player(f'seat{seat}', f'Bot {seat}', color)
+    game.start_game()
+
+    rolls = captures = 0
+    while game.winner is None and rolls < max_rolls:
+        seat = game.current_player
+        color = game.current_color()
+        dice_value = game.roll_dice()
+        rolls += 1
+
+        moves = game.legal_moves(color)
+        if not moves:
+            game.end_turn()
+            continue
+
+        piece, from_location = moves[0] if len(moves) == 1 else policies[seat](game, color, moves)
+        result = game.move_piece(game.current_player_id(), color, piece, from_location)
+        captures += len(result['captured'])
+        if game.winner is None:
+            game.end_turn(extra_turn=dice_value == 6)
+
+    winner = game.color_seats[game.winner] if game.winner else None
+    return {'winner_seat': winner, 'rolls': rolls, 'captures': captures}
+
+
+def _play_chunk(args):
+    first_index, count, policy_names, seed = args
+    policies = [POLICIES[name] for name in policy_names]
+    stats = empty_stats(len(policies))
+    for index in range(first_index, first_index + count):
+        # Every game gets its own seed, so results do not depend on how games are chunked
+        result = play_game(policies, seed=None if seed is None else (seed << 32) + index)
+        add_result(stats, result)
+    return stats
+
+
+def empty_stats(players):
+    return {'games': 0, 'wins': [0] * players, 'unfinished': 0, 'rolls': 0, 'captures': 0}
+
+
+def add_result(stats, result):
+    stats['games'] += 1
+    stats['rolls'] += result['rolls']
+    stats['captures'] += result['captures']
+    if result['winner_seat'] is None:
+        stats['unfinished'] += 1
+    else:
+        stats['wins'][result['winner_seat']] += 1
+
+
+def merge_stats(total, part):
+    for key in ('games', 'unfinished', 'rolls', 'captures'):
+        total[key] += part[key]
+    total['wins'] = [a + b for a, b in zip(total['wins'], part['wins'])]
+
+
+def run_batch(games, policy_names, processes=None, seed=None, chunk_size=250):
+    """Play ``games`` games across a process pool and return aggregate statistics"""
+    jobs = [(start, min(chunk_size, games - start), tuple(policy_names), seed)
+            for start in range(0, games, chunk_size)]
+    stats = empty_stats(len(policy_names))
+
+    started = time.perf_counter()
+    if processes == 1:
+        for job in jobs:
+            merge_stats(stats, _play_chunk(job))
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            for part in pool.imap_unordered(_play_chunk, jobs):
+                merge_stats(stats, part)
+    stats['seconds'] = time.perf_counter() - started
+
+    stats['games_per_second'] = stats['games'] / stats['seconds'] if stats['seconds'] else 0.0
+    stats['win_rate'] = [wins / stats['games'] for wins in stats['wins']]
+    stats['average_rolls'] = stats['rolls'] / stats['games']
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--players', type=int, choices=sorted(SEAT_COLORS), default=4)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='greedy',
+                        help='policy for every seat, unless --seat-policies is given')
+    parser.add_argument('--seat-policies', nargs='+', choices=sorted(POLICIES))
+    parser.add_argument('--processes', type=int, default=None, help='defaults to one per CPU')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    policy_names = args.seat_policies or [args.policy] * args.players
+    if len(policy_names) not in SEAT_COLORS:
+        parser.error('between 2 and 4 seat policies are needed')
+
+    stats = run_batch(args.games, policy_names, processes=args.processes, seed=args.seed)
+
+    print(f"🎲 {stats['games']} games in {stats['seconds']:.1f}s "
+          f"({stats['games_per_second']:.0f} games/s, {stats['games_per_second'] * 3600 / 1e6:.2f}M games/hour)")
+    print(f"📏 Average length: {stats['average_rolls']:.1f} rolls, "
+          f"{stats['captures'] / stats['games']:.1f} captures per game, {stats['unfinished']} unfinished")
+    for seat, (name, color) in enumerate(zip(policy_names, SEAT_COLORS[len(policy_names)])):
+        print(f"   seat {seat} ({color:<6} {name:<6}) win rate {stats['win_rate'][seat]:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Read-only spectators fed from a shared per-game buffer
+
+Spectators sit in their own room next to the players' room. Every delta
+broadcast to the players is also appended to the game's spectator buffer,
+a plain list append and only for games that have viewers. A background
+tick drains each buffer at most once per ``interval`` into a single
+``spectator_batch`` emit to the spectator room. The batch is encoded once
+however many people watch, and spectators never add work to the
+handlers serving the players. A buffer that outgrows ``max_events``
+between ticks is dropped and the viewers are sent one snapshot instead.
+"""
+import threading
+
+
+class SpectatorHub:
+    def __init__(self, interval=0.5, max_events=200):
+        self.interval = interval
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._viewers = {}      # game_id -> set of sids
+        self._games = {}        # sid -> game_id
+        self._buffers = {}      # game_id -> [(event, data), ...] or None after an overflow
+
+    @staticmethod
+    def room(game_id):
+        return f'{game_id}:spectators'
+
+    def __len__(self):
+        return len(self._games)
+
+    def count(self, game_id):
+        return len(self._viewers.get(game_id, ()))
+
+    def game_id_for(self, sid):
+        return self._games.get(sid)
+
+    def join(self, sid, game_id):
+        """Watch ``game_id``; returns the other game ``sid`` stopped watching, if any"""
+        with self._lock:
+            previous = self._forget(sid) if self._games.get(sid) != game_id else None
+            self._games[sid] = game_id
+            self._viewers.setdefault(game_id, set()).add(sid)
+            self._buffers.setdefault(game_id, [])
+            return previous
+
+    def leave(self, sid):
+        """Forget ``sid``; returns the game it was watching, if any"""
+        with self._lock:
+            return self._forget(sid)
+
+    def _forget(self, sid):
+        game_id = self._games.pop(sid, None)
+        viewers = self._viewers.get(game_id)
+        if viewers is not None:
+            viewers.discard(sid)
+            if not viewers:
+                del self._viewers[game_id]
+                self._buffers.pop(game_id, None)
+        return game_id
+
+    def drop_game(self, game_id):
+        with self._lock:
+            for sid in self._viewers.pop(game_id, ()):
+                self._games.pop(sid, None)
+            self._buffers.pop(game_id, None)
+
+    def publish(self, game_id, event, data):
+        # Unlocked membership test: games nobody watches pay one dict lookup
+        if game_id not in self._viewers:
+            return
+        with self._lock:
+            buffer = self._buffers.get(game_id)
+            if buffer is None:
+                return
+            if len(buffer) >= self.max_events:
+                self._buffers[game_id] = None
+            else:
+                buffer.append((event, data))
+
+    def drain(self):
+        """Take every pending buffer: [(game_id, events or None if the viewers need a snapshot)]"""
+        with self._lock:
+            pending = [(game_id, buffer) for game_id, buffer in self._buffers.items() if buffer != []]
+            for game_id, _ in pending:
+                self._buffers[game_id] = []
+        return pending
@@ -1,14 +1,56 @@
 // Game page JavaScript
-const socket = io();
+
+// Opened with ?wire=msgpack: receive game broadcasts as binary msgpack, once the library has loaded
+const WANTS_MSGPACK = new URLSearchParams(window.location.search).get('wire') === 'msgpack';
+const MSGPACK_SRC = 'https://cdn.jsdelivr.net/npm/@msgpack/msgpack@2.8.0/dist.es5+umd/msgpack.min.js';
+// Connects at the end of this file, after every handler is registered
+const socket = io({ autoConnect: false });
+
+const WIRE_COLORS = ['red', 'blue', 'green', 'yellow'];
+
+function squareToWire(square) {
+    if (square < 52) return square;
+    const column = square - 52;
+    return `${WIRE_COLORS[Math.floor(column / 5)]}-${column % 5}`;
+}
+
+// Binary piece_moved is positional (see wire_format.py); expand it to the JSON shape
+function expandPieceMoved([version, color, piece, fromHome, to, diceValue, winner, ...captured]) {
+    return {
+        color: WIRE_COLORS[color],
+        piece: piece,
+        from: fromHome ? 'home' : 'path',
+        to: to === 127 ? 'safe' : squareToWire(to),
+        captured: captured.map((index) => [WIRE_COLORS[Math.floor(index / 4)], index % 4]),
+        dice_value: diceValue,
+        winner: winner >= 0 ? WIRE_COLORS[winner] : null,
+        version: version
+    };
+}
+
+if (WANTS_MSGPACK) {
+    // Decode binary payloads before any handler sees them
+    const addListener = socket.on.bind(socket);
+    socket.on = (event, handler) => addListener(event, (data) => {
+        if (data instanceof ArrayBuffer) data = MessagePack.decode(new Uint8Array(data));
+        // Compact either as its own frame or inside a batch
+        if (event === 'piece_moved' && Array.isArray(data)) data = expandPieceMoved(data);
+        return handler(data);
+    });
+}
 
 // Game state
 let gameState = null;
 let currentPlayer = null;
 let myColor = null;
+let syncPending = false;
+// Opened with ?spectate=1: watch the game read-only
+const spectating = new URLSearchParams(window.location.search).get('spectate') === '1';
 
 // DOM elements
 const playersList = document.getElementById('playersList');
 const startGameBtn = document.getElementById('startGameBtn');
+const addBotBtn = document.getElementById('addBotBtn');
 const leaveGameBtn = document.getElementById('leaveGameBtn');
 const rollDiceBtn = document.getElementById('rollDiceBtn');
 const passTurnBtn = document.getElementById('passTurnBtn');
@@ -28,18 +70,62 @@ document.addEventListener('DOMContentLoaded', function() {
     setupEventListeners();
     initializeBoard();
     
-    // Auto-join if coming from main page
+    if (spectating) {
+        socket.emit('rejoin_game', { game_id: GAME_ID, spectate: true });
+    } else if (GAME_ID && sessionStorage.getItem(sessionKey(GAME_ID))) {
+        // Our seat is held from the menu page (or from before a reload): take it back
+        resumeSession();
+    } else {
+        joinFromUrl();
+    }
+});
+
+// Auto-join if coming from main page
+function joinFromUrl() {
     const urlParams = new URLSearchParams(window.location.search);
     const playerName = urlParams.get('name');
     const color = urlParams.get('color');
     
-    if (playerName && color) {
+    if (playerName && !GAME_ID) {
+        // Quick match: the server picks the game and, if the color is taken, another color
+        socket.emit('find_game', {
+            player_name: playerName,
+            color: color
+        });
+    } else if (playerName && color) {
         socket.emit('join_game', {
             game_id: GAME_ID,
             player_name: playerName,
             color: color
         });
     }
+}
+
+// Resumable sessions: the server signs a token for our seat on create and join.
+// sessionStorage keeps it across the menu -> game page navigation and reloads.
+function sessionKey(gameId) {
+    return `ludo-session-${gameId}`;
+}
+
+// Retries while the connection we take over (e.g. the menu page's) is still open; the server
+// sees it close within its ping timeout (45 s by default) at the latest
+const MAX_RESUME_ATTEMPTS = 30;
+let resumeAttempts = 0;
+
+function resumeSession() {
+    socket.emit('resume_session', {
+        token: sessionStorage.getItem(sessionKey(GAME_ID)),
+        version: gameState ? gameState.version : null
+    });
+}
+
+let connectedBefore = false;
+socket.on('connect', () => {
+    // Socket.IO reconnects under a new id; the server holds our seat for a while
+    if (connectedBefore && gameState && !spectating && sessionStorage.getItem(sessionKey(GAME_ID))) {
+        resumeSession();
+    }
+    connectedBefore = true;
 });
 
 function setupEventListeners() {
@@ -48,6 +134,10 @@ function setupEventListeners() {
         socket.emit('start_game');
     });
     
+    addBotBtn.addEventListener('click', () => {
+        socket.emit('add_bot');
+    });
+    
     leaveGameBtn.addEventListener('click', () => {
         if (confirm('Are you sure you want to leave the game?')) {
             window.location.href = '/';
@@ -125,8 +215,9 @@ function initializeBoard() {
         square.classList.add('occupied');
     });
     
-    // Create simple path for testing
+    // Create the shared track and each color's home column
     createSimplePath();
+    createHomeStretches();
 }
 
 function createSimplePath() {
@@ -447,6 +538,12 @@ function createPiece(color, pieceId, row, col) {
     }
 }
 
+function getCurrentPlayerColor(state) {
+    // Turns follow the seat table; a seat vacated mid-game holds null
+    const playerId = state.seats[state.current_player];
+    return playerId ? state.players[playerId].color : null;
+}
+
 function handlePieceClick(color, piece, location) {
     if (!gameState || !gameState.game_started) {
         showNotification('Game not started yet!', 'error');
@@ -459,8 +556,7 @@ function handlePieceClick(color, piece, location) {
     }
     
     // Check if it's the player's turn
-    const playerColors = Object.values(gameState.players).map(p => p.color);
-    const currentPlayerColor = playerColors[gameState.current_player];
+    const currentPlayerColor = getCurrentPlayerColor(gameState);
     if (currentPlayerColor !== myColor) {
         showNotification('Wait for your turn!', 'error');
         return;
@@ -516,8 +612,7 @@ function handlePathSquareClick(position) {
     }
     
     // Check if it's the player's turn
-    const playerColors = Object.values(gameState.players).map(p => p.color);
-    const currentPlayerColor = playerColors[gameState.current_player];
+    const currentPlayerColor = getCurrentPlayerColor(gameState);
     if (currentPlayerColor !== myColor) {
         showNotification('Wait for your turn!', 'error');
         return;
@@ -553,7 +648,7 @@ function updatePlayersList(players) {
         
         playerItem.innerHTML = `
             <div class="player-color ${playerData.color}"></div>
-            <span class="player-name">${playerData.name}</span>
+            <span class="player-name">${playerData.name}${playerData.bot ? ' 🤖' : ''}</span>
             <span class="player-status">Ready</span>
         `;
         
@@ -562,9 +657,12 @@ function updatePlayersList(players) {
     
     // Show start button if I'm the first player and we have enough players
     const playerCount = Object.keys(players).length;
-    if (playerCount >= 2 && Object.keys(players)[0] === socket.id) {
+    if (playerCount >= 2 && gameState.seats[0] === socket.id) {
         startGameBtn.style.display = 'block';
     }
+    // The first player can fill free seats with bots until the game starts
+    const canAddBot = !gameState.game_started && playerCount < 4 && gameState.seats[0] === socket.id;
+    addBotBtn.style.display = canAddBot ? 'block' : 'none';
 }
 
 function updateGameState(newGameState) {
@@ -576,10 +674,10 @@ function updateGameState(newGameState) {
     
     if (gameState.game_started) {
         startGameBtn.style.display = 'none';
+        addBotBtn.style.display = 'none';
         
         // Update current turn display
-        const playerColors = Object.values(gameState.players).map(p => p.color);
-        const currentPlayerColor = playerColors[gameState.current_player];
+        const currentPlayerColor = getCurrentPlayerColor(gameState);
         currentTurn.textContent = `Current Turn: ${currentPlayerColor.toUpperCase()}`;
         
         // Enable/disable dice based on turn and dice state
@@ -725,33 +823,167 @@ function showNotification(message, type = 'info') {
     }, 3000);
 }
 
+// Versioned state protocol: the server sends a full snapshot on join and
+// compact diffs afterwards. A diff applies only on top of the version right
+// before it; anything else means we missed an event and need a snapshot.
+function applyDelta(data, apply) {
+    if (gameState && data.version <= gameState.version) {
+        // Already reflected in the snapshot we hold
+        return false;
+    }
+    
+    if (!gameState || data.version !== gameState.version + 1) {
+        requestSnapshot();
+        return false;
+    }
+    
+    apply(gameState);
+    gameState.version = data.version;
+    return true;
+}
+
+function requestSnapshot() {
+    if (syncPending) return;
+    
+    syncPending = true;
+    socket.emit('sync_state', { game_id: GAME_ID });
+}
+
+function loadSnapshot(snapshot) {
+    syncPending = false;
+    updateGameState(snapshot);
+    updateBoardDisplay(snapshot);
+}
+
 // Socket event listeners
 socket.on('game_joined', (data) => {
-    updateGameState(data.game_state);
-    updateBoardDisplay(data.game_state);
+    if (!GAME_ID) {
+        // Seated by matchmaking: make the page address the game like any other
+        GAME_ID = data.game_id;
+        document.querySelector('.game-id').textContent = `Room: ${GAME_ID}`;
+        const color = data.game_state.players[data.player_id].color;
+        const name = new URLSearchParams(window.location.search).get('name');
+        history.replaceState(null, '', `/game/${GAME_ID}?name=${encodeURIComponent(name)}&color=${color}`);
+    }
+    sessionStorage.setItem(sessionKey(data.game_id), data.session_token);
+    loadSnapshot(data.game_state);
     showNotification('Joined game successfully!', 'success');
 });
 
+socket.on('game_rejoined', (data) => {
+    loadSnapshot(data.game_state);
+    if (data.role === 'spectator') {
+        showNotification('Watching as a spectator', 'info');
+    }
+});
+
+socket.on('session_resumed', (data) => {
+    const reconnected = gameState !== null;
+    resumeAttempts = 0;
+    sessionStorage.setItem(sessionKey(data.game_id), data.session_token);
+    if (data.game_state) {
+        loadSnapshot(data.game_state);
+    } else {
+        // Only what happened while we were away
+        dispatchEvents(data.events);
+    }
+    if (reconnected) showNotification('Reconnected', 'success');
+});
+
+socket.on('session_busy', (data) => {
+    if (++resumeAttempts < MAX_RESUME_ATTEMPTS) {
+        setTimeout(resumeSession, data.retry_seconds * 1000);
+    } else {
+        resumeAttempts = 0;
+        showNotification(data.message, 'error');
+    }
+});
+
+socket.on('session_invalid', (data) => {
+    sessionStorage.removeItem(sessionKey(GAME_ID));
+    if (gameState) {
+        showNotification(data.message, 'error');
+    } else {
+        joinFromUrl();
+    }
+});
+
+// Replay batched events through the normal handlers, in order
+function dispatchEvents(events) {
+    events.forEach(({ event, data: payload }) => {
+        socket.listeners(event).forEach((handler) => handler(payload));
+    });
+}
+
+// Everything one request broadcast to the room (e.g. piece_moved + turn_changed) arrives as one frame
+socket.on('batch', (data) => dispatchEvents(data.events));
+
+// Spectators receive the room's deltas in batches on a timer
+socket.on('spectator_batch', (data) => dispatchEvents(data.events));
+
+socket.on('state_snapshot', (data) => {
+    loadSnapshot(data.game_state);
+});
+
 socket.on('player_joined', (data) => {
-    updateGameState(data.game_state);
+    const applied = applyDelta(data, (state) => {
+        state.players[data.player_id] = { name: data.player_name, color: data.color };
+        if (data.bot) state.players[data.player_id].bot = data.bot;
+        state.seats[data.seat] = data.player_id;
+    });
+    if (applied) updateGameState(gameState);
     addChatMessage(`${data.player_name} joined the game`, true);
 });
 
+socket.on('player_away', (data) => {
+    applyDelta(data, (state) => {
+        if (state.players[data.player_id]) state.players[data.player_id].away = true;
+    });
+    addChatMessage(`${data.player_name} lost connection - their seat is held for ${data.grace_seconds}s`, true);
+});
+
+socket.on('player_rebound', (data) => {
+    const applied = applyDelta(data, (state) => {
+        state.players = Object.fromEntries(Object.entries(state.players).map(
+            ([playerId, player]) => [playerId === data.old_player_id ? data.player_id : playerId, player]));
+        if (state.players[data.player_id]) delete state.players[data.player_id].away;
+        state.seats = state.seats.map((playerId) => playerId === data.old_player_id ? data.player_id : playerId);
+    });
+    if (applied) updateGameState(gameState);
+    if (data.player_id !== socket.id) addChatMessage(`${data.player_name} reconnected`, true);
+});
+
 socket.on('player_left', (data) => {
-    updateGameState(data.game_state);
+    const applied = applyDelta(data, (state) => {
+        delete state.players[data.player_id];
+        state.seats = data.seats;
+        state.current_player = data.current_player;
+        state.dice_value = data.dice_value;
+    });
+    if (applied) updateGameState(gameState);
     addChatMessage(`${data.player_name} left the game`, true);
 });
 
 socket.on('game_started', (data) => {
-    updateGameState(data.game_state);
-    updateBoardDisplay(data.game_state);
+    const applied = applyDelta(data, (state) => {
+        state.game_started = true;
+        state.current_player = data.current_player;
+    });
+    if (applied) {
+        updateGameState(gameState);
+        updateBoardDisplay(gameState);
+    }
     addChatMessage('Game started! Roll the dice to begin.', true);
     showNotification('Game started!', 'success');
 });
 
 socket.on('dice_rolled', (data) => {
     updateDice(data.dice_value);
-    updateGameState(data.game_state);
+    const applied = applyDelta(data, (state) => {
+        state.dice_value = data.dice_value;
+    });
+    if (!applied) return;
+    updateGameState(gameState);
     
     // Find the player who rolled
     const rollingPlayer = Object.entries(gameState.players).find(([id, player]) => id === data.player_id);
@@ -769,26 +1001,90 @@ socket.on('dice_rolled', (data) => {
 
 socket.on('piece_moved', (data) => {
     // Handle piece movement animation
-    updateGameState(data.game_state);
-    updateBoardDisplay(data.game_state);
+    const applied = applyDelta(data, (state) => {
+        const pieces = state.board[data.color];
+        if (data.from === 'home') {
+            pieces.home = pieces.home.filter(pieceId => pieceId !== data.piece);
+        }
+        if (data.to === 'safe') {
+            delete pieces.path[data.piece];
+            pieces.safe.push(data.piece);
+        } else {
+            pieces.path[data.piece] = data.to;
+        }
+        
+        // Captured pieces go back home
+        data.captured.forEach(([color, pieceId]) => {
+            delete state.board[color].path[pieceId];
+            state.board[color].home.push(pieceId);
+            state.board[color].home.sort();
+        });
+        
+        state.dice_value = data.dice_value;
+        state.winner = data.winner;
+    });
+    if (applied) {
+        updateGameState(gameState);
+        updateBoardDisplay(gameState);
+    }
     addChatMessage(`${data.color.toUpperCase()} moved piece ${data.piece}`, true);
+    data.captured.forEach(([color, pieceId]) => {
+        addChatMessage(`${data.color.toUpperCase()} captured ${color.toUpperCase()} piece ${pieceId}`, true);
+    });
 });
 
 socket.on('turn_changed', (data) => {
-    updateGameState(data.game_state);
+    const applied = applyDelta(data, (state) => {
+        state.current_player = data.current_player;
+        state.dice_value = 0;
+    });
+    if (!applied) return;
+    updateGameState(gameState);
     
     if (data.message) {
         addChatMessage(data.message, true);
     } else {
-        const playerColors = Object.values(data.game_state.players).map(p => p.color);
-        const currentPlayerColor = playerColors[data.game_state.current_player];
+        const currentPlayerColor = getCurrentPlayerColor(gameState);
         addChatMessage(`It's ${currentPlayerColor.toUpperCase()}'s turn`, true);
     }
 });
 
-socket.on('chat_message', (data) => {
-    console.log('Received chat message:', data);
-    addChatMessage(`${data.player_name}: ${data.message}`);
+socket.on('turn_reminder', (data) => {
+    if (data.current_player !== gameState.current_player) return;
+    if (gameState.seats[data.current_player] === socket.id) {
+        addChatMessage(`⏰ ${data.seconds_left} seconds left to play your turn!`, true);
+    } else {
+        const currentPlayerColor = getCurrentPlayerColor(gameState);
+        addChatMessage(`⏰ ${currentPlayerColor.toUpperCase()} has ${data.seconds_left} seconds left`, true);
+    }
+});
+
+// History is resent on every rejoin, so remember which messages are already shown
+const shownChat = new Set();
+
+function showChatMessages(messages) {
+    messages.forEach((data) => {
+        const key = `${data.timestamp}:${data.seq}`;
+        if (shownChat.has(key)) return;
+        shownChat.add(key);
+        const time = new Date(data.timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+        addChatMessage(`[${time}] ${data.player_name}: ${data.message}`);
+    });
+}
+
+socket.on('chat_message', (data) => showChatMessages([data]));
+
+// Messages sent while the room was busy, merged by the server
+socket.on('chat_batch', (data) => showChatMessages(data.messages));
+
+socket.on('chat_history', (data) => showChatMessages(data.messages));
+
+socket.on('game_expired', (data) => {
+    showNotification('This game was closed after being idle for too long', 'error');
+    rollDiceBtn.disabled = true;
+    setTimeout(() => {
+        window.location.href = '/';
+    }, 3000);
 });
 
 socket.on('error', (data) => {
@@ -803,8 +1099,24 @@ socket.on('disconnect', () => {
 socket.on('reconnect', () => {
     showNotification('Reconnected to server', 'success');
     // Rejoin the game room
-    socket.emit('rejoin_game', { game_id: GAME_ID });
+    socket.emit('rejoin_game', { game_id: GAME_ID, spectate: spectating });
 });
 
 // Initialize dice display
-updateDice(1);
\ No newline at end of file
+updateDice(1);
+
+function connectSocket(wire) {
+    socket.auth = { wire: wire };
+    socket.connect();
+}
+
+if (WANTS_MSGPACK) {
+    // Only clients that ask for msgpack download the library; without it they fall back to JSON
+    const script = document.createElement('script');
+    script.src = MSGPACK_SRC;
+    script.onload = () => connectSocket(window.MessagePack ? 'msgpack' : 'json');
+    script.onerror = () => connectSocket('json');
+    document.head.appendChild(script);
+} else {
+    connectSocket('json');
+}
@@ -30,6 +30,20 @@ function setupEventListeners() {
         });
     });
     
+    // Quick match: the game page asks the server for a seat in an open lobby
+    document.getElementById('quickMatchBtn').addEventListener('click', function() {
+        const formData = new FormData(createGameForm);
+        const playerName = formData.get('playerName').trim();
+        const color = formData.get('color');
+        
+        if (!playerName) {
+            showNotification('Please enter your name', 'error');
+            return;
+        }
+        
+        window.location.href = `/match?name=${encodeURIComponent(playerName)}&color=${color}`;
+    });
+    
     // Join game form
     joinGameForm.addEventListener('submit', function(e) {
         e.preventDefault();
@@ -52,7 +66,13 @@ function setupEventListeners() {
 }
 
 // Socket event listeners
+// The game page takes the seat over with this token when this page's connection closes
+function saveSession(data) {
+    sessionStorage.setItem(`ludo-session-${data.game_id}`, data.session_token);
+}
+
 socket.on('game_created', function(data) {
+    saveSession(data);
     showNotification('Game created successfully!', 'success');
     setTimeout(() => {
         // Get the player info from the form that was just submitted
@@ -60,11 +80,14 @@ socket.on('game_created', function(data) {
         const playerName = formData.get('playerName').trim();
         const color = formData.get('color');
         
+        // Close now so the server holds the seat for the game page instead of waiting out a ping timeout
+        socket.disconnect();
         window.location.href = `/game/${data.game_id}?name=${encodeURIComponent(playerName)}&color=${color}`;
     }, 1000);
 });
 
 socket.on('game_joined', function(data) {
+    saveSession(data);
     showNotification('Joined game successfully!', 'success');
     setTimeout(() => {
         // Get the player info from the form that was just submitted
@@ -72,6 +95,8 @@ socket.on('game_joined', function(data) {
         const playerName = formData.get('playerName').trim();
         const color = formData.get('joinColor');
         
+        // Close now so the server holds the seat for the game page instead of waiting out a ping timeout
+        socket.disconnect();
         window.location.href = `/game/${data.game_id}?name=${encodeURIComponent(playerName)}&color=${color}`;
     }, 1000);
 });
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Tests for the expectimax bots in bots.py and their seats in the app
+"""
+import time
+from array import array
+
+import bots
+from bots import EXPECTIMAX, BotPool, choose_move, decide_batch, decision_request
+from ludo_engine import COLOR_INDEX, FINISHED, HOME, LudoGame
+
+RED, BLUE = COLOR_INDEX['red'], COLOR_INDEX['blue']
+
+
+def board_bytes(squares):
+    """Position bytes from {piece index: square}; every other piece is at home"""
+    positions = array('b', [HOME] * 16)
+    for index, square in squares.items():
+        positions[index] = square
+    return positions.tobytes()
+
+
+def test_a_winning_move_beats_everything_else():
+    # Red has three pieces in and one two steps from the center; a 2 wins
+    positions = board_bytes({0: 10, 1: FINISHED, 2: FINISHED, 3: 55})
+    piece, depth = choose_move(positions, (RED, BLUE), RED, 2, max_depth=2)
+    assert (piece, depth) == (3, 2)
+
+
+def test_captures_are_preferred_to_running_ahead():
+    # Red piece 0 on 10 can hit the blue piece on 14; red piece 1 could run on from 30
+    positions = board_bytes({0: 10, 1: 30, 4: 14})
+    assert choose_move(positions, (RED, BLUE), RED, 4, max_depth=2)[0] == 0
+
+
+def test_the_time_budget_stops_deepening():
+    positions = board_bytes({0: 5, 1: 20, 2: 40, 4: 18, 5: 30, 6: 44, 8: 28, 9: 33, 10: 50, 12: 45, 13: 47})
+    bots._cache.clear()
+    started = time.perf_counter()
+    _, depth = choose_move(positions, (0, 1, 2, 3), RED, 3, budget=0.05, max_depth=8)
+    assert 1 <= depth < 8
+    assert time.perf_counter() - started < 0.5
+
+
+def test_the_cache_is_shared_between_decisions():
+    positions = board_bytes({0: 10, 1: 30, 4: 20})
+    bots._cache.clear()
+    choose_move(positions, (RED, BLUE), RED, 3, max_depth=3)
+    filled = len(bots._cache)
+    assert filled
+    # The same position again is answered from the cache without new entries
+    choose_move(positions, (RED, BLUE), RED, 3, max_depth=3)
+    assert len(bots._cache) == filled
+
+
+def test_decision_requests_describe_the_seats_in_turn_order():
+    game = LudoGame('g')
+    game.add_player('p', 'Player', 'green')
+    game.add_player('b', 'Bot', 'red', bot=EXPECTIMAX)
+    game.start_game()
+    game.dice_value = 6
+    request = decision_request(game, budget=0.1)
+    assert request['colors'] == (COLOR_INDEX['green'], RED)
+    assert request['mover'] == COLOR_INDEX['green'] and request['dice'] == 6
+    assert decide_batch([request]) == [0]
+    assert game.is_bot('b') and not game.is_bot('p') and game.has_humans()
+
+
+def test_the_pool_batches_decisions_across_games():
+    games = []
+    for index in range(3):
+        game = LudoGame(f'g{index}')
+        game.add_player('b1', 'Bot 1', 'red', bot=EXPECTIMAX)
+        game.add_player('b2', 'Bot 2', 'blue', bot=EXPECTIMAX)
+        game.start_game()
+        game.board.move('red', 0, 10)
+        game.board.move('blue', 0, 14)
+        game.dice_value = 4
+        games.append(game)
+
+    pool = BotPool(workers=2, budget=0.05)
+    try:
+        for game in games:
+            pool.submit(game.game_id, game)
+        assert len(pool) == 3
+        results = {}
+        deadline = time.monotonic() + 30
+        while len(results) < 3 and time.monotonic() < deadline:
+            results.update(pool.poll())
+            time.sleep(0.01)
+        assert results == {'g0': 0, 'g1': 0, 'g2': 0}
+        assert len(pool) == 0
+    finally:
+        pool.shutdown()
+
+
+class ScriptedDie:
+    def __init__(self, *values):
+        self.values = list(values)
+
+    def randint(self, low, high):
+        return self.values.pop(0) if self.values else 3
+
+
+def frames_of(client):
+    """Every event a test client received, with batch frames unpacked"""
+    events = []
+    for packet in client.get_received():
+        if packet['name'] == 'batch':
+            events.extend((event['event'], event['data']) for event in packet['args'][0]['events'])
+        else:
+            events.append((packet['name'], packet['args'][0]))
+    return events
+
+
+def test_a_bot_seat_plays_its_turns_through_the_server():
+    import app as server
+    from app import app, registry, socketio
+
+    delay, server.BOT_DELAY = server.BOT_DELAY, 0
+    host = socketio.test_client(app)
+    try:
+        host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+        created = [packet for packet in host.get_received() if packet['name'] == 'game_created'][0]['args'][0]
+        game_id = created['game_id']
+        host.emit('add_bot', {'color': 'blue'})
+        joined = [data for event, data in frames_of(host) if event == 'player_joined']
+        assert joined[0]['bot'] == EXPECTIMAX and joined[0]['color'] == 'blue'
+
+        # Host rolls a 3 and cannot move; the bot rolls a 6, chooses a piece in the pool
+        # (all four are at home), rolls a 2 and has a single move, so the turn comes back
+        registry.get(game_id).rng = ScriptedDie(3, 6, 2)
+        host.emit('start_game')
+        host.emit('roll_dice')
+
+        events = []
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            events.extend(frames_of(host))
+            if any(event == 'turn_changed' and data['current_player'] == 0 and data['version'] > 5
+                   for event, data in events):
+                break
+            time.sleep(0.05)
+        moves = [data for event, data in events if event == 'piece_moved']
+        assert [(move['color'], move['from'], move['dice_value']) for move in moves] == [
+            ('blue', 'home', 6), ('blue', 'path', 2)]
+        assert registry.get(game_id).current_player == 0
+    finally:
+        server.BOT_DELAY = delay
+        host.disconnect()
+    # Once the host's held seat is released only a bot is left, so the game is gone
+    server.expire_grace(created['player_id'], game_id)
+    assert registry.get(game_id) is None
+
+
+class HeldPool:
+    """Stands in for BotPool: decisions wait until the test releases them"""
+
+    def __init__(self):
+        self.submitted = []
+        self.released = []
+
+    def __len__(self):
+        return len(self.submitted)
+
+    def __contains__(self, key):
+        return key in self.submitted
+
+    def submit(self, key, game):
+        self.submitted.append(key)
+
+    def poll(self):
+        finished, self.released = self.released, []
+        for key, _ in finished:
+            self.submitted.remove(key)
+        return finished
+
+
+def wait_for(condition, seconds=10):
+    deadline = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+
+def test_a_pending_decision_survives_other_seats_changing():
+    import app as server
+    from app import app, registry, socketio
+
+    delay, server.BOT_DELAY = server.BOT_DELAY, 0
+    pool, server.bots = server.bots, HeldPool()
+    host, guest = socketio.test_client(app), socketio.test_client(app)
+    try:
+        host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+        game_id = [packet for packet in host.get_received() if packet['name'] == 'game_created'][0]['args'][0]['game_id']
+        host.emit('add_bot', {'color': 'blue'})
+        guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'green'})
+        guest_id = [packet for packet in guest.get_received() if packet['name'] == 'game_joined'][0]['args'][0]['player_id']
+
+        # The host cannot move a 3; the bot rolls a 6 and has four pieces to choose from
+        registry.get(game_id).rng = ScriptedDie(3, 6)
+        host.emit('start_game')
+        host.emit('roll_dice')
+        assert wait_for(lambda: len(server.bots) == 1)
+        key = server.bots.submitted[0]
+
+        # The guest's seat is released mid-search, which bumps the version and restarts the turn
+        guest.disconnect()
+        server.grace_timers.cancel(guest_id)
+        server.expire_grace(guest_id, game_id)
+        server.play_bot_turn(game_id)
+        assert server.bots.submitted == [key]
+
+        # A decision that was lost is asked for again rather than leaving the bot stuck
+        server.bots.submitted.clear()
+        server.play_bot_turn(game_id)
+        assert server.bots.submitted == [key]
+
+        host.get_received()
+        server.bots.released.append((key, 2))
+        assert wait_for(lambda: registry.get(game_id).dice_value == 0)
+        moves = [data for event, data in frames_of(host) if event == 'piece_moved']
+        assert [(move['color'], move['piece'], move['dice_value']) for move in moves] == [('blue', 2, 6)]
+    finally:
+        server.bots = pool
+        server.BOT_DELAY = delay
+        host.disconnect()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ Bot tests passed")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for the asset build: minifiers, hashed bundles and how they are served
+"""
+import gzip
+import os
+import shutil
+import subprocess
+import tempfile
+
+from assets import CACHE_CONTROL, AssetManifest, accepted_encodings
+from build_assets import build, minify_css, minify_js, page_weight
+
+
+def test_the_script_minifier_keeps_strings_templates_and_regexes():
+    source = (
+        "// header\n"
+        "const label = 'a  // not a comment';\n"
+        "    const note = `x ${ a  +  b } /* kept */`;   /* dropped */\n"
+        "const pattern = /\\s+\\/ */g;\n"
+        "let total = a + +b - -c;\n"
+    )
+    minified = minify_js(source)
+    assert 'header' not in minified and 'dropped' not in minified
+    assert "'a  // not a comment'" in minified
+    assert '`x ${ a  +  b } /* kept */`' in minified
+    assert '/\\s+\\/ */g' in minified
+    assert 'let total=a+ +b- -c;' in minified
+    # Line breaks stay, so automatic semicolon insertion is unaffected
+    assert minified.count('\n') == 4
+
+
+def test_the_stylesheet_minifier_squeezes_rules():
+    source = "/* theme */\n.board > .cell {\n    color: red;\n    margin: 0 auto;\n}\n"
+    assert minify_css(source) == '.board>.cell{color:red;margin:0 auto}\n'
+
+
+def test_accept_encoding_honours_quality_values():
+    assert accepted_encodings('gzip, br;q=0.8, deflate;q=0') == {'gzip', 'br'}
+    assert accepted_encodings('GZIP;q=0.5') == {'gzip'}
+    assert accepted_encodings(None) == set()
+
+
+def test_builds_are_reproducible_and_precompressed():
+    first, second = tempfile.mkdtemp(), tempfile.mkdtemp()
+    try:
+        manifest = build(dist_dir=first)
+        assert build(dist_dir=second) == manifest
+        for name, entry in manifest['bundles'].items():
+            assert entry['hash'] in entry['file'] and entry['file'].endswith(os.path.splitext(name)[1])
+            with open(os.path.join(first, entry['file']), 'rb') as file:
+                bundle = file.read()
+            with open(os.path.join(first, entry['file'] + '.gz'), 'rb') as file:
+                assert gzip.decompress(file.read()) == bundle
+            assert entry['sizes']['gzip'] < entry['sizes']['minified'] < entry['sizes']['source']
+
+        report = page_weight(manifest)
+        assert report['game']['source_files'] == 3 and report['game']['bundles'] == 2
+    finally:
+        shutil.rmtree(first)
+        shutil.rmtree(second)
+
+
+def test_minified_scripts_still_parse():
+    node = shutil.which('node')
+    if node is None:
+        return
+    directory = tempfile.mkdtemp()
+    try:
+        manifest = build(dist_dir=directory)
+        for name, entry in manifest['bundles'].items():
+            if name.endswith('.js'):
+                subprocess.run([node, '--check', os.path.join(directory, entry['file'])], check=True)
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_the_app_serves_bundles_with_immutable_caching():
+    import app as server
+
+    directory = tempfile.mkdtemp()
+    original = server.assets
+    try:
+        manifest = build(dist_dir=directory)
+        server.assets = AssetManifest(directory)
+        client = server.app.test_client()
+        filename = manifest['bundles']['game.js']['file']
+
+        page = client.get('/').get_data(as_text=True)
+        assert manifest['bundles']['main.js']['file'] in page and 'js/main.js' not in page
+
+        response = client.get(f'/assets/{filename}', headers={'Accept-Encoding': 'gzip, deflate'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Cache-Control'] == CACHE_CONTROL
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert response.mimetype == 'text/javascript'
+        etag = response.headers['ETag']
+        with open(os.path.join(directory, filename), 'rb') as file:
+            assert gzip.decompress(response.get_data()) == file.read()
+
+        plain = client.get(f'/assets/{filename}', headers={'Accept-Encoding': 'identity'})
+        assert 'Content-Encoding' not in plain.headers and plain.headers['ETag'] != etag
+
+        revalidated = client.get(f'/assets/{filename}', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert revalidated.status_code == 304
+        assert client.get('/assets/missing.js').status_code == 404
+    finally:
+        server.assets = original
+        shutil.rmtree(directory)
+
+    # Without a build the pages link the sources
+    page = server.app.test_client().get('/').get_data(as_text=True)
+    assert '/static/js/main.js' in page
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ Asset build tests passed")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded chat history and its throttled delivery
+"""
+from chat_log import MESSAGE_OVERHEAD, ChatLog
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_history_keeps_the_last_messages_within_both_caps():
+    log = ChatLog(max_messages=3, max_bytes=10_000, interval=0)
+    for index in range(5):
+        log.append('g', 'Host', f'message {index}')
+    assert [message['message'] for message in log.history('g')] == ['message 2', 'message 3', 'message 4']
+    assert [message['seq'] for message in log.history('g')] == [3, 4, 5]
+
+    small = ChatLog(max_messages=100, max_bytes=3 * (MESSAGE_OVERHEAD + 4 + 100), interval=0)
+    for index in range(10):
+        small.append('g', 'Host', str(index) * 100)
+        assert small.size('g') <= small.max_bytes
+    assert len(small.history('g')) == 3
+    assert small.size('g') == sum(MESSAGE_OVERHEAD + 4 + 100 for _ in range(3))
+
+
+def test_timestamps_never_go_backwards():
+    wall = FakeClock(1_000.0)
+    log = ChatLog(interval=0, wall_clock=wall)
+    log.append('g', 'Host', 'first')
+    wall.now -= 30  # the system clock was stepped back
+    log.append('g', 'Host', 'second')
+    wall.now += 60
+    log.append('g', 'Host', 'third')
+    assert [message['timestamp'] for message in log.history('g')] == [1_000_000, 1_000_000, 1_030_000]
+
+
+def test_bursts_are_held_and_drained_once_per_interval():
+    clock = FakeClock()
+    log = ChatLog(interval=0.25, clock=clock)
+    assert log.append('g', 'Host', 'hi')['message'] == 'hi'
+    assert log.append('g', 'Guest', 'hello') is None
+    assert log.append('g', 'Host', 'ready?') is None
+    # Other rooms are throttled separately
+    assert log.append('quiet', 'Solo', 'anyone?') is not None
+    assert log.drain() == []
+
+    clock.now += 0.25
+    [(game_id, messages)] = log.drain()
+    assert game_id == 'g' and [message['message'] for message in messages] == ['hello', 'ready?']
+    assert log.drain() == []
+    # The batch just went out, so the next message waits for the following one
+    assert log.append('g', 'Guest', 'go') is None
+    clock.now += 0.25
+    assert [message['message'] for _, messages in log.drain() for message in messages] == ['go']
+
+    log.drop_game('g')
+    assert log.history('g') == [] and len(log) == 1
+
+
+def test_joining_players_receive_the_history_and_busy_rooms_get_batches():
+    import app as server
+
+    clock, server.chat.clock = server.chat.clock, FakeClock()
+    try:
+        host = server.socketio.test_client(server.app)
+        host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+        game_id = host.get_received()[0]['args'][0]['game_id']
+        for text in ('one', 'two', 'three'):
+            host.emit('chat_message', {'message': text})
+        received = host.get_received()
+        assert [packet['args'][0]['message'] for packet in received if packet['name'] == 'chat_message'] == ['one']
+
+        guest = server.socketio.test_client(server.app)
+        guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'blue'})
+        history = [packet for packet in guest.get_received() if packet['name'] == 'chat_history']
+        assert [message['message'] for message in history[0]['args'][0]['messages']] == ['one', 'two', 'three']
+
+        # The held messages go out as one batch on the next tick
+        server.chat.clock.now += server.chat.interval
+        server.flush_chat()
+    finally:
+        server.chat.clock = clock
+    batches = [packet for packet in host.get_received() if packet['name'] == 'chat_batch']
+    assert [message['message'] for message in batches[0]['args'][0]['messages']] == ['two', 'three']
+    host.disconnect()
+    guest.disconnect()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ Chat log tests passed")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Stress test: many games played concurrently from many threads must keep
+turn order and board state consistent
+"""
+import copy
+import json
+import random
+import threading
+
+from app import app, socketio, registry, limiter
+
+COLORS = ['red', 'blue', 'green', 'yellow']
+GAMES = 20
+ROUNDS = 60
+
+
+def replay(snapshot, events):
+    """Apply the broadcast diffs to a snapshot, checking every turn rule on the way"""
+    state = copy.deepcopy(snapshot)
+    order = state['seats']
+    moved = False
+
+    for name, data in events:
+        assert data['version'] == state['version'] + 1, f"version gap before {name}"
+
+        if name == 'game_started':
+            state['game_started'] = True
+        elif name == 'dice_rolled':
+            assert data['player_id'] == order[state['current_player']], "rolled out of turn"
+            assert state['dice_value'] == 0, "rolled twice in one turn"
+            state['dice_value'] = data['dice_value']
+            moved = False
+        elif name == 'piece_moved':
+            assert state['dice_value'] == data['dice_value'] != 0, "moved without a roll"
+            pieces = state['board'][data['color']]
+            if data['from'] == 'home':
+                pieces['home'].remove(data['piece'])
+            if data['to'] == 'safe':
+                del pieces['path'][str(data['piece'])]
+                pieces['safe'].append(data['piece'])
+            else:
+                pieces['path'][str(data['piece'])] = data['to']
+            for color, piece in data['captured']:
+                del state['board'][color]['path'][str(piece)]
+                state['board'][color]['home'] = sorted(state['board'][color]['home'] + [piece])
+            moved = True
+        elif name == 'turn_changed':
+            # Only a six that was actually played earns another roll
+            expected = state['current_player']
+            if not (state['dice_value'] == 6 and moved):
+                expected = (expected + 1) % len(order)
+            assert data['current_player'] == expected, "turn order broken"
+            state['current_player'] = data['current_player']
+            state['dice_value'] = 0
+
+        state['version'] = data['version']
+
+    return state
+
+
+def unbatch(name, args):
+    """(event, data) pairs carried by one received frame"""
+    if not args:
+        return []
+    if name == 'batch':
+        return [(item['event'], item['data']) for item in args[0]['events']]
+    return [(name, args[0])]
+
+
+def hammer(client, color, seed):
+    rng = random.Random(seed)
+    for _ in range(ROUNDS):
+        client.emit('roll_dice')
+        client.emit('move_piece', {
+            'color': color,
+            'piece': rng.randrange(4),
+            'from': rng.choice(['home', 'path'])
+        })
+        client.emit('pass_turn')
+
+
+def test_concurrent_games_stay_consistent():
+    tables = []
+    for _ in range(GAMES):
+        clients = [socketio.test_client(app) for _ in COLORS]
+        clients[0].emit('create_game', {'player_name': 'P0', 'color': COLORS[0]})
+        game_id = clients[0].get_received()[0]['args'][0]['game_id']
+        for index, client in enumerate(clients[1:], start=1):
+            client.emit('join_game', {'game_id': game_id, 'player_name': f'P{index}', 'color': COLORS[index]})
+
+        observer = clients[0]
+        observer.get_received()
+        observer.emit('sync_state')
+        snapshot = observer.get_received()[-1]['args'][0]['game_state']
+        observer.emit('start_game')
+        tables.append((game_id, clients, snapshot))
+
+    threads = [
+        threading.Thread(target=hammer, args=(client, COLORS[index], hash((game_id, index))))
+        for game_id, clients, _ in tables
+        for index, client in enumerate(clients)
+    ]
+    # The hammering clients deliberately exceed any sane request rate
+    limits, limiter.limits = limiter.limits, {}
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        limiter.limits = limits
+
+    for game_id, clients, snapshot in tables:
+        events = [
+            (name, data)
+            for packet in clients[0].get_received()
+            for name, data in unbatch(packet['name'], packet['args'])
+            if 'version' in data
+        ]
+        replayed = replay(snapshot, events)
+
+        with registry.locked(game_id) as game:
+            server_state = json.loads(json.dumps(game.get_game_state()))
+        assert replayed == server_state
+
+        for client in clients:
+            client.disconnect()
+
+
+if __name__ == "__main__":
+    test_concurrent_games_stay_consistent()
+    print("✅ Concurrent games stayed consistent")
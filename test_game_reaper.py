@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for idle game expiry and the game cap
+"""
+from game_reaper import EVICTIONS, GameReaper
+from game_registry import GameRegistry
+from ludo_engine import LudoGame
+
+TTLS = {'lobby': 100, 'in_progress': 1000, 'finished': 10}
+
+
+def make_game(registry, reaper, game_id, now, players=1):
+    game = LudoGame(game_id)
+    for index, color in enumerate(['red', 'blue', 'green', 'yellow'][:players]):
+        game.add_player(f'{game_id}-p{index}', f'P{index}', color)
+        registry.bind_player(f'{game_id}-p{index}', game_id)
+    game.last_activity = now
+    registry.add_game(game)
+    reaper.track(game)
+    return game
+
+
+def test_games_expire_by_phase():
+    registry = GameRegistry()
+    evicted = []
+    reaper = GameReaper(registry, TTLS, on_evict=lambda game, reason: evicted.append((game.game_id, reason)))
+    before = EVICTIONS.value('lobby')
+
+    make_game(registry, reaper, 'lobby', now=0)
+    running = make_game(registry, reaper, 'running', now=0, players=2)
+    running.start_game()
+    running.last_activity = 0
+
+    assert reaper.sweep(now=99) == 0
+    assert reaper.sweep(now=100) == 1
+    assert evicted == [('lobby', 'lobby')]
+    assert 'lobby' not in registry and registry.game_id_for('lobby-p0') is None
+    assert EVICTIONS.value('lobby') == before + 1
+
+    # A finished game gets the short TTL once it is re-tracked
+    running.winner = 'red'
+    running.last_activity = 500
+    reaper.track(running)
+    assert reaper.sweep(now=509) == 0
+    assert reaper.sweep(now=510) == 1
+    assert evicted[-1] == ('running', 'finished')
+    assert len(registry) == 0
+
+
+def test_activity_pushes_the_deadline_back():
+    registry = GameRegistry()
+    reaper = GameReaper(registry, TTLS)
+    game = make_game(registry, reaper, 'busy', now=0)
+
+    game.last_activity = 80
+    assert reaper.sweep(now=150) == 0
+    assert 'busy' in registry
+    assert reaper.sweep(now=180) == 1
+
+
+def test_cap_evicts_the_game_closest_to_expiry():
+    registry = GameRegistry()
+    reaper = GameReaper(registry, TTLS, max_games=3)
+    stale, fresh, middle = (make_game(registry, reaper, game_id, now=0) for game_id in ('stale', 'fresh', 'middle'))
+    # Activity since indexing moves the deadlines without touching the heap
+    stale.last_activity = 50
+    fresh.last_activity = 60
+    middle.last_activity = 40
+
+    assert reaper.make_room(now=70)
+    assert sorted(registry.game_ids()) == ['fresh', 'stale']
+    assert reaper.make_room(now=70)
+    assert len(registry) == 2
+
+
+def test_cap_fails_when_nothing_can_be_evicted():
+    registry = GameRegistry()
+    reaper = GameReaper(registry, TTLS, max_games=1)
+    registry.add_game(LudoGame('untracked'))
+    assert not reaper.make_room(now=0)
+
+
+def test_state_round_trip_keeps_last_activity():
+    game = LudoGame('round')
+    game.last_activity = 1234.5
+    assert LudoGame.from_dict(game.to_dict()).last_activity == 1234.5
+    assert 'last_activity' not in game.get_game_state()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ Game reaper tests passed")
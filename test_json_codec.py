@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for the packet JSON codec and the cached state snapshots
+"""
+import json
+
+import json_codec
+from ludo_engine import LudoGame
+
+
+def test_raw_json_is_spliced_verbatim():
+    payload = ['state_snapshot', {'game_state': json_codec.RawJSON('{"a":[1,2]}'), 'note': 'x"y'}]
+    encoded = json_codec.dumps(payload, separators=(',', ':'))
+    assert encoded == '["state_snapshot",{"game_state":{"a":[1,2]},"note":"x\\"y"}]'
+    assert json_codec.loads(encoded) == ['state_snapshot', {'game_state': {'a': [1, 2]}, 'note': 'x"y'}]
+
+
+def test_plain_payloads_match_the_stdlib():
+    payload = ['dice_rolled', {'dice_value': 6, 'legal_moves': [0, 3], 'player_id': 'é', 'path': {1: 'red-2'}}]
+    # orjson writes non-ASCII as UTF-8 rather than escapes, so compare what the client decodes
+    assert json.loads(json_codec.dumps(payload, separators=(',', ':'))) == json.loads(json.dumps(payload))
+    assert json_codec.dumps(payload, indent=1) == json.dumps(payload, indent=1)
+
+
+def test_snapshot_is_cached_per_version():
+    game = LudoGame('cached')
+    game.add_player('p0', 'Host', 'red')
+    first = game.state_json()
+    assert game.state_json() is first
+    assert json.loads(first) == json.loads(json.dumps(game.get_game_state()))
+
+    game.add_player('p1', 'Guest', 'blue')
+    second = game.state_json()
+    assert second is not first
+    assert json.loads(second)['seats'] == ['p0', 'p1']
+
+
+def test_clients_receive_decoded_snapshots():
+    from app import app, socketio
+
+    host = socketio.test_client(app)
+    host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+    state = host.get_received()[0]['args'][0]['game_state']
+    assert state['players'][state['seats'][0]] == {'name': 'Host', 'color': 'red'}
+    host.disconnect()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ JSON codec tests passed")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the load generator's statistics and a short run against a real server
+"""
+import json
+
+from load_test import DEFAULT_SCENARIO, check_thresholds, load_scenario, percentile, run, summarize
+
+
+def test_percentiles_and_thresholds():
+    ordered = [i / 1000 for i in range(1, 101)]
+    assert percentile(ordered, 50) == 0.05
+    assert percentile(ordered, 99) == 0.099
+    assert percentile([0.2], 95) == 0.2
+
+    report = summarize([
+        {'latencies': {'roll_dice': ordered[:50]}, 'errors': {'roll_dice': 1}, 'games_finished': 1, 'turns': 30},
+        {'latencies': {'roll_dice': ordered[50:]}, 'errors': {}, 'games_finished': 0, 'turns': 20},
+    ], elapsed=10.0)
+    roll = report['events']['roll_dice']
+    assert (roll['requests'], roll['errors'], roll['p95_ms']) == (101, 1, 95.0)
+    assert report['turns'] == 50 and report['requests_per_s'] == 10.1
+
+    report['server'] = {'cpu_avg_percent': 90.0}
+    assert check_thresholds(report, {'p95_ms': {'roll_dice': 100}, 'error_rate': 0.05}) == []
+    assert len(check_thresholds(report, {'p95_ms': {'roll_dice': 50}, 'error_rate': 0.001,
+                                         'cpu_avg_percent': 80})) == 3
+
+
+def test_scenarios_only_use_known_keys(tmp_path):
+    path = tmp_path / 'typo.json'
+    path.write_text(json.dumps({'games': 2, 'think_tim': [0, 0]}))
+    try:
+        load_scenario(str(path))
+    except ValueError as e:
+        assert 'think_tim' in str(e)
+    else:
+        raise AssertionError('a misspelled key was accepted')
+
+
+def test_bots_play_against_a_live_server():
+    scenario = {**DEFAULT_SCENARIO, 'name': 'tiny', 'games': 2, 'players_per_game': 2, 'ramp_up': 0,
+                'max_turns': 12, 'think_time': [0, 0], 'chat_probability': 0.2,
+                'thresholds': {'error_rate': 0}}
+    report = run(scenario)
+    assert report['threshold_failures'] == []
+    assert report['turns'] >= 12
+    assert {'create_game', 'join_game', 'start_game', 'roll_dice'} <= set(report['events'])
+    assert report['events']['join_game']['requests'] == 2
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, '-q'])
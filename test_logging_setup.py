@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the leveled logging layer and for keeping handlers off stdout
+"""
+import io
+import json
+import logging
+
+from logging_setup import configure_logging, get_logger, parse_levels, stop_listener, traced
+
+
+def test_per_subsystem_levels():
+    stream = io.StringIO()
+    configure_logging('WARNING', {'socket': 'DEBUG'}, stream=stream)
+    try:
+        get_logger('socket').debug('socket %s', 'detail')
+        get_logger('game').info('game %s', 'detail')
+        assert stream.getvalue().count('detail') == 1
+        assert 'ludo.socket' in stream.getvalue()
+    finally:
+        get_logger('socket').setLevel(logging.NOTSET)
+        configure_logging()
+
+
+def test_disabled_levels_are_never_formatted():
+    class Expensive:
+        def __str__(self):
+            raise AssertionError('formatted a disabled message')
+
+    configure_logging('WARNING', {}, stream=io.StringIO())
+    try:
+        get_logger('game').debug('board %s', Expensive())
+    finally:
+        configure_logging()
+
+
+def test_json_output_through_the_queue():
+    stream = io.StringIO()
+    configure_logging('INFO', {}, fmt='json', queued=True, stream=stream)
+    try:
+        get_logger('game').info('Game %s created', 'abc123', extra={'game_id': 'abc123'})
+        stop_listener()
+        entry = json.loads(stream.getvalue())
+        assert entry['message'] == 'Game abc123 created'
+        assert entry['game_id'] == 'abc123'
+        assert entry['logger'] == 'ludo.game'
+    finally:
+        configure_logging()
+
+
+def test_parse_levels():
+    assert parse_levels(' socket=debug , game=WARNING,') == {'socket': 'DEBUG', 'game': 'WARNING'}
+
+
+def test_traced_keeps_the_result():
+    stream = io.StringIO()
+    configure_logging('DEBUG', {}, stream=stream)
+    try:
+        assert traced(get_logger('socket'))(lambda value: value * 2)(21) == 42
+        assert 'took' in stream.getvalue()
+    finally:
+        configure_logging()
+
+
+def test_handlers_do_not_print(capsys):
+    from app import app, socketio
+
+    host, guest = socketio.test_client(app), socketio.test_client(app)
+    host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+    game_id = host.get_received()[0]['args'][0]['game_id']
+    guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'blue'})
+    host.emit('start_game')
+    host.emit('roll_dice')
+    guest.disconnect()
+    host.disconnect()
+
+    assert capsys.readouterr().out == ''
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the compact board in ludo_engine.py
+"""
+from ludo_engine import FINISHED, HOME, LudoBoard, square_from_wire, square_to_wire
+
+
+def test_new_board_has_every_piece_at_home():
+    board = LudoBoard()
+    assert board.count('red', HOME) == 4
+    assert board.to_wire()['blue'] == {'home': [0, 1, 2, 3], 'path': {}, 'safe': []}
+
+
+def test_occupancy_follows_moves():
+    board = LudoBoard()
+    board.move('red', 2, 10)
+    board.move('blue', 0, 10)
+    assert sorted(board.pieces_at(10)) == [('blue', 0), ('red', 2)]
+
+    board.move('red', 2, 14)
+    assert board.pieces_at(10) == [('blue', 0)]
+    assert board.pieces_at(14) == [('red', 2)]
+
+
+def test_capture_sends_only_opponents_home():
+    board = LudoBoard()
+    board.move('red', 0, 20)
+    board.move('green', 1, 20)
+    board.move('green', 3, 20)
+
+    captured = board.capture(20, 'red')
+    assert sorted(captured) == [('green', 1), ('green', 3)]
+    assert board.pieces_at(20) == [('red', 0)]
+    assert board.position('green', 1) == HOME
+    assert board.opponents_at(20, 'red') == 0
+
+
+def test_finished_pieces_leave_the_track():
+    board = LudoBoard()
+    board.move('yellow', 1, 51)
+    board.move('yellow', 1, FINISHED)
+    assert board.occupants(51) == 0
+    assert board.count('yellow', FINISHED) == 1
+    assert board.to_wire()['yellow']['safe'] == [1]
+
+
+def test_wire_format_round_trips():
+    board = LudoBoard()
+    board.move('red', 0, 5)
+    board.move('blue', 3, 17)
+    board.move('green', 2, FINISHED)
+    wire = board.to_wire()
+    wire['red']['path'] = {str(piece): square for piece, square in wire['red']['path'].items()}
+
+    restored = LudoBoard.from_wire(wire)
+    assert restored.to_wire() == board.to_wire()
+    assert restored.pieces_at(17) == [('blue', 3)]
+
+
+def test_routes_enter_the_home_column_and_finish():
+    board = LudoBoard()
+    assert board.destination('blue', 0, 5) is None
+    assert board.destination('blue', 0, 6) == 13
+
+    board.move('blue', 0, 11)  # last track square before blue's column
+    assert board.destination('blue', 0, 1) == square_from_wire('blue-0')
+    assert board.destination('blue', 0, 6) == FINISHED
+
+
+def test_finishing_needs_an_exact_roll():
+    board = LudoBoard()
+    board.move('red', 1, square_from_wire('red-3'))
+    assert board.destination('red', 1, 2) == FINISHED
+    assert board.destination('red', 1, 3) is None
+    assert board.legal_moves('red', 3) == []
+
+
+def test_red_wraps_past_square_51_into_its_column():
+    board = LudoBoard()
+    board.move('red', 0, 48)
+    assert board.destination('red', 0, 2) == 50
+    assert board.destination('red', 0, 3) == square_from_wire('red-0')
+
+
+def test_safe_squares_block_captures():
+    board = LudoBoard()
+    board.move('green', 0, 8)
+    board.move('red', 0, 3)
+    assert board.apply_move('red', 0, 8) == []
+    assert sorted(board.pieces_at(8)) == [('green', 0), ('red', 0)]
+
+    board.move('green', 1, 12)
+    assert board.apply_move('red', 0, 12) == [('green', 1)]
+
+
+def test_home_column_positions_use_the_client_naming():
+    board = LudoBoard()
+    board.move('yellow', 2, square_from_wire('yellow-4'))
+    assert board.to_wire()['yellow']['path'] == {2: 'yellow-4'}
+    assert square_to_wire(square_from_wire('green-1')) == 'green-1'
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ Board tests passed")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the LudoGame rules and turn bookkeeping
+"""
+from ludo_engine import LudoGame, square_from_wire
+
+
+def make_game(*colors):
+    game = LudoGame('test')
+    for index, color in enumerate(colors):
+        assert game.add_player(f'p{index}', f'Player {index}', color)
+    return game
+
+
+def test_color_is_taken_once():
+    game = make_game('red', 'blue')
+    assert not game.add_player('p9', 'Late', 'red')
+    assert game.color_seats == {'red': 0, 'blue': 1}
+
+
+def test_a_player_is_seated_once():
+    game = make_game('red', 'blue')
+    assert not game.add_player('p0', 'Player 0', 'green')
+    assert game.seats == ['p0', 'p1'] and 'green' not in game.color_seats
+
+
+def test_a_seated_player_cannot_create_or_join_again():
+    from app import app, registry, socketio
+
+    host, guest = socketio.test_client(app), socketio.test_client(app)
+    try:
+        host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+        game_id = host.get_received()[0]['args'][0]['game_id']
+        guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'blue'})
+        host.get_received()
+
+        host.emit('join_game', {'game_id': game_id, 'player_name': 'Host', 'color': 'green'})
+        host.emit('create_game', {'player_name': 'Host', 'color': 'green'})
+        errors = [packet['args'][0]['message'] for packet in host.get_received() if packet['name'] == 'error']
+        assert errors == ['You are already in a game'] * 2
+        game = registry.get(game_id)
+        assert len(game.seats) == 2 and 'green' not in game.color_seats
+    finally:
+        host.disconnect()
+        guest.disconnect()
+
+
+def test_current_player_follows_the_seat_table():
+    game = make_game('red', 'blue', 'green')
+    game.start_game()
+    assert game.current_player_id() == 'p0'
+    game.end_turn()
+    assert game.current_player_id() == 'p1'
+    game.end_turn(extra_turn=True)
+    assert game.current_player_id() == 'p1'
+    game.end_turn()
+    game.end_turn()
+    assert game.current_player_id() == 'p0'
+
+
+def test_turn_order_survives_a_player_leaving_mid_game():
+    game = make_game('red', 'blue', 'green', 'yellow')
+    game.start_game()
+    game.end_turn()
+    game.end_turn()
+    assert game.current_player_id() == 'p2'
+
+    game.remove_player('p1')
+    assert game.current_player_id() == 'p2'
+    assert game.seats == ['p0', None, 'p2', 'p3']
+
+    game.end_turn()
+    game.end_turn()
+    assert game.current_player_id() == 'p0'
+    game.end_turn()
+    assert game.current_player_id() == 'p2'
+
+
+def test_current_player_leaving_passes_the_turn():
+    game = make_game('red', 'blue', 'green')
+    game.start_game()
+    game.roll_dice()
+    game.remove_player('p0')
+    assert game.current_player_id() == 'p1'
+    assert game.dice_value == 0
+
+
+def test_lobby_closes_ranks_when_a_player_leaves():
+    game = make_game('red', 'blue', 'green')
+    game.remove_player('p0')
+    assert game.seats == ['p1', 'p2']
+    assert game.color_seats == {'blue': 0, 'green': 1}
+    assert game.add_player('p3', 'New', 'red')
+    assert game.color_seats['red'] == 2
+
+
+def test_vacated_seat_is_reused():
+    game = make_game('red', 'blue', 'green')
+    game.start_game()
+    game.remove_player('p1')
+    assert game.add_player('p3', 'New', 'blue')
+    assert game.seats == ['p0', 'p3', 'p2']
+
+
+def test_state_round_trips_through_dict():
+    game = make_game('red', 'blue', 'green')
+    game.start_game()
+    game.remove_player('p1')
+    restored = LudoGame.from_dict(game.to_dict())
+    assert restored.get_game_state() == game.get_game_state()
+    assert restored.color_seats == game.color_seats
+
+
+def test_legal_moves_need_a_six_to_leave_home():
+    game = make_game('red', 'blue')
+    game.start_game()
+    assert game.legal_moves('red', 5) == []
+    assert game.legal_moves('red', 6) == [(0, 'home'), (1, 'home'), (2, 'home'), (3, 'home')]
+
+
+def test_move_reports_destination_and_captures():
+    game = make_game('red', 'blue')
+    game.start_game()
+    game.board.move('blue', 2, 4)
+    game.dice_value = 6
+    assert game.move_piece('p0', 'red', 0, 'home') == {'to': 0, 'captured': []}
+
+    game.dice_value = 4
+    assert game.move_piece('p0', 'red', 0, 'path') == {'to': 4, 'captured': [['blue', 2]]}
+    assert game.board.position('blue', 2) == -1
+
+
+def test_move_from_the_wrong_location_is_rejected():
+    game = make_game('red', 'blue')
+    game.start_game()
+    game.dice_value = 3
+    assert game.move_piece('p0', 'red', 0, 'path') is None
+    assert game.move_piece('p1', 'red', 0, 'home') is None
+
+
+def test_only_integer_pieces_can_move():
+    game = make_game('red', 'blue')
+    game.start_game()
+    game.dice_value = 6
+    for piece in (True, False, 1.0, '1', 4, -1):
+        assert game.move_piece('p0', 'red', piece, 'home') is None
+    assert game.board.count('red', -1) == 4
+
+
+def test_last_piece_home_wins():
+    game = make_game('red', 'blue')
+    game.start_game()
+    for piece in range(3):
+        game.board.move('red', piece, 127)
+    game.board.move('red', 3, square_from_wire('red-4'))
+    game.dice_value = 1
+    assert game.move_piece('p0', 'red', 3, 'path') == {'to': 'safe', 'captured': []}
+    assert game.winner == 'red'
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ LudoGame tests passed")
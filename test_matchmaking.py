@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the public lobby index and the find_game event
+"""
+from ludo_engine import LudoGame
+from matchmaking import QUEUE_WAIT, Matchmaker
+
+
+def lobby(game_id, *colors):
+    game = LudoGame(game_id)
+    for index, color in enumerate(colors):
+        game.add_player(f'{game_id}-p{index}', f'Player {index}', color)
+    return game
+
+
+def test_fullest_lobby_with_the_wanted_color_is_claimed_first():
+    matchmaker = Matchmaker()
+    games = {game.game_id: game for game in (lobby('one', 'red'), lobby('three', 'red', 'blue', 'green'),
+                                             lobby('two', 'red', 'yellow'))}
+    for game in games.values():
+        matchmaker.open(game)
+    assert len(matchmaker) == 3
+
+    assert matchmaker.claim('blue') == ('two', 'blue')
+    # Nobody offers red any more, so the fullest lobby is used with another color
+    assert matchmaker.claim('red') == ('three', 'yellow')
+    assert matchmaker.claim() == ('one', 'blue')
+    assert matchmaker.claim() == (None, None)
+
+    # Seating failed or succeeded: update puts the lobby back with its real free seats
+    games['two'].add_player('two-p2', 'Player 2', 'blue')
+    assert matchmaker.update(games['two']) is False
+    assert matchmaker.update(games['one']) is False
+    assert matchmaker.claim('blue') == ('one', 'blue')
+    assert matchmaker.claim('green') == ('two', 'green')
+
+
+def test_full_lobbies_ask_to_start_and_started_ones_record_waits():
+    clock = [10.0]
+    matchmaker = Matchmaker(clock=lambda: clock[0])
+    game = lobby('g', 'red', 'blue', 'green')
+    matchmaker.enqueue('g-p0')
+    matchmaker.open(game)
+    matchmaker.claim()
+
+    clock[0] = 14.0
+    game.add_player('late', 'Late', 'yellow')
+    assert matchmaker.update(game) is True
+    assert len(matchmaker) == 0
+
+    before = QUEUE_WAIT.count()
+    game.start_game()
+    assert matchmaker.update(game) is False
+    assert 'g' not in matchmaker
+    # Only the player who went through find_game has a queue wait
+    assert QUEUE_WAIT.count() == before + 1
+
+
+def test_find_game_fills_a_lobby_and_starts_it():
+    from app import app, socketio
+
+    clients = [socketio.test_client(app) for _ in range(5)]
+    seated = []
+    for index, client in enumerate(clients):
+        client.emit('find_game', {'player_name': f'P{index}', 'color': 'red'})
+        joined = [packet['args'][0] for packet in client.get_received() if packet['name'] == 'game_joined'][0]
+        seated.append(joined)
+
+    game_ids = [joined['game_id'] for joined in seated]
+    assert len(set(game_ids[:4])) == 1 and game_ids[4] != game_ids[0]
+    state = seated[3]['game_state']
+    assert sorted(player['color'] for player in state['players'].values()) == ['blue', 'green', 'red', 'yellow']
+
+    # The fourth player completed the lobby, so everyone in it saw the game start
+    started = [packet for packet in clients[0].get_received()
+               if packet['name'] == 'game_started' or (packet['name'] == 'batch' and any(
+                   event['event'] == 'game_started' for event in packet['args'][0]['events']))]
+    assert started
+    for client in clients:
+        client.disconnect()
+
+
+def test_unknown_game_ids_do_not_list_other_games():
+    from app import app, socketio
+
+    host = socketio.test_client(app)
+    host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+    game_id = host.get_received()[0]['args'][0]['game_id']
+    guest = socketio.test_client(app)
+    guest.emit('join_game', {'game_id': 'nope', 'player_name': 'Guest', 'color': 'blue'})
+    [error] = guest.get_received()
+    assert error['name'] == 'error' and game_id not in error['args'][0]['message']
+    host.disconnect()
+    guest.disconnect()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ Matchmaking tests passed")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus metrics and the /metrics route
+"""
+from metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram('latency_seconds', 'Latency', ('event',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, 'roll_dice')
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{event="roll_dice",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{event="roll_dice",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{event="roll_dice",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{event="roll_dice"} 4' in text
+    assert '# TYPE latency_seconds histogram' in text
+
+
+def test_counters_gauges_and_label_escaping():
+    registry = MetricsRegistry()
+    calls = registry.register(Counter('calls_total', 'Calls', ('event',)))
+    calls.inc('say "hi"')
+    calls.inc('say "hi"', amount=2)
+    registry.gauge('games', 'Games', lambda: 7)
+
+    text = registry.render()
+    assert 'calls_total{event="say \\"hi\\""} 3' in text
+    assert 'games 7' in text
+
+
+def test_handlers_are_counted_and_exposed():
+    from app import app, socketio
+    from metrics import EVENT_LATENCY, EVENTS
+
+    before = EVENTS.value('roll_dice')
+    host, guest = socketio.test_client(app), socketio.test_client(app)
+    host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+    game_id = host.get_received()[0]['args'][0]['game_id']
+    guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'blue'})
+    host.emit('start_game')
+    host.emit('roll_dice')
+
+    assert EVENTS.value('roll_dice') == before + 1
+    assert EVENT_LATENCY.count('roll_dice') >= 1
+
+    response = app.test_client().get('/metrics')
+    assert response.status_code == 200
+    text = response.get_data(as_text=True)
+    for name in ('ludo_active_games', 'ludo_connected_players', 'ludo_game_rooms',
+                 'ludo_socket_event_seconds_bucket{event="roll_dice"', 'ludo_socket_payload_bytes'):
+        assert name in text
+
+    host.disconnect()
+    guest.disconnect()
+
+
+def test_unknown_histogram_labels_count_zero():
+    assert Histogram('h', 'h', ('event',)).count('missing') == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ Metrics tests passed")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Multi-worker test: three app.py processes share one SQLite game store and
+message queue, and players connected to different workers play one game
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import socketio
+
+from benchmark_connections import free_port, start_server
+
+WORKERS = 3
+COLORS = ['red', 'blue', 'green']
+
+
+class Player:
+    def __init__(self, url):
+        self.events = []
+        self.lock = threading.Lock()
+        self.client = socketio.Client(reconnection=False)
+        self.client.on('*', self.record)
+        self.client.connect(url, transports=['websocket'])
+
+    def record(self, event, data=None):
+        with self.lock:
+            if event == 'batch':
+                # One request's broadcasts to the room arrive as a single frame
+                self.events.extend((item['event'], item['data']) for item in data['events'])
+            else:
+                self.events.append((event, data))
+
+    def wait_for(self, event, count=1, timeout=10):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self.lock:
+                matches = [data for name, data in self.events if name == event]
+            if len(matches) >= count:
+                return matches[count - 1]
+            time.sleep(0.02)
+        raise AssertionError(f"timed out waiting for {event} #{count}")
+
+    def count(self, event):
+        with self.lock:
+            return sum(1 for name, _ in self.events if name == event)
+
+    def versions(self):
+        with self.lock:
+            return [data['version'] for name, data in self.events
+                    if isinstance(data, dict) and 'version' in data]
+
+
+def take_turn(player, color):
+    """Roll until the turn passes on: sixes bring a piece out (or move it) and roll again"""
+    location = 'home'
+    while True:
+        seen = player.count('turn_changed')
+        rolls = player.count('dice_rolled')
+        player.client.emit('roll_dice')
+        rolled = player.wait_for('dice_rolled', count=rolls + 1)
+        if rolled['dice_value'] == 6:
+            player.client.emit('move_piece', {'color': color, 'piece': 0, 'from': location})
+            location = 'path'
+            player.wait_for('turn_changed', count=seen + 1)
+            continue
+
+        player.client.emit('pass_turn')
+        player.wait_for('turn_changed', count=seen + 1)
+        return
+
+
+def test_players_on_different_workers_share_a_game():
+    data_dir = tempfile.mkdtemp()
+    env = {
+        'SECRET_KEY': 'multi-worker test secret',
+        'LUDO_STORE': 'sqlite:///' + os.path.join(data_dir, 'games.db'),
+        'LUDO_MESSAGE_QUEUE': 'sqlite:///' + os.path.join(data_dir, 'queue.db')
+    }
+    ports = [free_port() for _ in range(WORKERS)]
+    servers = []
+    players = []
+    try:
+        for port in ports:
+            servers.append(start_server('threading', port, 0, env))
+        players = [Player(f'http://127.0.0.1:{port}') for port in ports]
+
+        players[0].client.emit('create_game', {'player_name': 'P0', 'color': COLORS[0]})
+        game_id = players[0].wait_for('game_created')['game_id']
+
+        for index, player in enumerate(players[1:], start=1):
+            player.client.emit('join_game', {'game_id': game_id, 'player_name': f'P{index}', 'color': COLORS[index]})
+            player.wait_for('game_joined')
+
+        # The creator's worker learns about both joins through the queue
+        players[0].wait_for('player_joined', count=2)
+
+        players[0].client.emit('start_game')
+        for player in players:
+            player.wait_for('game_started')
+
+        # Every player takes one turn, each on its own worker
+        for index, player in enumerate(players):
+            take_turn(player, COLORS[index])
+
+        # Each worker serves the same game state
+        snapshots = []
+        for player in players:
+            player.client.emit('sync_state')
+            snapshots.append(player.wait_for('state_snapshot')['game_state'])
+        assert snapshots[0] == snapshots[1] == snapshots[2]
+        assert snapshots[0]['current_player'] == 0
+
+        # No worker missed or reordered a broadcast
+        for player in players:
+            versions = player.versions()
+            assert versions == sorted(versions)
+            assert versions[-1] == snapshots[0]['version']
+    finally:
+        for player in players:
+            player.client.disconnect()
+        for server in servers:
+            server.terminate()
+            server.wait(timeout=10)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_players_on_different_workers_share_a_game()
+    print("✅ Workers share games and broadcasts")
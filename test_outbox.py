@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for coalescing one request's room broadcasts into a single frame
+"""
+import threading
+
+from outbox import BATCH_EVENT, Outbox
+
+
+def recording_outbox():
+    sent = []
+    return Outbox(lambda room, event, data: sent.append((room, event, data))), sent
+
+
+def test_broadcasts_outside_collect_are_sent_at_once():
+    outbox, sent = recording_outbox()
+    outbox.add('room', 'dice_rolled', {'version': 1})
+    assert sent == [('room', 'dice_rolled', {'version': 1})]
+
+
+def test_one_frame_per_room_when_the_block_exits():
+    outbox, sent = recording_outbox()
+    with outbox.collect():
+        outbox.add('a', 'piece_moved', {'version': 4})
+        outbox.add('b', 'player_joined', {'version': 9})
+        with outbox.collect():
+            outbox.add('a', 'turn_changed', {'version': 5})
+        assert sent == []
+
+    assert sent == [
+        ('a', BATCH_EVENT, {'events': [{'event': 'piece_moved', 'data': {'version': 4}},
+                                       {'event': 'turn_changed', 'data': {'version': 5}}]}),
+        # A lone event is sent as itself
+        ('b', 'player_joined', {'version': 9}),
+    ]
+
+
+def test_threads_collect_separately():
+    outbox, sent = recording_outbox()
+    inside = threading.Event()
+    release = threading.Event()
+
+    def other_request():
+        with outbox.collect():
+            outbox.add('b', 'dice_rolled', {'version': 1})
+            inside.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=other_request)
+    thread.start()
+    inside.wait(5)
+    with outbox.collect():
+        outbox.add('a', 'dice_rolled', {'version': 1})
+    assert sent == [('a', 'dice_rolled', {'version': 1})]
+    release.set()
+    thread.join()
+    assert sent[1] == ('b', 'dice_rolled', {'version': 1})
+
+
+class LoadedDie:
+    def __init__(self, value):
+        self.value = value
+
+    def randint(self, low, high):
+        return self.value
+
+
+def test_a_roll_without_moves_reaches_the_room_as_one_batch():
+    from app import app, registry, socketio
+
+    host = socketio.test_client(app)
+    host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+    game_id = host.get_received()[0]['args'][0]['game_id']
+    guest = socketio.test_client(app)
+    guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'blue'})
+    host.emit('start_game')
+    registry.get(game_id).rng = LoadedDie(3)
+    host.get_received()
+    guest.get_received()
+
+    # Every piece is at home, so the turn passes in the same request
+    host.emit('roll_dice')
+    frames = guest.get_received()
+    assert [frame['name'] for frame in frames] == [BATCH_EVENT]
+    events = frames[0]['args'][0]['events']
+    assert [event['event'] for event in events] == ['dice_rolled', 'turn_changed']
+    assert [event['data']['version'] for event in events] == [events[0]['data']['version'],
+                                                              events[0]['data']['version'] + 1]
+    host.disconnect()
+    guest.disconnect()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ Outbox tests passed")
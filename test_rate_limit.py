@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-connection token buckets and flood protection
+"""
+from rate_limit import REJECTED, RateLimiter, parse_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_burst_then_steady_rate():
+    clock = FakeClock()
+    limiter = RateLimiter({'roll_dice': (2, 5)}, clock=clock)
+
+    assert [limiter.allow('a', 'roll_dice') for _ in range(8)] == [True] * 5 + [False] * 3
+    # Other connections and unlimited events are unaffected
+    assert limiter.allow('b', 'roll_dice')
+    assert all(limiter.allow('a', 'chat_message') for _ in range(100))
+
+    clock.now += 1.0
+    assert [limiter.allow('a', 'roll_dice') for _ in range(3)] == [True, True, False]
+    # Idle time refills up to the burst, never beyond it
+    clock.now += 60
+    assert sum(limiter.allow('a', 'roll_dice') for _ in range(20)) == 5
+
+
+def test_rejections_in_a_row_are_counted_and_forget_drops_state():
+    limiter = RateLimiter({'chat_message': (1, 1)}, clock=FakeClock())
+    assert [limiter.acquire('a', 'chat_message') for _ in range(4)] == [0, 1, 2, 3]
+    assert len(limiter) == 1
+    limiter.forget('a')
+    assert len(limiter) == 0
+    assert limiter.acquire('a', 'chat_message') == 0
+
+
+def test_parse_limits():
+    assert parse_limits('chat_message=1/5, roll_dice=0.5') == {'chat_message': (1.0, 5.0), 'roll_dice': (0.5, 0.5)}
+    assert parse_limits('') == {}
+
+
+def test_chat_flood_is_cut_off_at_the_burst():
+    from app import MAX_CHAT_CHARS, app, chat, limiter, socketio
+
+    host = socketio.test_client(app)
+    host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+    guest = socketio.test_client(app)
+    game_id = host.get_received()[0]['args'][0]['game_id']
+    guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'blue'})
+    host.get_received()
+    guest.get_received()
+
+    _, burst = limiter.limits['chat_message']
+    # Freeze time so nothing refills during the burst
+    clock, limiter.clock = limiter.clock, FakeClock()
+    try:
+        for index in range(50):
+            host.emit('chat_message', {'message': f'spam {index}'})
+    finally:
+        limiter.clock = clock
+    assert [message['message'] for message in chat.history(game_id)] == [f'spam {index}' for index in range(burst)]
+    errors = [packet for packet in host.get_received() if packet['name'] == 'error']
+    assert len(errors) == 1 and 'slow down' in errors[0]['args'][0]['message']
+
+    # Oversized messages never reach the room
+    other = socketio.test_client(app)
+    other.emit('create_game', {'player_name': 'Other', 'color': 'red'})
+    other.get_received()
+    other.emit('chat_message', {'message': 'x' * (MAX_CHAT_CHARS + 1)})
+    assert [packet['name'] for packet in other.get_received()] == ['error']
+    for client in (host, guest, other):
+        client.disconnect()
+
+
+def test_flooded_moves_are_rejected_before_any_game_lookup():
+    from app import app, limiter, registry, socketio
+
+    client = socketio.test_client(app)
+    lookups = []
+    original = registry.locked_for_player
+
+    def counting(player_id):
+        lookups.append(player_id)
+        return original(player_id)
+
+    registry.locked_for_player = counting
+    clock, limiter.clock = limiter.clock, FakeClock()
+    try:
+        before = REJECTED.value('roll_dice')
+        for _ in range(100):
+            client.emit('roll_dice')
+    finally:
+        del registry.locked_for_player
+        limiter.clock = clock
+
+    _, burst = limiter.limits['roll_dice']
+    assert len(lookups) == burst
+    assert REJECTED.value('roll_dice') - before == 100 - burst
+    client.disconnect()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ Rate limit tests passed")
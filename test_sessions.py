@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Tests for session tokens, the catch-up log and resuming a held seat
+"""
+import pytest
+
+from ludo_engine import LudoGame
+from sessions import PUBLISHED_SECRETS, EventLog, SessionTokens
+
+
+def test_tokens_round_trip_and_reject_tampering():
+    tokens = SessionTokens('secret')
+    token = tokens.issue('abc', 'sid-1')
+    assert tokens.verify(token) == ('abc', 'sid-1')
+    assert SessionTokens('other secret').verify(token) == (None, None)
+    assert tokens.verify(token[:-2]) == (None, None)
+    assert tokens.verify(None) == (None, None)
+    assert SessionTokens('secret', max_age=-1).verify(token) == (None, None)
+
+
+def test_the_log_returns_only_missed_events_or_none_after_a_gap():
+    log = EventLog(max_events=3)
+    for version in range(1, 6):
+        log.record('g', 'turn_changed', {'version': version})
+    assert [entry['data']['version'] for entry in log.since('g', 3)] == [4, 5]
+    assert log.since('g', 5) == []
+    # Version 3 is gone, so a client at 1 needs a snapshot
+    assert log.since('g', 1) is None
+    assert log.since('other', 0) is None
+    log.drop_game('g')
+    assert len(log) == 0
+
+
+def test_rebinding_keeps_the_seat_color_and_order():
+    game = LudoGame('g')
+    game.add_player('a', 'A', 'red')
+    game.add_player('b', 'B', 'blue')
+    game.start_game()
+    game.current_player = 1
+    version = game.version
+
+    assert game.rebind_player('b', 'b2')
+    assert list(game.players) == ['a', 'b2'] and game.seats == ['a', 'b2']
+    assert game.current_player_id() == 'b2' and game.current_color() == 'blue'
+    assert game.version == version + 1
+    assert not game.rebind_player('b', 'b3') and not game.rebind_player('a', 'b2')
+
+    # A held seat is marked in the game, so it survives a trip through a shared store
+    assert game.hold_seat('b2') and not game.hold_seat('b2')
+    assert LudoGame.from_dict(game.to_dict()).is_away('b2')
+    game.rebind_player('b2', 'b4')
+    assert not game.is_away('b4')
+
+
+def received(client, name):
+    return [packet['args'][0] for packet in client.get_received() if packet['name'] == name]
+
+
+def test_a_reconnecting_player_resumes_the_seat_and_gets_only_missed_events():
+    from app import app, grace_timers, registry, socketio
+
+    host, guest = socketio.test_client(app), socketio.test_client(app)
+    returning = socketio.test_client(app)
+    try:
+        host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+        game_id = received(host, 'game_created')[0]['game_id']
+        guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'green'})
+        joined = received(guest, 'game_joined')[0]
+        host.emit('start_game')
+        last_seen = registry.get(game_id).version
+
+        guest.disconnect()
+        away = received(host, 'player_away')
+        assert away and away[0]['player_id'] == joined['player_id']
+        assert joined['player_id'] in grace_timers
+        game = registry.get(game_id)
+        assert game.color_seats['green'] == 1 and joined['player_id'] in game.players
+
+        # The game goes on while the guest is away
+        host.emit('roll_dice')
+        missed_up_to = registry.get(game_id).version
+
+        returning.emit('resume_session', {'token': joined['session_token'], 'version': last_seen})
+        resumed = received(returning, 'session_resumed')[0]
+        assert 'game_state' not in resumed
+        assert [event['data']['version'] for event in resumed['events']] == list(range(last_seen + 1, missed_up_to + 1))
+        assert joined['player_id'] not in grace_timers
+
+        game = registry.get(game_id)
+        assert game.seats[1] == resumed['player_id'] != joined['player_id']
+        assert registry.game_id_for(resumed['player_id']) == game_id
+        rebound = [frame for frame in host.get_received() if frame['name'] == 'player_rebound']
+        assert rebound[0]['args'][0]['old_player_id'] == joined['player_id']
+
+        # The first token named a connection that no longer holds the seat
+        other = socketio.test_client(app)
+        other.emit('resume_session', {'token': joined['session_token'], 'version': last_seen})
+        assert received(other, 'session_invalid')
+        # A valid token cannot take the seat from a player who is still connected
+        other.emit('resume_session', {'token': resumed['session_token']})
+        assert received(other, 'session_busy')
+        assert registry.get(game_id).seats[1] == resumed['player_id']
+
+        # Once they drop, it can; without a version the client gets the whole state
+        returning.disconnect()
+        other.emit('resume_session', {'token': resumed['session_token']})
+        assert 'game_state' in received(other, 'session_resumed')[0]
+        other.disconnect()
+    finally:
+        host.disconnect()
+        if returning.is_connected():
+            returning.disconnect()
+
+
+def test_a_resume_that_beats_the_old_disconnect_waits_for_it():
+    from app import app, grace_timers, registry, socketio
+
+    host, menu, page = (socketio.test_client(app) for _ in range(3))
+    try:
+        host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+        game_id = received(host, 'game_created')[0]['game_id']
+        menu.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'green'})
+        joined = received(menu, 'game_joined')[0]
+
+        # The game page loads before the server has seen the menu page's connection close
+        page.emit('resume_session', {'token': joined['session_token']})
+        busy = received(page, 'session_busy')
+        assert busy and busy[0]['retry_seconds'] > 0 and not received(page, 'session_invalid')
+        assert registry.get(game_id).seats[1] == joined['player_id']
+
+        menu.disconnect()
+        assert registry.get(game_id).is_away(joined['player_id'])
+        # Whether the seat is held comes from the game, not this worker's timers
+        grace_timers.cancel(joined['player_id'])
+        page.emit('resume_session', {'token': joined['session_token']})
+        resumed = received(page, 'session_resumed')[0]
+        game = registry.get(game_id)
+        assert game.seats[1] == resumed['player_id'] and not game.is_away(resumed['player_id'])
+    finally:
+        host.disconnect()
+        page.disconnect()
+
+
+def test_a_connected_seat_cannot_be_taken_with_the_published_secret():
+    from itsdangerous import URLSafeTimedSerializer
+
+    from app import app, registry, socketio
+
+    host, guest, intruder = (socketio.test_client(app) for _ in range(3))
+    try:
+        host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+        game_id = received(host, 'game_created')[0]['game_id']
+        guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'green'})
+        guest_id = received(guest, 'game_joined')[0]['player_id']
+
+        # Seat ids are public: every snapshot lists them
+        forged = URLSafeTimedSerializer('ludo_game_secret_key', salt='ludo-session').dumps(
+            {'game_id': game_id, 'player_id': guest_id})
+        intruder.emit('resume_session', {'token': forged})
+        assert received(intruder, 'session_invalid')
+        assert registry.get(game_id).seats[1] == guest_id
+    finally:
+        for client in (host, guest, intruder):
+            client.disconnect()
+
+
+def test_the_published_secret_is_never_used(monkeypatch):
+    import app as server
+
+    with pytest.raises(ValueError):
+        SessionTokens('ludo_game_secret_key')
+    assert server.app.config['SECRET_KEY'] not in PUBLISHED_SECRETS
+
+    monkeypatch.setenv('SECRET_KEY', 'ludo_game_secret_key')
+    monkeypatch.delenv('LUDO_MESSAGE_QUEUE', raising=False)
+    assert server.secret_key() not in PUBLISHED_SECRETS
+    assert server.secret_key() != server.secret_key()
+    # Workers must share one key, so they cannot each pick their own
+    monkeypatch.setenv('LUDO_MESSAGE_QUEUE', 'sqlite:///queue.db')
+    with pytest.raises(RuntimeError):
+        server.secret_key()
+    monkeypatch.setenv('SECRET_KEY', 'private')
+    assert server.secret_key() == 'private'
+
+
+def test_a_seat_not_resumed_in_time_is_released():
+    import app as server
+    from app import app, registry, socketio
+
+    host, guest = socketio.test_client(app), socketio.test_client(app)
+    try:
+        host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+        game_id = received(host, 'game_created')[0]['game_id']
+        guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'green'})
+        guest_id = received(guest, 'game_joined')[0]['player_id']
+        guest.disconnect()
+        host.get_received()
+
+        server.grace_timers.cancel(guest_id)
+        server.expire_grace(guest_id, game_id)
+        left = received(host, 'player_left')
+        assert left and left[0]['player_id'] == guest_id
+        assert 'green' not in registry.get(game_id).color_seats
+        assert registry.game_id_for(guest_id) is None
+    finally:
+        host.disconnect()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
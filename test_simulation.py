@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for the headless self-play engine in simulation.py
+"""
+from simulation import POLICIES, play_game, run_batch
+
+
+def test_games_finish_with_a_winner():
+    for seed in range(20):
+        result = play_game([POLICIES['greedy'], POLICIES['random']], seed=seed)
+        assert result['winner_seat'] in (0, 1)
+        assert result['rolls'] > 0
+
+
+def test_seeded_games_are_reproducible():
+    policies = [POLICIES['random']] * 4
+    assert play_game(policies, seed=42) == play_game(policies, seed=42)
+
+
+def test_unfinished_games_are_reported():
+    result = play_game([POLICIES['first']] * 2, seed=1, max_rolls=10)
+    assert result == {'winner_seat': None, 'rolls': 10, 'captures': result['captures']}
+
+
+def test_batch_results_do_not_depend_on_the_pool():
+    serial = run_batch(40, ['greedy', 'first', 'random'], processes=1, seed=3, chunk_size=7)
+    pooled = run_batch(40, ['greedy', 'first', 'random'], processes=2, seed=3, chunk_size=11)
+    for key in ('games', 'wins', 'rolls', 'captures', 'unfinished'):
+        assert serial[key] == pooled[key]
+    assert serial['games'] == 40
+    assert sum(serial['wins']) + serial['unfinished'] == 40
+    assert abs(sum(serial['win_rate']) - 1.0) < 1e-9
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ Simulation tests passed")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for spectator batches and replays of finished games
+"""
+import json
+import random
+import tempfile
+
+import app as server
+from game_history import GameHistory
+from game_registry import GameRegistry
+from game_store import SQLiteGameStore
+from ludo_engine import LudoGame
+from spectators import SpectatorHub
+
+
+def test_hub_batches_and_overflows():
+    hub = SpectatorHub(max_events=3)
+    hub.publish('unwatched', 'dice_rolled', {})
+    hub.join('viewer', 'watched')
+    hub.publish('watched', 'dice_rolled', {'version': 1})
+    hub.publish('watched', 'turn_changed', {'version': 2})
+    assert hub.drain() == [('watched', [('dice_rolled', {'version': 1}), ('turn_changed', {'version': 2})])]
+    assert hub.drain() == []
+
+    for version in range(5):
+        hub.publish('watched', 'dice_rolled', {'version': version})
+    assert hub.drain() == [('watched', None)]
+
+    # Watching another game stops the first
+    assert hub.join('viewer', 'watched') is None
+    assert hub.join('viewer', 'other') == 'watched'
+    assert hub.count('watched') == 0 and hub.game_id_for('viewer') == 'other'
+    assert hub.leave('viewer') == 'other'
+    assert len(hub) == 0 and hub.drain() == []
+
+
+def test_spectators_watch_read_only():
+    app, socketio = server.app, server.socketio
+    host, guest, viewer = (socketio.test_client(app) for _ in range(3))
+    host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+    game_id = host.get_received()[0]['args'][0]['game_id']
+    guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'blue'})
+
+    viewer.emit('rejoin_game', {'game_id': game_id, 'spectate': True})
+    rejoined = viewer.get_received()[-1]['args'][0]
+    assert rejoined['role'] == 'spectator'
+
+    host.emit('start_game')
+    viewer.emit('roll_dice')
+    viewer.emit('chat_message', {'message': 'hi'})
+    host.emit('roll_dice')
+    # Nothing reaches the spectator until the feed ticks
+    assert [packet['name'] for packet in viewer.get_received()] == ['error']
+
+    server.flush_spectators()
+    batches = viewer.get_received()
+    assert [packet['name'] for packet in batches] == ['spectator_batch']
+    events = batches[0]['args'][0]['events']
+    assert [event['event'] for event in events][:2] == ['game_started', 'dice_rolled']
+    versions = [event['data']['version'] for event in events]
+    assert versions == list(range(rejoined['game_state']['version'] + 1, versions[-1] + 1))
+
+    for client in (viewer, guest, host):
+        client.disconnect()
+
+
+def test_a_spectator_switching_games_leaves_the_first():
+    app, socketio = server.app, server.socketio
+    first, second, guest, viewer, other_viewer = (socketio.test_client(app) for _ in range(5))
+    try:
+        game_ids = []
+        for host in (first, second):
+            host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+            game_ids.append(host.get_received()[0]['args'][0]['game_id'])
+
+        viewer.emit('rejoin_game', {'game_id': game_ids[0], 'spectate': True})
+        other_viewer.emit('rejoin_game', {'game_id': game_ids[0], 'spectate': True})
+        viewer.emit('rejoin_game', {'game_id': game_ids[1], 'spectate': True})
+        viewer.get_received()
+        assert server.spectators.count(game_ids[0]) == 1
+
+        guest.emit('join_game', {'game_id': game_ids[0], 'player_name': 'Guest', 'color': 'blue'})
+        server.flush_spectators()
+        assert [packet['name'] for packet in other_viewer.get_received()][-1] == 'spectator_batch'
+        assert 'spectator_batch' not in [packet['name'] for packet in viewer.get_received()]
+    finally:
+        for client in (viewer, other_viewer, guest, first, second):
+            client.disconnect()
+
+
+def play_to_the_end(game, rng):
+    while not game.winner:
+        color = game.current_color()
+        dice_value = game.roll_dice()
+        moves = game.legal_moves(color)
+        if not moves:
+            game.end_turn()
+            continue
+        piece, from_location = rng.choice(moves)
+        game.move_piece(game.current_player_id(), color, piece, from_location)
+        if not game.winner:
+            game.end_turn(extra_turn=dice_value == 6)
+
+
+def test_replays_record_games_loaded_from_a_shared_store():
+    with tempfile.TemporaryDirectory() as directory:
+        history = GameHistory(directory)
+        registry = GameRegistry(SQLiteGameStore(f'{directory}/games.db', LudoGame.from_dict))
+        registry.observers.append(history.record)
+        game = LudoGame('shared', rng=random.Random(3))
+        game.add_player('p0', 'Host', 'red')
+        game.add_player('p1', 'Guest', 'green')
+        registry.add_game(game)
+        history.attach(game)
+
+        # Every block below works on a fresh copy loaded from SQLite
+        with registry.locked('shared') as game:
+            game.start_game()
+        with registry.locked('shared') as game:
+            game.roll_dice()
+        with registry.locked('shared') as game:
+            game.end_turn()
+            version = game.version
+            assert history.finish(game)
+
+        events = list(history.replay('shared'))
+        assert [event['op'] for event in events[1:]] == ['start', 'roll', 'turn']
+        assert events[-1]['version'] == version
+
+
+def test_replay_streams_a_finished_game(monkeypatch):
+    with tempfile.TemporaryDirectory() as directory:
+        history = GameHistory(directory)
+        game = LudoGame('replayed', rng=random.Random(3))
+        game.add_player('p0', 'Host', 'red')
+        history.attach(game)
+        game.add_player('p1', 'Guest', 'green')
+        game.start_game()
+        play_to_the_end(game, random.Random(4))
+        assert history.finish(game)
+
+        events = history.replay('replayed')
+        assert next(events)['game_state']['players'] == {'p0': {'name': 'Host', 'color': 'red'}}
+        rest = list(events)
+        assert rest[-1]['op'] == 'move' and rest[-1]['winner'] == game.winner
+        assert [event['version'] for event in rest] == list(range(2, game.version + 1))
+
+        monkeypatch.setattr(server, 'history', history)
+        client = server.app.test_client()
+        response = client.get('/replay/replayed')
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert response.mimetype == 'application/x-ndjson'
+        assert len(lines) == len(rest) + 1
+        assert client.get('/replay/missing').status_code == 404
+        assert client.get('/replay/..%2Fetc').status_code == 404
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for the timing wheel and the turn deadlines built on it
+"""
+import random
+import time
+
+from ludo_engine import LudoGame
+from timing_wheel import MAX_TICKS, TimingWheel
+from turn_timers import TurnTimers
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_timers_fire_on_time_across_every_level():
+    clock = FakeClock()
+    wheel = TimingWheel(tick=0.1, clock=clock)
+    rng = random.Random(7)
+    # Seconds, minutes and hours away: level 0 up to level 3 of the wheel
+    deadlines = {key: rng.choice((rng.uniform(0, 25), rng.uniform(0, 1500), rng.uniform(0, 200000)))
+                 for key in range(3000)}
+    for key, delay in deadlines.items():
+        wheel.arm(key, delay, payload=delay)
+
+    fired = {}
+    while clock.now < 200001:
+        clock.now += rng.uniform(0.05, 100)
+        for key, delay in wheel.advance():
+            fired[key] = clock.now
+    assert fired.keys() == deadlines.keys()
+    assert all(fired[key] >= delay for key, delay in deadlines.items())
+    assert len(wheel) == 0
+
+
+def test_deadlines_are_kept_to_the_tick():
+    clock = FakeClock()
+    wheel = TimingWheel(tick=0.1, clock=clock)
+    for key, delay in enumerate((0.05, 3, 30.02, 300.3)):
+        wheel.arm(key, delay)
+    fired = {}
+    while len(fired) < 4:
+        clock.now = round(clock.now + 0.1, 6)
+        fired.update((key, clock.now) for key, _ in wheel.advance())
+    assert fired == {0: 0.1, 1: 3.0, 2: 30.1, 3: 300.3}
+
+
+def test_rearming_replaces_and_cancel_removes():
+    clock = FakeClock()
+    wheel = TimingWheel(tick=1, clock=clock)
+    wheel.arm('game', 5, 'first')
+    wheel.arm('game', 500, 'second')
+    wheel.arm('other', 5)
+    assert len(wheel) == 2 and 'game' in wheel
+    assert wheel.cancel('other') and not wheel.cancel('other')
+
+    clock.now = 100
+    assert wheel.advance() == []
+    clock.now = 500
+    assert wheel.advance() == [('game', 'second')]
+
+
+def test_deadlines_beyond_the_last_wheel_wait_in_it():
+    clock = FakeClock()
+    wheel = TimingWheel(tick=1, clock=clock)
+    wheel.arm('far', MAX_TICKS * 3)
+    clock.now = MAX_TICKS * 3 - 1
+    assert wheel.advance() == []
+    clock.now = MAX_TICKS * 3
+    assert wheel.advance() == [('far', None)]
+
+
+def started_game():
+    game = LudoGame('g')
+    game.add_player('a', 'A', 'red')
+    game.add_player('b', 'B', 'blue')
+    game.start_game()
+    return game
+
+
+def test_a_turn_gets_a_reminder_then_its_deadline():
+    clock = FakeClock()
+    timers = TurnTimers(seconds=30, reminder=10, tick=0.5, clock=clock)
+    game = started_game()
+    timers.start(game)
+    turn = (0, game.version)
+
+    clock.now = 19.5
+    assert timers.due() == []
+    clock.now = 20
+    assert timers.due() == [('g', 'remind', turn)]
+    clock.now = 30
+    assert timers.due() == [('g', 'expire', turn)]
+    assert timers.is_current('g', turn)
+
+
+def test_a_new_turn_makes_the_old_deadline_stale():
+    clock = FakeClock()
+    timers = TurnTimers(seconds=30, reminder=0, tick=0.5, clock=clock)
+    game = started_game()
+    timers.start(game)
+    old = (0, game.version)
+
+    clock.now = 25
+    game.end_turn()
+    timers.start(game)
+    assert not timers.is_current('g', old)
+    clock.now = 31
+    assert timers.due() == []
+    clock.now = 55
+    assert timers.due() == [('g', 'expire', (1, game.version))]
+
+    timers.stop('g')
+    assert len(timers) == 0
+
+
+def test_an_idle_player_loses_the_turn_on_the_server():
+    import app as server
+    from app import app, socketio
+
+    timers, server.turn_timers = server.turn_timers, TurnTimers(seconds=0.6, reminder=0.3, tick=0.05)
+    host, guest = socketio.test_client(app), socketio.test_client(app)
+    try:
+        host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+        game_id = host.get_received()[0]['args'][0]['game_id']
+        guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'green'})
+        host.emit('start_game')
+        guest.get_received()
+
+        names = []
+        deadline = time.monotonic() + 10
+        while 'turn_changed' not in names and time.monotonic() < deadline:
+            time.sleep(0.05)
+            for packet in guest.get_received():
+                names.append(packet['name'])
+                if packet['name'] == 'turn_changed':
+                    assert packet['args'][0]['current_player'] == 1
+                    assert 'ran out of time' in packet['args'][0]['message']
+        assert names == ['turn_reminder', 'turn_changed']
+        # The guest's turn is on the clock now
+        assert len(server.turn_timers) == 1
+    finally:
+        server.turn_timers = timers
+        host.disconnect()
+        guest.disconnect()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ Timing wheel tests passed")
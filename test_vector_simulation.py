@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests for the NumPy batch simulator in vector_simulation.py
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from vector_simulation import check_against_scalar, simulate, summarize
+
+
+def test_matches_the_scalar_engine_on_shared_dice():
+    for players in (2, 3, 4):
+        assert check_against_scalar(games=40, players=players, seed=players) == []
+
+
+def test_seeded_batches_are_reproducible():
+    first = simulate(200, 4, 'random', seed=9)
+    second = simulate(200, 4, 'random', seed=9)
+    for key in first:
+        assert np.array_equal(first[key], second[key])
+
+
+def test_every_game_finishes_or_is_reported():
+    stats = summarize(simulate(300, 3, 'random', seed=1, max_rolls=60), 3)
+    assert stats['games'] == 300
+    assert sum(stats['wins']) + stats['unfinished'] == 300
+    assert stats['unfinished'] > 0
+    assert stats['rolls'] <= 300 * 60
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print("✅ Vector simulation tests passed")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the optional msgpack wire format
+"""
+import pytest
+
+msgpack = pytest.importorskip('msgpack')
+
+import wire_format
+
+
+def test_piece_moved_round_trips_through_the_compact_schema():
+    moves = [
+        {'color': 'blue', 'piece': 2, 'from': 'home', 'to': 14, 'captured': [],
+         'dice_value': 6, 'winner': None, 'version': 7},
+        {'color': 'red', 'piece': 0, 'from': 'path', 'to': 23, 'captured': [['green', 3], ['yellow', 1]],
+         'dice_value': 4, 'winner': None, 'version': 41},
+        {'color': 'yellow', 'piece': 1, 'from': 'path', 'to': 'yellow-3', 'captured': [],
+         'dice_value': 5, 'winner': None, 'version': 300},
+        {'color': 'green', 'piece': 3, 'from': 'path', 'to': 'safe', 'captured': [],
+         'dice_value': 2, 'winner': 'green', 'version': 512},
+    ]
+    for move in moves:
+        blob = wire_format.pack('piece_moved', move)
+        assert wire_format.unpack('piece_moved', blob) == move
+        assert len(blob) < len(msgpack.packb(move))
+
+
+def test_other_events_are_plain_maps():
+    chat = {'player_name': 'Host', 'message': 'hi', 'timestamp': 'now'}
+    assert wire_format.unpack('chat_message', wire_format.pack('chat_message', chat)) == chat
+
+
+def test_batches_compact_the_moves_they_carry():
+    batch = {'events': [
+        {'event': 'piece_moved', 'data': {'color': 'red', 'piece': 1, 'from': 'path', 'to': 30, 'captured': [],
+                                          'dice_value': 3, 'winner': None, 'version': 12}},
+        {'event': 'turn_changed', 'data': {'current_player': 1, 'message': 'Turn passed to blue', 'version': 13}},
+    ]}
+    blob = wire_format.pack('batch', batch)
+    assert wire_format.unpack('batch', blob) == batch
+    assert isinstance(msgpack.unpackb(blob)['events'][0]['data'], list)
+
+
+def test_opted_in_clients_receive_binary_broadcasts():
+    from app import app, socketio
+
+    host = socketio.test_client(app, auth={'wire': 'msgpack'})
+    host.emit('create_game', {'player_name': 'Host', 'color': 'red'})
+    game_id = host.get_received()[0]['args'][0]['game_id']
+
+    guest = socketio.test_client(app)
+    guest.emit('join_game', {'game_id': game_id, 'player_name': 'Guest', 'color': 'blue'})
+    host_events = {message['name']: message['args'][0] for message in host.get_received()}
+    guest_events = {message['name']: message['args'][0] for message in guest.get_received()}
+
+    # The JSON client and the binary client see the same delta
+    assert isinstance(host_events['player_joined'], bytes)
+    assert wire_format.unpack('player_joined', host_events['player_joined']) == guest_events['player_joined']
+    host.disconnect()
+    guest.disconnect()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-q'])
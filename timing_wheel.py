@@ -0,0 +1,149 @@
+"""
+Hierarchical timing wheel for many keyed deadlines
+
+Time is cut into ticks. The first wheel has 256 slots of one tick each; each
+further wheel has 64 slots, each spanning a whole turn of the wheel below
+it. A timer goes into the slot of the lowest wheel whose range covers it,
+which is a shift and a mask, and the slot is a dict keyed by the timer's
+key. Arming, re-arming and cancelling a timer are therefore O(1) whatever
+the number of timers. Advancing processes one level-0 slot per tick, and skips
+straight to the next cascade while the first wheel is empty. Every 256
+ticks, the timers in the next slot of the wheel above are moved down into
+finer slots (a cascade). A timer moves at most once per level.
+
+Timers are keyed: arming a key that is already armed replaces its timer,
+so one game holds one entry however often its deadline moves. ``advance``
+returns the timers that have come due as ``(key, payload)`` pairs, and the
+caller acts on them outside the wheel's lock.
+"""
+import math
+import threading
+import time
+
+ROOT_BITS = 8
+LEVEL_BITS = 6
+LEVELS = 4
+ROOT_SIZE = 1 << ROOT_BITS
+LEVEL_SIZE = 1 << LEVEL_BITS
+# The furthest deadline the wheels can hold, in ticks; later ones wait in the last slot
+MAX_TICKS = 1 << (ROOT_BITS + (LEVELS - 1) * LEVEL_BITS)
+
+
+class _Timer:
+    __slots__ = ('key', 'expires', 'payload', 'slot', 'level')
+
+    def __init__(self, key, expires, payload):
+        self.key = key
+        self.expires = expires
+        self.payload = payload
+        self.slot = None
+        self.level = 0
+
+
+class TimingWheel:
+    def __init__(self, tick=0.1, clock=time.monotonic):
+        self.tick = tick
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._origin = clock()
+        # The next tick to process; every armed timer expires at or after it
+        self._next = 0
+        self._wheels = [[{} for _ in range(ROOT_SIZE)]] + [
+            [{} for _ in range(LEVEL_SIZE)] for _ in range(LEVELS - 1)]
+        self._timers = {}
+        # Timers per wheel, so ticks with nothing in the first wheel can be skipped
+        self._counts = [0] * LEVELS
+
+    def __len__(self):
+        return len(self._timers)
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    def _ticks(self, when):
+        return int((when - self._origin) / self.tick)
+
+    def _place(self, timer):
+        expires = max(timer.expires, self._next)
+        delta = expires - self._next
+        if delta >= MAX_TICKS:
+            expires = self._next + MAX_TICKS - 1
+            delta = MAX_TICKS - 1
+        if delta < ROOT_SIZE:
+            level = 0
+            slot = self._wheels[0][expires & (ROOT_SIZE - 1)]
+        else:
+            level, shift = 1, ROOT_BITS
+            while delta >= 1 << (shift + LEVEL_BITS):
+                level += 1
+                shift += LEVEL_BITS
+            slot = self._wheels[level][(expires >> shift) & (LEVEL_SIZE - 1)]
+        slot[timer.key] = timer
+        timer.slot = slot
+        timer.level = level
+        self._counts[level] += 1
+
+    def _unplace(self, timer):
+        del timer.slot[timer.key]
+        self._counts[timer.level] -= 1
+
+    def arm(self, key, delay, payload=None):
+        """Fire ``key`` with ``payload`` after ``delay`` seconds, replacing any timer it had"""
+        # Round up, so a timer never fires before its deadline
+        timer = _Timer(key, math.ceil((self.clock() + delay - self._origin) / self.tick), payload)
+        with self._lock:
+            old = self._timers.pop(key, None)
+            if old is not None:
+                self._unplace(old)
+            self._timers[key] = timer
+            self._place(timer)
+
+    def cancel(self, key):
+        """Disarm ``key``; returns whether it was armed"""
+        with self._lock:
+            timer = self._timers.pop(key, None)
+            if timer is None:
+                return False
+            self._unplace(timer)
+            return True
+
+    def _cascade(self, level):
+        shift = ROOT_BITS + (level - 1) * LEVEL_BITS
+        index = (self._next >> shift) & (LEVEL_SIZE - 1)
+        slot = self._wheels[level][index]
+        if slot:
+            self._wheels[level][index] = {}
+            self._counts[level] -= len(slot)
+            for timer in slot.values():
+                self._place(timer)
+        return index
+
+    def advance(self, now=None):
+        """Process every tick up to ``now`` and return the due timers as [(key, payload)]"""
+        target = self._ticks(self.clock() if now is None else now)
+        due = []
+        with self._lock:
+            while self._next <= target:
+                if not self._timers:
+                    # Nothing armed: skip the idle stretch, keeping the wheels aligned
+                    # to the same tick boundaries as if each tick had been processed
+                    self._next = target + 1
+                    break
+                index = self._next & (ROOT_SIZE - 1)
+                if index == 0:
+                    level = 1
+                    while level < LEVELS and self._cascade(level) == 0:
+                        level += 1
+                if not self._counts[0]:
+                    # Nothing can come due before the next cascade
+                    self._next = min(target + 1, (self._next | (ROOT_SIZE - 1)) + 1)
+                    continue
+                slot = self._wheels[0][index]
+                if slot:
+                    self._wheels[0][index] = {}
+                    self._counts[0] -= len(slot)
+                    for key, timer in slot.items():
+                        del self._timers[key]
+                        due.append((key, timer.payload))
+                self._next += 1
+        return due
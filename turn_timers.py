@@ -0,0 +1,85 @@
+"""
+Turn deadlines for every game, on one timing wheel
+
+Each game whose turn belongs to a person has one timer. When the turn
+starts, the timer is armed for the reminder, ``seconds - reminder`` from
+now. When the reminder fires it re-arms the same timer for the deadline.
+Starting another turn replaces the timer in O(1). No thread or timer
+object exists per game: one background task advances the wheel and acts
+on whatever came due.
+
+Every timer carries the version at which its turn started. A timer taken
+off the wheel just as a new turn begins is recognised as stale and
+ignored.
+"""
+import os
+import threading
+import time
+
+from metrics import REGISTRY
+from timing_wheel import TimingWheel
+
+PASS = 'pass'
+PLAY = 'play'
+
+TIMEOUTS = REGISTRY.counter('ludo_turn_timeouts_total', 'Turns settled by the server at their deadline', ('action',))
+REMINDERS = REGISTRY.counter('ludo_turn_reminders_total', 'Reminders sent before a turn deadline')
+
+
+class TurnTimers:
+    """Deadlines of ``seconds`` per turn (0 turns them off), with a reminder ``reminder`` seconds before"""
+
+    def __init__(self, seconds=60, reminder=15, on_timeout=PASS, tick=0.25, clock=time.monotonic):
+        self.seconds = seconds
+        self.reminder = reminder
+        # What happens to a player who has not rolled: PASS their turn, or PLAY it for them
+        self.on_timeout = on_timeout
+        self.tick = tick
+        self.wheel = TimingWheel(tick, clock)
+        self._lock = threading.Lock()
+        self._turns = {}        # game_id -> version its current turn started at
+
+    def __len__(self):
+        return len(self.wheel)
+
+    @classmethod
+    def from_env(cls):
+        return cls(seconds=float(os.environ.get('LUDO_TURN_SECONDS', 60)),
+                   reminder=float(os.environ.get('LUDO_TURN_REMINDER_SECONDS', 15)),
+                   on_timeout=os.environ.get('LUDO_TURN_ON_TIMEOUT', PASS))
+
+    def start(self, game):
+        """Restart the clock for the player now to move in ``game``"""
+        if not self.seconds:
+            return
+        turn = (game.current_player, game.version)
+        with self._lock:
+            self._turns[game.game_id] = turn
+            if 0 < self.reminder < self.seconds:
+                self.wheel.arm(game.game_id, self.seconds - self.reminder, ('remind', turn))
+            else:
+                self.wheel.arm(game.game_id, self.seconds, ('expire', turn))
+
+    def stop(self, game_id):
+        with self._lock:
+            self._turns.pop(game_id, None)
+            self.wheel.cancel(game_id)
+
+    def is_current(self, game_id, turn):
+        """Whether ``turn`` is still the turn being timed; check it under the game's lock before acting"""
+        with self._lock:
+            return self._turns.get(game_id) == turn
+
+    def due(self):
+        """Reminders and deadlines that have come due, as [(game_id, 'remind' or 'expire', (seat, version))]"""
+        due = []
+        for game_id, (kind, turn) in self.wheel.advance():
+            with self._lock:
+                if self._turns.get(game_id) != turn:
+                    continue
+                if kind == 'remind':
+                    self.wheel.arm(game_id, self.reminder, ('expire', turn))
+            if kind == 'remind':
+                REMINDERS.inc()
+            due.append((game_id, kind, turn))
+        return due
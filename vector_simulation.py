@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Vectorized batch simulator: thousands of games advanced in lockstep with NumPy
+
+Every step rolls one die per unfinished game and applies the whole turn at
+once over arrays shaped (games, seats, pieces) holding route progress (-1 at
+home, 0-50 on the track, 51-55 in the home column, 56 finished). The turn
+rules match the scalar engine and the server exactly: no legal move passes
+the turn, a six that was played earns another roll, landing on an
+unprotected square captures every opponent piece there.
+
+    python vector_simulation.py --games 100000 --players 4 --check 200
+"""
+import argparse
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for this module
+    np = None
+
+from ludo_engine import (COLOR_INDEX, FINISH_PROGRESS, PIECES_PER_COLOR, SAFE_SQUARES, START_SQUARES,
+                         TRACK_SQUARES, TRACK_STEPS)
+from simulation import MAX_ROLLS, POLICIES, SEAT_COLORS, play_game
+
+VECTOR_POLICIES = ('first', 'random')
+
+
+def simulate(games, players=4, policy='first', seed=None, dice=None, max_rolls=MAX_ROLLS):
+    """Play ``games`` games and return per-game arrays: winner_seat (-1 if unfinished), rolls, captures.
+
+    ``dice`` optionally fixes the rolls: row g holds the dice of game g in order.
+    """
+    if np is None:
+        raise RuntimeError('vector_simulation needs NumPy (pip install numpy)')
+    if policy not in VECTOR_POLICIES:
+        raise ValueError(f'policy must be one of {VECTOR_POLICIES}')
+
+    rng = np.random.default_rng(seed)
+    starts = np.array([START_SQUARES[COLOR_INDEX[color]] for color in SEAT_COLORS[players]], dtype=np.int16)
+    safe = np.zeros(TRACK_SQUARES, dtype=bool)
+    safe[list(SAFE_SQUARES)] = True
+    seat_ids = np.arange(players)
+
+    winner_seat = np.full(games, -1, dtype=np.int64)
+    total_rolls = np.zeros(games, dtype=np.int64)
+    total_captures = np.zeros(games, dtype=np.int64)
+
+    # Working set: only unfinished games, ``ids`` maps rows back to game numbers
+    ids = np.arange(games)
+    progress = np.full((games, players, PIECES_PER_COLOR), -1, dtype=np.int16)
+    current = np.zeros(games, dtype=np.int64)
+    rolls = np.zeros(games, dtype=np.int64)
+    captures = np.zeros(games, dtype=np.int64)
+
+    while ids.size:
+        rows = np.arange(ids.size)
+        roll = rng.integers(1, 7, ids.size) if dice is None else dice[ids, rolls]
+
+        mine = progress[rows, current]
+        at_home = mine < 0
+        target = np.where(at_home, 0, mine + roll[:, None])
+        legal = np.where(at_home, (roll == 6)[:, None], target <= FINISH_PROGRESS)
+        has_move = legal.any(axis=1)
+
+        if policy == 'first':
+            choice = legal.argmax(axis=1)
+        else:
+            keys = rng.random(legal.shape)
+            keys[~legal] = -1.0
+            choice = keys.argmax(axis=1)
+
+        movers = np.flatnonzero(has_move)
+        mover_seats = current[movers]
+        landed = target[movers, choice[movers]]
+        progress[movers, mover_seats, choice[movers]] = landed
+
+        # Captures: opponents on the landing square go home unless it is safe
+        square = (starts[mover_seats] + landed) % TRACK_SQUARES
+        hits = (landed < TRACK_STEPS) & ~safe[square]
+        if hits.any():
+            hit_rows = movers[hits]
+            others = progress[hit_rows]
+            others_square = (starts[None, :, None] + others) % TRACK_SQUARES
+            victims = ((others >= 0) & (others < TRACK_STEPS)
+                       & (others_square == square[hits][:, None, None])
+                       & (seat_ids[None, :, None] != mover_seats[hits][:, None, None]))
+            others[victims] = -1
+            progress[hit_rows] = others
+            captures[hit_rows] += victims.sum(axis=(1, 2))
+
+        won = np.zeros(ids.size, dtype=bool)
+        won[movers] = (progress[movers, mover_seats] == FINISH_PROGRESS).all(axis=1)
+
+        rolls += 1
+        stay = won | (has_move & (roll == 6))
+        current = np.where(stay, current, (current + 1) % players)
+
+        done = won | (rolls >= max_rolls)
+        if done.any():
+            finished = ids[done]
+            winner_seat[finished] = np.where(won[done], current[done], -1)
+            total_rolls[finished] = rolls[done]
+            total_captures[finished] = captures[done]
+
+            keep = ~done
+            ids, progress, current, rolls, captures = ids[keep], progress[keep], current[keep], rolls[keep], captures[keep]
+
+    return {'winner_seat': winner_seat, 'rolls': total_rolls, 'captures': total_captures}
+
+
+def summarize(results, players):
+    winners = results['winner_seat']
+    games = winners.size
+    return {
+        'games': games,
+        'wins': [int((winners == seat).sum()) for seat in range(players)],
+        'unfinished': int((winners < 0).sum()),
+        'rolls': int(results['rolls'].sum()),
+        'captures': int(results['captures'].sum()),
+        'average_rolls': float(results['rolls'].mean()) if games else 0.0
+    }
+
+
+class _DiceStream:
+    """Feeds a fixed sequence of rolls to LudoGame in place of random.Random"""
+
+    def __init__(self, values):
+        self._values = iter(values.tolist())
+
+    def randint(self, low, high):
+        return next(self._values)
+
+
+def check_against_scalar(games=200, players=4, seed=0, max_rolls=MAX_ROLLS):
+    """Play the same dice through both engines with the 'first' policy; return mismatching games"""
+    dice = np.random.default_rng(seed).integers(1, 7, (games, max_rolls))
+    vector = simulate(games, players, 'first', dice=dice, max_rolls=max_rolls)
+
+    mismatches = []
+    for game in range(games):
+        scalar = play_game([POLICIES['first']] * players, rng=_DiceStream(dice[game]), max_rolls=max_rolls)
+        expected = (-1 if scalar['winner_seat'] is None else scalar['winner_seat'], scalar['rolls'], scalar['captures'])
+        actual = (int(vector['winner_seat'][game]), int(vector['rolls'][game]), int(vector['captures'][game]))
+        if expected != actual:
+            mismatches.append((game, expected, actual))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=20000)
+    parser.add_argument('--players', type=int, choices=sorted(SEAT_COLORS), default=4)
+    parser.add_argument('--policy', choices=VECTOR_POLICIES, default='random')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--check', type=int, default=200, help='games to cross-check against the scalar engine')
+    parser.add_argument('--scalar-games', type=int, default=500, help='games timed on the scalar engine')
+    args = parser.parse_args()
+
+    if args.check:
+        mismatches = check_against_scalar(args.check, args.players, seed=args.seed or 0)
+        if mismatches:
+            print(f"❌ {len(mismatches)} of {args.check} games differ from the scalar engine, e.g. {mismatches[0]}")
+            raise SystemExit(1)
+        print(f"✅ {args.check} games identical to the scalar engine")
+
+    started = time.perf_counter()
+    stats = summarize(simulate(args.games, args.players, args.policy, seed=args.seed), args.players)
+    vector_rate = stats['games'] / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for game in range(args.scalar_games):
+        play_game([POLICIES[args.policy]] * args.players, seed=game)
+    scalar_rate = args.scalar_games / (time.perf_counter() - started)
+
+    print(f"🎲 Vectorized: {vector_rate:,.0f} games/s   scalar: {scalar_rate:,.0f} games/s   "
+          f"({vector_rate / scalar_rate:.1f}x on one core)")
+    print(f"📏 Average length {stats['average_rolls']:.1f} rolls, "
+          f"{stats['captures'] / stats['games']:.1f} captures per game, {stats['unfinished']} unfinished")
+    for seat, color in enumerate(SEAT_COLORS[args.players]):
+        print(f"   seat {seat} ({color:<6}) win rate {stats['wins'][seat] / stats['games']:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
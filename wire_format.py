@@ -0,0 +1,79 @@
+"""
+Optional msgpack wire format for game broadcasts
+
+Clients opt in when they connect (``io({auth: {wire: 'msgpack'}})``). They
+sit in a separate room per game, and each event broadcast to the game
+reaches them as a single binary msgpack attachment instead of JSON text.
+``piece_moved``, the most frequent event, uses a compact positional schema
+with squares as the engine's integer codes:
+
+    [version, color, piece, from_home, to, dice_value, winner, *captured]
+
+Colors are indexes into COLORS (winner is -1 while nobody has won). ``to``
+is a square code: track 0-51, home column 52-71, 127 for the center. Each
+captured piece is its piece_index, color * 4 + piece. Inside a ``batch``
+frame (see outbox.py) each piece_moved is compacted the same way. Other
+events are packed as plain maps. Needs the ``msgpack`` package; without it
+every client gets JSON.
+"""
+try:
+    import msgpack
+except ImportError:  # optional binary transport
+    msgpack = None
+
+from ludo_engine import (COLOR_INDEX, COLORS, FINISHED, PIECES_PER_COLOR, piece_index, square_from_wire,
+                         square_to_wire)
+from outbox import BATCH_EVENT
+
+MSGPACK = 'msgpack'
+
+
+def available():
+    return msgpack is not None
+
+
+def compact_piece_moved(data):
+    to = FINISHED if data['to'] == 'safe' else square_from_wire(data['to'])
+    return [data['version'], COLOR_INDEX[data['color']], data['piece'], data['from'] == 'home', to,
+            data['dice_value'], COLOR_INDEX.get(data['winner'], -1),
+            *(piece_index(color, piece) for color, piece in data['captured'])]
+
+
+def expand_piece_moved(values):
+    version, color, piece, from_home, to, dice_value, winner, *captured = values
+    return {
+        'color': COLORS[color],
+        'piece': piece,
+        'from': 'home' if from_home else 'path',
+        'to': 'safe' if to == FINISHED else square_to_wire(to),
+        'captured': [[COLORS[index // PIECES_PER_COLOR], index % PIECES_PER_COLOR] for index in captured],
+        'dice_value': dice_value,
+        'winner': COLORS[winner] if winner >= 0 else None,
+        'version': version
+    }
+
+
+def _compact(event, data):
+    if event == 'piece_moved':
+        return compact_piece_moved(data)
+    if event == BATCH_EVENT:
+        return {'events': [{'event': item['event'], 'data': _compact(item['event'], item['data'])}
+                           for item in data['events']]}
+    return data
+
+
+def _expand(event, payload):
+    if event == 'piece_moved':
+        return expand_piece_moved(payload)
+    if event == BATCH_EVENT:
+        return {'events': [{'event': item['event'], 'data': _expand(item['event'], item['data'])}
+                           for item in payload['events']]}
+    return payload
+
+
+def pack(event, data):
+    return msgpack.packb(_compact(event, data), use_bin_type=True)
+
+
+def unpack(event, blob):
+    return _expand(event, msgpack.unpackb(blob, raw=False, strict_map_key=False))